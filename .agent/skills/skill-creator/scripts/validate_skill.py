@@ -5,17 +5,114 @@ Validate a skill against quality standards.
 Usage:
     python3 validate_skill.py <path-to-skill>
     python3 validate_skill.py blueprint/skills/mcp-expert
+    python3 validate_skill.py --all                # Every skill of an in-memory build of src/
+    python3 validate_skill.py --all --team backend # Same, for one team's skills
+    python3 validate_skill.py --all --shard 2/4    # Same, for shard 2 of 4 (build.py --shard)
+
+Line-level errors in built skills (dist/ or --all) are reported at their
+src/ location, using the source maps build.py keeps in its manifest.
 """
 import os
 import sys
 import re
+import json
+
+# Written by scripts/build.py next to the built skills
+BUILD_MANIFEST = ".build-manifest.json"
+
+
+def import_build(factory_root: str):
+    """scripts/build.py of factory_root as a module."""
+    sys.path.insert(0, os.path.join(factory_root, "scripts"))
+    import build
+    return build
+
+
+def locate_in_build(build, outputs: dict, rel_out: str, line: int):
+    """'src/<path>:<line>' that a line of a built file came from, or None."""
+    location = build.source_location(outputs, rel_out, line)
+    return f"src/{location[0]}:{location[1]}" if location else None
+
+
+class DiskFiles:
+    """Skill files read from disk."""
+    
+    def exists(self, path: str) -> bool:
+        return os.path.exists(path)
+    
+    def isdir(self, path: str) -> bool:
+        return os.path.isdir(path)
+    
+    def listdir(self, path: str) -> list:
+        return os.listdir(path)
+    
+    def read(self, path: str) -> str:
+        with open(path, 'r') as f:
+            return f.read()
+    
+    def known_skills(self, skill_path: str) -> set:
+        # Get blueprint skills path
+        factory_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(skill_path))))
+        blueprint_skills = os.path.join(factory_root, "blueprint", "skills")
+        if os.path.isdir(blueprint_skills):
+            return set(os.listdir(blueprint_skills))
+        return set()
+    
+    def locate(self, path: str, line: int):
+        """src/ location of a line of a file in a built dist/ (None outside one)."""
+        dist_dir = os.path.dirname(os.path.abspath(path))
+        while not os.path.isfile(os.path.join(dist_dir, BUILD_MANIFEST)):
+            parent = os.path.dirname(dist_dir)
+            if parent == dist_dir:
+                return None
+            dist_dir = parent
+        try:
+            build = import_build(os.path.dirname(dist_dir))
+            with open(os.path.join(dist_dir, BUILD_MANIFEST)) as f:
+                outputs = json.load(f)["outputs"]
+        except (ImportError, OSError, ValueError, KeyError):
+            return None
+        rel_out = os.path.relpath(os.path.abspath(path), dist_dir).replace(os.sep, "/")
+        return locate_in_build(build, outputs, rel_out, line)
+
+
+class TreeFiles:
+    """Skill files read from an in-memory build (build.VirtualTree); paths are relative to dist/."""
+    
+    def __init__(self, tree):
+        self.tree = tree
+        self._outputs = None
+    
+    def exists(self, path: str) -> bool:
+        path = os.path.normpath(path)
+        return path in self.tree or self.tree.is_dir(path)
+    
+    def isdir(self, path: str) -> bool:
+        return self.tree.is_dir(os.path.normpath(path))
+    
+    def listdir(self, path: str) -> list:
+        return self.tree.listdir(os.path.normpath(path))
+    
+    def read(self, path: str) -> str:
+        return self.tree.read_text(os.path.normpath(path))
+    
+    def known_skills(self, skill_path: str) -> set:
+        return set(self.tree.listdir("skills"))
+    
+    def locate(self, path: str, line: int):
+        """src/ location of a line of a built file, from the build's source maps."""
+        import build
+        if self._outputs is None:
+            self._outputs = json.loads(self.tree.read(build.MANIFEST_NAME))["outputs"]
+        return locate_in_build(build, self._outputs, os.path.normpath(path), line)
 
 
-def check_links(skill_path: str, content: str) -> list:
+def check_links(skill_path: str, content: str, files=None) -> list:
     """Check that all internal links in SKILL.md are valid.
     
     Returns list of (link_type, path) tuples for broken links.
     """
+    files = files or DiskFiles()
     broken = []
     
     # Pattern: See examples/foo.py, See references/bar.md
@@ -23,19 +120,12 @@ def check_links(skill_path: str, content: str) -> list:
     for match in see_pattern.finditer(content):
         ref_path = match.group(1)
         full_path = os.path.join(skill_path, ref_path)
-        if not os.path.exists(full_path):
+        if not files.exists(full_path):
             broken.append(("file", ref_path))
     
     # Pattern: @skill-name (not @user or email)
     skill_ref_pattern = re.compile(r'(?<![a-zA-Z0-9])@([a-z][a-z0-9-]+)(?![a-zA-Z0-9@.])')
-    known_skills = set()
-    
-    # Get blueprint skills path
-    factory_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(skill_path))))
-    blueprint_skills = os.path.join(factory_root, "blueprint", "skills")
-    
-    if os.path.isdir(blueprint_skills):
-        known_skills = set(os.listdir(blueprint_skills))
+    known_skills = files.known_skills(skill_path)
     
     # Add factory skills
     factory_skills = {"skill-creator", "skill-factory-expert", "skill-interviewer", 
@@ -50,26 +140,27 @@ def check_links(skill_path: str, content: str) -> list:
     return broken
 
 
-def validate_skill(path: str) -> bool:
-    """Validate a skill directory against quality standards."""
-    print(f"🔍 Validating skill at {path}...")
+def check_skill(path: str, files=None, log=print) -> tuple:
+    """Check a skill directory against quality standards.
+    
+    Returns (errors, warnings); passed checks are reported through `log`.
+    With `files` (e.g. TreeFiles), `path` is looked up there instead of on disk.
+    """
+    files = files or DiskFiles()
     errors = []
     warnings = []
     
     # Check directory exists
-    if not os.path.isdir(path):
-        print(f"❌ Error: Path {path} is not a directory.")
-        return False
+    if not files.isdir(path):
+        return [f"Path {path} is not a directory."], []
     
     skill_md = os.path.join(path, "SKILL.md")
-    if not os.path.exists(skill_md):
-        print(f"❌ Error: SKILL.md not found in {path}")
-        return False
+    if not files.exists(skill_md):
+        return [f"SKILL.md not found in {path}"], []
     
     # Read content
-    with open(skill_md, 'r') as f:
-        content = f.read()
-        lines = content.splitlines()
+    content = files.read(skill_md)
+    lines = content.splitlines()
     
     # ========================================
     # 1. Frontmatter Check
@@ -93,7 +184,7 @@ def validate_skill(path: str) -> bool:
     if line_count > 500:
         errors.append(f"SKILL.md is too long ({line_count} lines). Limit is 500.")
     else:
-        print(f"✅ Length: {line_count}/500 lines")
+        log(f"✅ Length: {line_count}/500 lines")
     
     # ========================================
     # 3. Best Practices Check
@@ -127,7 +218,7 @@ def validate_skill(path: str) -> bool:
     # ========================================
     # 5. Link Checker (NEW)
     # ========================================
-    broken_links = check_links(path, content)
+    broken_links = check_links(path, content, files)
     for link_type, link_path in broken_links:
         if link_type == "file":
             errors.append(f"Broken link: '{link_path}' not found")
@@ -135,7 +226,7 @@ def validate_skill(path: str) -> bool:
             warnings.append(f"Unknown skill reference: @{link_path}")
     
     if not broken_links:
-        print("✅ Links: all valid")
+        log("✅ Links: all valid")
     
     # ========================================
     # 6. Examples Check (no large code blocks in SKILL.md)
@@ -144,20 +235,26 @@ def validate_skill(path: str) -> bool:
     in_code_block = False
     code_block_lines = 0
     max_code_block = 0
+    max_code_block_start = 0
     current_block = 0
     
-    for line in lines:
+    for i, line in enumerate(lines, 1):
         if line.startswith("```"):
             if in_code_block:
-                max_code_block = max(max_code_block, current_block)
+                if current_block > max_code_block:
+                    max_code_block, max_code_block_start = current_block, block_start
                 current_block = 0
+            else:
+                block_start = i
             in_code_block = not in_code_block
         elif in_code_block:
             current_block += 1
             code_block_lines += 1
     
     if max_code_block > 15:
-        warnings.append(f"Large code block found ({max_code_block} lines). Consider moving to examples/")
+        location = files.locate(skill_md, max_code_block_start)
+        at = f" at {location}" if location else ""
+        warnings.append(f"Large code block found ({max_code_block} lines{at}). Consider moving to examples/")
     
     # ========================================
     # 6. Language Check (English only)
@@ -172,12 +269,14 @@ def validate_skill(path: str) -> bool:
                 cyrillic_lines.append(i)
     
     if cyrillic_lines:
+        # Built skills: report where in src/ each line came from
+        shown = ", ".join(str(files.locate(skill_md, i) or i) for i in cyrillic_lines[:5])
         if len(cyrillic_lines) > 5:
-            errors.append(f"SKILL.md contains Cyrillic text (lines: {cyrillic_lines[:5]}... and {len(cyrillic_lines) - 5} more). Skills must be in English.")
+            errors.append(f"SKILL.md contains Cyrillic text (lines: [{shown}]... and {len(cyrillic_lines) - 5} more). Skills must be in English.")
         else:
-            errors.append(f"SKILL.md contains Cyrillic text (lines: {cyrillic_lines}). Skills must be in English.")
+            errors.append(f"SKILL.md contains Cyrillic text (lines: [{shown}]). Skills must be in English.")
     else:
-        print("✅ Language: English")
+        log("✅ Language: English")
     
     # ========================================
     # 7. Directory Structure Check
@@ -185,32 +284,42 @@ def validate_skill(path: str) -> bool:
     expected_dirs = ["examples", "references", "resources", "scripts"]
     for dir_name in expected_dirs:
         dir_path = os.path.join(path, dir_name)
-        if not os.path.exists(dir_path):
+        if not files.exists(dir_path):
             # Only warn if mentioned in content
             if f"{dir_name}/" in content:
                 warnings.append(f"'{dir_name}/' mentioned but directory not found")
     
     # Check examples/ has content if skill has code examples
     examples_dir = os.path.join(path, "examples")
-    if os.path.isdir(examples_dir):
-        examples_files = [f for f in os.listdir(examples_dir) if not f.startswith('.')]
+    if files.isdir(examples_dir):
+        examples_files = [f for f in files.listdir(examples_dir) if not f.startswith('.')]
         if examples_files:
-            print(f"✅ Examples: {len(examples_files)} files")
+            log(f"✅ Examples: {len(examples_files)} files")
         else:
             warnings.append("examples/ directory is empty")
     
     # Check references/checklist.md exists and is customized
     checklist_path = os.path.join(path, "references", "checklist.md")
-    if os.path.exists(checklist_path):
-        with open(checklist_path, 'r') as f:
-            checklist_content = f.read()
+    if files.exists(checklist_path):
+        checklist_content = files.read(checklist_path)
         if "Use this checklist to verify your skill" in checklist_content:
             warnings.append("references/checklist.md appears to be the generic template. Customize it!")
         else:
-            print("✅ Checklist: customized")
+            log("✅ Checklist: customized")
     else:
         warnings.append("references/checklist.md not found")
     
+    return errors, warnings
+
+
+def validate_skill(path: str, files=None) -> bool:
+    """Validate a skill directory against quality standards and print a report.
+    
+    With `files` (e.g. TreeFiles), `path` is looked up there instead of on disk.
+    """
+    print(f"🔍 Validating skill at {path}...")
+    errors, warnings = check_skill(path, files)
+    
     # ========================================
     # Print Results
     # ========================================
@@ -232,11 +341,55 @@ def validate_skill(path: str) -> bool:
     return len(errors) == 0
 
 
+def validate_built_skills(team: str = None, shard: str = None) -> bool:
+    """Build src/ in memory with scripts/build.py and validate every skill in it (or in one shard)."""
+    factory_root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(
+        os.path.dirname(os.path.abspath(__file__))))))
+    try:
+        build = import_build(factory_root)
+    except ImportError as e:
+        print(f"❌ Error: cannot import scripts/build.py from {factory_root} ({e})")
+        return False
+    
+    try:
+        tree = build.build(os.path.join(factory_root, "src"), team, shard=shard)
+    except ValueError as e:
+        print(f"❌ Error: {e}")
+        return False
+    
+    files = TreeFiles(tree)
+    failed = False
+    for skill_name in tree.listdir("skills"):
+        if f"skills/{skill_name}/SKILL.md" not in tree:
+            continue
+        errors, _ = check_skill(f"skills/{skill_name}", files, log=lambda message: None)
+        if not errors:
+            print(f"✅ {skill_name}")
+        else:
+            print(f"❌ {skill_name} failed validation")
+            # The errors, already pointing at src/ locations
+            for e in errors:
+                print(f"   • {e}")
+            failed = True
+    
+    if failed:
+        print("")
+        print("⚠️  Some skills failed validation. Run 'make validate SKILL=<name>' for details.")
+    else:
+        print("✅ All skills validated!")
+    return not failed
+
+
 if __name__ == "__main__":
     if len(sys.argv) < 2:
         print("Usage: validate_skill.py <path-to-skill>")
+        print("       validate_skill.py --all [--team <team>] [--shard <i/N>]")
         print("Example: validate_skill.py blueprint/skills/mcp-expert")
         sys.exit(1)
     
-    success = validate_skill(sys.argv[1])
+    if sys.argv[1] == "--all":
+        options = dict(zip(sys.argv[2::2], sys.argv[3::2]))
+        success = validate_built_skills(options.get("--team"), options.get("--shard"))
+    else:
+        success = validate_skill(sys.argv[1])
     sys.exit(0 if success else 1)
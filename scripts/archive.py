@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+"""
+Reproducible archives of a build (--archive): sorted entries, fixed
+metadata and hardlinks for aliased outputs, so identical trees give
+byte-identical .tar.zst, .tar.gz, .tar or .zip files.
+"""
+
+import io
+import os
+import gzip
+import time
+import shutil
+import tarfile
+import zipfile
+import subprocess
+from pathlib import Path
+
+from build_stats import count_io
+from output_tree import AssetRef, VirtualTree
+
+# Reproducible archives (--archive): supported types, zstd level, zip epoch
+ARCHIVE_SUFFIXES = (".tar.zst", ".tar.gz", ".tgz", ".tar", ".zip")
+ZSTD_LEVEL = 19
+ZIP_EPOCH = (1980, 1, 1, 0, 0, 0)
+
+
+def archive_mtime() -> int:
+    """Timestamp of every archive entry: SOURCE_DATE_EPOCH, else 0."""
+    try:
+        return int(os.environ.get("SOURCE_DATE_EPOCH", "0"))
+    except ValueError:
+        return 0
+
+
+def _entry_mode(value) -> int:
+    """Permission bits of an archive entry: only copied executables get +x."""
+    if isinstance(value, AssetRef) and os.access(value.path, os.X_OK):
+        return 0o755
+    return 0o644
+
+
+def _write_tar(out_tree: VirtualTree, fileobj):
+    """Stream out_tree as a GNU tar with sorted entries and fixed metadata."""
+    mtime = archive_mtime()
+    stored = {}
+    with tarfile.open(fileobj=fileobj, mode="w|", format=tarfile.GNU_FORMAT) as tar:
+        for rel_out, value in out_tree.items():
+            info = tarfile.TarInfo(rel_out)
+            info.mtime = mtime
+            info.mode = _entry_mode(value)
+            info.uid = info.gid = 0
+            info.uname = info.gname = ""
+            # Aliased outputs (team bundles) are stored once, then hardlinked
+            target = out_tree.aliases.get(rel_out, rel_out)
+            if target in stored:
+                info.type = tarfile.LNKTYPE
+                info.linkname = stored[target]
+                tar.addfile(info)
+                continue
+            stored[target] = rel_out
+            if isinstance(value, AssetRef):
+                info.size = value.path.stat().st_size
+                with open(value.path, "rb") as src:
+                    tar.addfile(info, src)
+            else:
+                info.size = len(value)
+                tar.addfile(info, io.BytesIO(value))
+            count_io(written=info.size)
+
+
+def _write_zip(out_tree: VirtualTree, fileobj):
+    """Write out_tree as a zip with sorted entries and fixed metadata."""
+    date_time = max(ZIP_EPOCH, time.gmtime(archive_mtime())[:6])
+    with zipfile.ZipFile(fileobj, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+        for rel_out, value in out_tree.items():
+            info = zipfile.ZipInfo(rel_out, date_time)
+            info.create_system = 3
+            info.external_attr = (0o100000 | _entry_mode(value)) << 16
+            info.compress_type = zipfile.ZIP_DEFLATED
+            if isinstance(value, AssetRef):
+                info.file_size = value.path.stat().st_size
+                with open(value.path, "rb") as src, archive.open(info, "w") as dst:
+                    shutil.copyfileobj(src, dst)
+            else:
+                info.file_size = len(value)
+                archive.writestr(info, value)
+            count_io(written=info.file_size)
+
+
+def _write_tar_zst(out_tree: VirtualTree, fileobj) -> bool:
+    """
+    Stream a tar through zstd: the zstandard module if installed, else the
+    zstd CLI. False if neither is available.
+    """
+    try:
+        import zstandard
+    except ImportError:
+        zstandard = None
+    if zstandard is not None:
+        with zstandard.ZstdCompressor(level=ZSTD_LEVEL).stream_writer(fileobj, closefd=False) as zst:
+            _write_tar(out_tree, zst)
+        return True
+    
+    zstd_cli = shutil.which("zstd")
+    if zstd_cli is None:
+        return False
+    fileobj.flush()
+    proc = subprocess.Popen([zstd_cli, "-q", f"-{ZSTD_LEVEL}", "-T1", "-c"],
+                            stdin=subprocess.PIPE, stdout=fileobj)
+    try:
+        _write_tar(out_tree, proc.stdin)
+    finally:
+        proc.stdin.close()
+    if proc.wait() != 0:
+        raise OSError(f"zstd exited with status {proc.returncode}")
+    return True
+
+
+def write_archive(out_tree: VirtualTree, archive_path: Path) -> Path:
+    """
+    Write out_tree to a reproducible archive chosen by extension (.tar.zst,
+    .tar.gz/.tgz, .tar or .zip). Identical trees give byte-identical archives.
+    Without zstd support a .tar.zst request falls back to .zip next to it.
+    
+    The archive is written to a temporary file and renamed into place.
+    Returns the path written.
+    """
+    name = archive_path.name
+    if not name.endswith(ARCHIVE_SUFFIXES):
+        raise ValueError(f"Unsupported archive type: {name} (use {', '.join(ARCHIVE_SUFFIXES)})")
+    archive_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = archive_path.with_name(f".{name}.tmp")
+    
+    try:
+        with open(tmp_path, "wb") as fh:
+            if name.endswith(".zip"):
+                _write_zip(out_tree, fh)
+            elif name.endswith((".tar.gz", ".tgz")):
+                with gzip.GzipFile(filename="", mode="wb", fileobj=fh, mtime=archive_mtime()) as gz:
+                    _write_tar(out_tree, gz)
+            elif name.endswith(".tar"):
+                _write_tar(out_tree, fh)
+            elif not _write_tar_zst(out_tree, fh):
+                archive_path = archive_path.with_name(name.removesuffix(".tar.zst") + ".zip")
+                print(f"  ⚠️  zstd not available (pip install zstandard), writing {archive_path.name}")
+                fh.seek(0)
+                fh.truncate()
+                _write_zip(out_tree, fh)
+        os.replace(tmp_path, archive_path)
+    finally:
+        if tmp_path.exists():
+            tmp_path.unlink()
+    return archive_path
+
+
+def read_archive(archive_path: Path) -> dict:
+    """Files (path -> bytes) of an archive written by write_archive()."""
+    name = archive_path.name
+    if name.endswith(".zip"):
+        with zipfile.ZipFile(archive_path) as archive:
+            return {info.filename: archive.read(info) for info in archive.infolist() if not info.is_dir()}
+    if name.endswith(".tar.zst"):
+        try:
+            import zstandard
+        except ImportError:
+            zstandard = None
+        if zstandard is not None:
+            with open(archive_path, "rb") as fh:
+                data = zstandard.ZstdDecompressor().stream_reader(fh).read()
+        elif shutil.which("zstd"):
+            data = subprocess.run([shutil.which("zstd"), "-q", "-d", "-c", str(archive_path)],
+                                  check=True, capture_output=True).stdout
+        else:
+            raise ValueError(f"Cannot read {name}: zstd not available (pip install zstandard)")
+        fileobj = io.BytesIO(data)
+    else:
+        fileobj = open(archive_path, "rb")
+    with fileobj, tarfile.open(fileobj=fileobj, mode="r:*") as tar:
+        return {member.name: tar.extractfile(member).read() for member in tar
+                if member.isfile() or member.islnk()}
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Shared output writer for build.py and the generate_* scripts.
+
+Files whose content is already up to date are left alone (same size, then
+same hash), so their mtimes do not change and VitePress, editors and rsync
+see nothing new. Real writes go to a temp file next to the target and are
+renamed into place, so readers never see a half-written file.
+
+Usage:
+    from atomic_write import write_if_changed, write_report
+
+    write_if_changed(output_file, content)   # str or bytes; True if written
+    print(write_report())                    # "📝 3 written, 12 unchanged"
+"""
+
+import os
+import stat
+import hashlib
+import threading
+from pathlib import Path
+
+# Files written / left unchanged by this process
+_counts = {"written": 0, "unchanged": 0}
+_lock = threading.Lock()
+
+
+def file_hash(path: Path) -> str:
+    """sha256 of a file, read in chunks."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 16), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def same_content(path: Path, data: bytes) -> bool:
+    """True if `path` exists and holds exactly `data` (size checked before hashing)."""
+    try:
+        if os.stat(path).st_size != len(data):
+            return False
+        return file_hash(path) == hashlib.sha256(data).hexdigest()
+    except OSError:
+        return False
+
+
+def write_atomic(path: Path, data: bytes):
+    """Write via a per-thread temp file and rename (keeps an existing file's mode)."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        tmp_path.write_bytes(data)
+        try:
+            os.chmod(tmp_path, stat.S_IMODE(os.stat(path).st_mode))
+        except FileNotFoundError:
+            pass
+        os.replace(tmp_path, path)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+
+
+def write_if_changed(path: Path, content) -> bool:
+    """Write `content` (str or bytes) to `path` unless it is already there. True if written."""
+    data = content.encode() if isinstance(content, str) else content
+    if same_content(path, data):
+        with _lock:
+            _counts["unchanged"] += 1
+        return False
+    write_atomic(path, data)
+    with _lock:
+        _counts["written"] += 1
+    return True
+
+
+def write_report() -> str:
+    """One-line summary of this run's writes."""
+    return f"📝 {_counts['written']} written, {_counts['unchanged']} unchanged"
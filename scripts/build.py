@@ -4,200 +4,259 @@ Build script: src/ → dist/
 
 Processes {{include: path}} directives and assembles final files.
 
+This script is the CLI and the build orchestration (phases, team bundles,
+dry runs, shard merges). The machinery lives in sibling modules:
+include_engine.py (includes, source maps, include graph), sources.py
+(frontmatter, presets, teams), build_manifest.py and build_cache.py
+(incremental and shared caching), output_tree.py (dist/ and in-memory
+trees), bundle_index.py, archive.py, delta.py, minify.py, hoist.py,
+shard.py, watch.py and build_stats.py (--profile).
+
 Usage:
     python3 scripts/build.py                     # Full build (all skills)
     python3 scripts/build.py --team backend      # Only backend team skills
     python3 scripts/build.py --team tma,core     # Multiple teams
     python3 scripts/build.py --list-teams        # Show available teams
+    python3 scripts/build.py --all-teams         # Every team into dist/teams/<team>/
+    python3 scripts/build.py --clean             # Rebuild everything, reusing nothing (neither
+                                                 # dist/ nor the shared build cache)
+    python3 scripts/build.py --jobs 8            # Render skills in 8 processes
+                                                 # (phases always run concurrently on threads)
+    python3 scripts/build.py --watch             # Rebuild affected outputs on every save
+    python3 scripts/build.py --profile report.json  # Per-phase/per-skill timing report
+    python3 scripts/build.py --verbose           # Summary also counts written/unchanged files
+    python3 scripts/build.py --archive dist.tar.zst  # Reproducible archive, no dist/
+    python3 scripts/build.py --cache-stats       # Shared build cache summary
+    python3 scripts/build.py --dry-run --diff    # What a build would change in dist/
+    python3 scripts/build.py --shard 2/4         # CI: only the skills of shard 2 of 4
+    python3 scripts/build.py --merge s1 s2 s3 s4 # Combine the shard dist/ trees into dist/
+    python3 scripts/build.py --skill qa-lead     # Only these skills (comma-separated), with
+                                                 # a TEAM.md and PIPELINE.md for just them
+    python3 scripts/build.py --skill qa-lead --with-neighbors
+                                                 # ... plus the skills they hand off to / from
+    python3 scripts/build.py --delta-from v1/.build-manifest.json --archive v1-v2.tar.zst
+                                                 # Patch bundle: only what changed since v1
+    python3 scripts/build.py --apply-delta v1-v2.tar.zst path/to/installed/tree
+    python3 scripts/build.py --minify            # Compact SKILL.md files (byte report per skill)
+    python3 scripts/build.py --hoist-partials 3  # Partials inlined by >3 skills of a bundle go to
+                                                 # rules/PARTIAL_*.md once (per team with --all-teams)
+    python3 scripts/build.py --affected partials/git-protocol.md
+                                                 # Rebuild only outputs that include it
+    
+    # Or in-memory, from other scripts (no dist/ written)
+    from build import build
+    tree = build(Path("src"), teams="backend")   # VirtualTree: path -> bytes
+    
+    # Builds are incremental: dist/.build-manifest.json records the inputs
+    # (source, included partials, preset hierarchy) of every output, and only
+    # outputs whose inputs changed are rewritten (and only if their content
+    # changed). Each build is written to a sibling staging directory and
+    # atomically swapped in as dist/.
+    # Each rendered output's manifest entry carries a source map ("map":
+    # [[output line, src path, src line, line count], ...]), so validators
+    # can report errors in dist/ at their src/ location (source_location()).
+    # dist/index.json lists every skill (frontmatter summary, files with
+    # sizes and hashes, included partials) and the rules and workflows.
+    # Rendered outputs are also kept in ~/.cache/ag-factory/ (keyed by the
+    # source, include and builder hashes), so other worktrees and branches
+    # reuse them; --no-cache bypasses it.
     
     # Or via make
     make build                    # Full build
     make build-team TEAM=backend  # Team-specific build
+    make build-all-teams          # All team bundles
+    make build-archive            # All team bundles as dist.tar.zst
+    make watch                    # Build, then rebuild on every change in src/
 """
 
-import re
+import io
+import os
 import sys
+import json
+import time
 import shutil
+import difflib
 import argparse
+import contextlib
 from pathlib import Path
-from datetime import datetime
-
-import yaml
-
-# Include patterns:
-# New: {{include: partials/pre-handoff-validation.md}}
-# Legacy: <!-- INCLUDE: _meta/_skills/sections/pre-handoff-validation.md -->
-INCLUDE_PATTERN = re.compile(r'\{\{include:\s*([^\}]+)\}\}')
-LEGACY_INCLUDE_PATTERN = re.compile(r'<!--\s*INCLUDE:\s*([^>]+)\s*-->')
-
-# YAML frontmatter pattern
-FRONTMATTER_PATTERN = re.compile(r'^---\s*\n(.*?)\n---', re.DOTALL)
-
-
-def parse_frontmatter(content: str) -> dict:
-    """Extract YAML frontmatter from markdown content."""
-    match = FRONTMATTER_PATTERN.match(content)
-    if not match:
-        return {}
-    try:
-        return yaml.safe_load(match.group(1)) or {}
-    except yaml.YAMLError:
-        return {}
+from concurrent.futures import ThreadPoolExecutor
 
+from atomic_write import write_if_changed
+from generate_pipelines import build_skill_matrix, normalize_skill_list, render_pipeline_file
+from generate_teams import render_team_file
+from build_stats import RoutedStdout, active_profile, capture_output, count_io, profiled, start_profile
+from build_manifest import HIERARCHY_INPUT, MANIFEST_NAME, MANIFEST_VERSION, BuildManifest, hash_bytes
+from build_cache import BuildCache
+from output_tree import DirectoryTree, VirtualTree, staging_dir_for, swap_into_place
+from sources import (decode_source, find_skill_dirs, is_binary, load_preset_hierarchy, parse_frontmatter,
+                     read_skill_presets, read_source, read_source_rest, collect_skill_presets,
+                     skill_matches_teams)
+# source_location is used by the validators as build.source_location()
+from include_engine import (IncludeCache, IncludeGraph, RenderedSkill, check_include_graph,
+                            compact_source_map, has_directives, remap_source_map, render_includes,
+                            render_skills, source_location)
+from bundle_index import SKILL_OUTPUT_PATTERN, skill_meta, write_index
+from minify import minify_markdown, print_minify_report
+from hoist import (HOIST_RULE_PREFIX, hoist_expansions, hoist_rule_name, hoist_sections, plan_hoisting,
+                   print_hoist_report)
+from shard import parse_shard, shard_of
+from archive import ARCHIVE_SUFFIXES, write_archive
+from delta import DELTA_ARCHIVE, apply_delta, delta_bundle, read_base_manifest
+from watch import WATCH_ALL, InotifyWatcher, PollingWatcher, wait_for_changes
 
-def load_preset_hierarchy(src_dir: Path) -> dict:
-    """Load preset hierarchy to resolve inheritance."""
-    hierarchy_file = src_dir / "_meta" / "preset-hierarchy.yaml"
-    if not hierarchy_file.exists():
-        return {}
-    
-    with open(hierarchy_file) as f:
-        return yaml.safe_load(f) or {}
+# Per-team bundles written by --all-teams (dist/teams/<team>/)
+TEAMS_DIR = "teams"
+# --skill --with-neighbors: frontmatter fields naming the skills a skill hands off to / from
+HANDOFF_FIELDS = ("delegates_to", "receives_from", "return_paths")
+# Preset name in the TEAM.md / PIPELINE.md written for a --skill selection
+SELECTION_NAME = "selection"
 
 
-def resolve_team_presets(team: str, hierarchy: dict) -> set:
+def write_output(out_tree: DirectoryTree, rel_out: str, content: str, source: str,
+                 inputs=(), manifest: BuildManifest = None, source_map: list = None):
     """
-    Resolve all presets that should be included for a team.
-    E.g., 'backend' → {'backend', 'core'} (because backend inherits core)
+    Write a rendered output to dist/ and record it (and its source map) in
+    the manifest. In SKILL.md files the manifest's hoisted partials are
+    replaced by references first, then a --minify build compacts them.
     """
-    if team == "all":
-        return {"all"}
-    
-    resolved = {team}
-    
-    # Get direct inheritance
-    team_config = hierarchy.get(team, {})
-    inherits = team_config.get("inherits", [])
-    
-    for parent in inherits:
-        resolved.update(resolve_team_presets(parent, hierarchy))
-    
-    return resolved
+    skill_output = is_skill_output(rel_out)
+    hoisted = 0
+    if manifest is not None and manifest.hoist and skill_output and source_map is not None:
+        hoisted = len(content.encode())
+        if manifest.hoist_lines is None:
+            manifest.hoist_lines = hoist_expansions(manifest.src_dir, manifest.hoist)
+        content, kept = hoist_sections(content, source_map, manifest.hoist, manifest.hoist_lines)
+        source_map = remap_source_map(source_map, kept)
+        hoisted -= len(content.encode())
+    minified_from = None
+    if manifest is not None and manifest.minify and skill_output:
+        minified_from = len(content.encode())
+        content, kept = minify_markdown(content)
+        if source_map is not None:
+            source_map = remap_source_map(source_map, kept)
+    data = content.encode()
+    written = out_tree.write(rel_out, data)
+    if written:
+        count_io(written=len(data))
+    if manifest is not None:
+        manifest.record(rel_out, source, inputs, data, written)
+        if source_map is not None:
+            manifest.annotate(rel_out, map=source_map)
+        if skill_output:
+            manifest.annotate(rel_out, meta=skill_meta(content))
+        if hoisted:
+            manifest.annotate(rel_out, hoisted=hoisted)
+        if minified_from is not None:
+            manifest.annotate(rel_out, unminified=minified_from)
 
 
-def get_teams_for_preset(preset: str, hierarchy: dict) -> set:
-    """
-    Get all teams that include this preset.
-    E.g., 'core' → {'core', 'backend', 'frontend', 'fullstack', 'tma', 'cli'}
-    """
-    teams = {preset}
-    
-    for team_name, team_config in hierarchy.items():
-        inherits = team_config.get("inherits", [])
-        if preset in inherits:
-            teams.update(get_teams_for_preset(team_name, hierarchy))
-    
-    return teams
+def is_skill_output(rel_out: str) -> bool:
+    """True for skills/<name>/SKILL.md, also inside a team bundle (teams/<team>/...)."""
+    if rel_out.startswith(f"{TEAMS_DIR}/"):
+        rel_out = rel_out.split("/", 2)[-1]
+    return SKILL_OUTPUT_PATTERN.fullmatch(rel_out) is not None
 
 
-def skill_matches_teams(skill_presets: list, target_teams: set, hierarchy: dict) -> bool:
-    """Check if a skill belongs to any of the target teams."""
-    if "all" in target_teams:
-        return True
-    
-    for preset in skill_presets:
-        # Direct match
-        if preset in target_teams:
-            return True
-        
-        # Check if any target team inherits from this preset
-        teams_for_preset = get_teams_for_preset(preset, hierarchy)
-        if teams_for_preset & target_teams:
-            return True
-        
-        # Check if this skill's preset is a parent of target teams
-        for target in target_teams:
-            resolved = resolve_team_presets(target, hierarchy)
-            if preset in resolved:
-                return True
-    
-    return False
+def copy_output(src_file: Path, out_tree: DirectoryTree, rel_out: str, manifest: BuildManifest = None):
+    """Copy a src/ file verbatim to dist/, skipping it if unchanged."""
+    source = manifest.rel_src(src_file) if manifest is not None else None
+    if manifest is not None and manifest.is_fresh(rel_out, source):
+        return
+    written = out_tree.copy(src_file, rel_out)
+    if manifest is not None:
+        data = src_file.read_bytes()
+        count_io(read=len(data))
+        manifest.record(rel_out, source, (), data, written)
 
 
-def remap_legacy_path(legacy_path: str) -> str:
-    """Remap legacy include paths to new structure."""
-    legacy_path = legacy_path.strip()
-    # _meta/_skills/sections/X.md -> partials/X.md
-    if "_meta/_skills/sections/" in legacy_path:
-        filename = legacy_path.split("/")[-1]
-        return f"partials/{filename}"
-    return legacy_path
+def copy_tree_output(src_tree: Path, out_tree: DirectoryTree, rel_out_dir: str, manifest: BuildManifest = None):
+    """Copy a src/ directory tree file by file (the incremental copytree)."""
+    for src_file in sorted(src_tree.rglob("*")):
+        if src_file.is_file():
+            rel_out = f"{rel_out_dir}/{src_file.relative_to(src_tree).as_posix()}"
+            copy_output(src_file, out_tree, rel_out, manifest)
 
 
-def process_includes(content: str, src_dir: Path, file_path: Path) -> str:
-    """Replace include directives with file contents."""
-    
-    def replace_new_include(match):
-        include_path = match.group(1).strip()
-        full_path = src_dir / include_path
-        
-        if not full_path.exists():
-            print(f"  ⚠️  Include not found: {include_path} (in {file_path})")
-            return f"<!-- ERROR: Include not found: {include_path} -->"
-        
-        include_content = full_path.read_text()
-        # Recursively process includes in included files
-        include_content = process_includes(include_content, src_dir, full_path)
-        return include_content
-    
-    def replace_legacy_include(match):
-        legacy_path = match.group(1).strip()
-        include_path = remap_legacy_path(legacy_path)
-        full_path = src_dir / include_path
-        
-        if not full_path.exists():
-            print(f"  ⚠️  Legacy include not found: {legacy_path} -> {include_path} (in {file_path})")
-            return f"<!-- ERROR: Include not found: {legacy_path} -->"
-        
-        include_content = full_path.read_text()
-        include_content = process_includes(include_content, src_dir, full_path)
-        return include_content
-    
-    # Process both patterns
-    content = INCLUDE_PATTERN.sub(replace_new_include, content)
-    content = LEGACY_INCLUDE_PATTERN.sub(replace_legacy_include, content)
+def write_hoisted_rules(src_dir: Path, out_tree: DirectoryTree, manifest: BuildManifest, prefix: str = "",
+                        cache: IncludeCache = None) -> int:
+    """Write <prefix>rules/PARTIAL_*.md for every partial hoisted by the manifest."""
+    for partial, count in sorted(manifest.hoist.items()):
+        name = hoist_rule_name(partial)
+        header = [
+            "---",
+            "trigger: model_decision",
+            f"description: Section shared by {count} skills ({partial}). Apply when a skill refers to @{name}.",
+            "---",
+            "",
+        ]
+        deps = set()
+        content, lines = render_includes(read_source(src_dir / partial), src_dir, src_dir / partial, deps, cache)
+        write_output(out_tree, f"{prefix}rules/{name}.md", "\n".join(header) + "\n" + content, partial, deps,
+                     manifest, compact_source_map([None] * len(header) + lines))
+    return len(manifest.hoist)
+
+
+def select_skills(src_dir: Path, names: list, with_neighbors: bool = False) -> set:
+    """
+    Skills built by --skill: `names`, plus with `with_neighbors` the skills
+    their HANDOFF_FIELDS name (one hop; the handoff graph is connected, so
+    following it further would select nearly everything).
+    Raises ValueError for unknown skills.
+    """
+    skill_dirs = {skill_dir.name: skill_dir for skill_dir, _ in find_skill_dirs(src_dir / "skills")
+                  if (skill_dir / "SKILL.md").exists()}
+    unknown = sorted(set(names) - set(skill_dirs))
+    if unknown:
+        raise ValueError(f"Unknown skill(s): {', '.join(unknown)}")
     
-    return content
+    selected = set(names)
+    if with_neighbors:
+        for name in names:
+            frontmatter = parse_frontmatter(read_source(skill_dirs[name] / "SKILL.md"))
+            for field in HANDOFF_FIELDS:
+                selected.update(neighbor for neighbor in normalize_skill_list(frontmatter.get(field) or [])
+                                if neighbor in skill_dirs)
+    return selected
 
 
-def build_skills(src_dir: Path, dist_dir: Path, target_teams: set = None, hierarchy: dict = None):
-    """Build skills from src/ to dist/skills/."""
+def build_skills(src_dir: Path, out_tree: DirectoryTree, target_teams: set = None, hierarchy: dict = None,
+                 manifest: BuildManifest = None, cache: IncludeCache = None, jobs: int = 1,
+                 shard: tuple = None, only: set = None):
+    """
+    Build skills from src/ to dist/skills/ (only those of `shard`, an (i, N)
+    pair, and only the skills named in `only`, if given).
+    """
     src_skills = src_dir / "skills"
-    dist_skills = dist_dir / "skills"
     
     if not src_skills.exists():
         print("  ⚠️  No src/skills/ directory")
         return 0, 0
     
-    dist_skills.mkdir(parents=True, exist_ok=True)
-    count = 0
     skipped = 0
+    profile = active_profile()
+    if cache is None:
+        cache = IncludeCache()
     
     # Process all skill directories (including private/*)
-    skill_dirs = []
-    
-    for item in src_skills.iterdir():
-        if not item.is_dir():
-            continue
-        if item.name == "private":
-            # Add private skills as top-level
-            for private_skill in item.iterdir():
-                if private_skill.is_dir():
-                    skill_dirs.append((private_skill, True))
-        else:
-            skill_dirs.append((item, False))
-    
-    for skill_dir, is_private in skill_dirs:
-        skill_name = skill_dir.name
+    selected = []
+    for skill_dir, is_private in find_skill_dirs(src_skills):
         skill_md = skill_dir / "SKILL.md"
         
         if not skill_md.exists():
             continue
         
-        # Read and parse frontmatter
-        content = skill_md.read_text()
-        frontmatter = parse_frontmatter(content)
-        skill_presets = frontmatter.get("presets", [])
+        if shard and shard_of(skill_dir.name, shard[1]) != shard[0]:
+            skipped += 1
+            continue
+        if only is not None and skill_dir.name not in only:
+            skipped += 1
+            continue
+        
+        # Presets from the frontmatter alone; the body is read only if rendered
+        started = time.perf_counter()
+        skill_presets, head = read_skill_presets(skill_md)
+        if profile is not None:
+            profile.add_skill(skill_dir.name, "frontmatter", time.perf_counter() - started)
         
         # Filter by team if specified
         if target_teams and hierarchy:
@@ -205,71 +264,118 @@ def build_skills(src_dir: Path, dist_dir: Path, target_teams: set = None, hierar
                 skipped += 1
                 continue
         
-        # Process includes
-        processed = process_includes(content, src_dir, skill_md)
-        
-        # Write to dist (private skills go to top-level, not private/)
-        dist_skill_dir = dist_skills / skill_name
-        dist_skill_dir.mkdir(parents=True, exist_ok=True)
-        (dist_skill_dir / "SKILL.md").write_text(processed)
-        
-        # Copy examples if exist
-        examples_dir = skill_dir / "examples"
-        if examples_dir.exists():
-            shutil.copytree(examples_dir, dist_skill_dir / "examples", dirs_exist_ok=True)
+        # Private skills go to top-level, not private/
+        rel_skill_md = f"skills/{skill_dir.name}/SKILL.md"
+        source = manifest.rel_src(skill_md) if manifest is not None else None
+        stale = manifest is None or not manifest.is_fresh(rel_skill_md, source)
+        cached = manifest.cached_render(source) if stale and manifest is not None else None
+        if cached is not None:
+            cached = RenderedSkill(*cached, "", 0.0, 0, 0)
+        content = read_source_rest(skill_md, head) if stale and cached is None else None
+        selected.append((skill_dir, is_private, skill_presets, stale, content, cached))
+    
+    # Process includes (in a process pool with --jobs); build cache hits skip it
+    tasks = [(skill_dir / "SKILL.md", content) for skill_dir, _, _, _, content, _ in selected
+             if content is not None]
+    rendered = iter(render_skills(tasks, src_dir, cache, jobs))
+    
+    for skill_dir, is_private, skill_presets, stale, content, cached in selected:
+        skill_name = skill_dir.name
         
-        # Copy references if exist
-        references_dir = skill_dir / "references"
-        if references_dir.exists():
-            shutil.copytree(references_dir, dist_skill_dir / "references", dirs_exist_ok=True)
+        if stale:
+            result = cached if cached is not None else next(rendered)
+            print(result.log, end="")
+            started = time.perf_counter()
+            source = manifest.rel_src(skill_dir / "SKILL.md") if manifest is not None else None
+            if cached is None and manifest is not None:
+                manifest.cache_render(source, result.content, result.deps, result.source_map)
+            write_output(out_tree, f"skills/{skill_name}/SKILL.md", result.content, source,
+                         result.deps | {HIERARCHY_INPUT}, manifest, result.source_map)
+            if profile is not None:
+                profile.add_skill(skill_name, "includes", result.seconds)
+                profile.add_skill(skill_name, "write", time.perf_counter() - started,
+                                  len(result.content.encode()))
         
-        # Copy resources if exist
-        resources_dir = skill_dir / "resources"
-        if resources_dir.exists():
-            shutil.copytree(resources_dir, dist_skill_dir / "resources", dirs_exist_ok=True)
+        # Copy examples, references and resources if exist
+        started = time.perf_counter()
+        for asset_dir_name in ("examples", "references", "resources"):
+            asset_dir = skill_dir / asset_dir_name
+            if asset_dir.exists():
+                copy_tree_output(asset_dir, out_tree, f"skills/{skill_name}/{asset_dir_name}", manifest)
+        if profile is not None:
+            profile.add_skill(skill_name, "assets", time.perf_counter() - started)
         
-        count += 1
         marker = "🔒" if is_private else "✅"
         presets_str = f" [{', '.join(skill_presets)}]" if skill_presets else ""
         print(f"  {marker} {skill_name}{presets_str}")
     
-    return count, skipped
+    return len(selected), skipped
 
-def build_rules(src_dir: Path, dist_dir: Path, target_team: str = None):
+
+def build_rules(src_dir: Path, out_tree: DirectoryTree, target_team: str = None, manifest: BuildManifest = None,
+                cache: IncludeCache = None):
     """Build rules from src/ to dist/rules/."""
     src_rules = src_dir / "rules"
-    dist_rules = dist_dir / "rules"
     
     if not src_rules.exists():
         print("  ⚠️  No src/rules/ directory")
         return 0
     
-    dist_rules.mkdir(parents=True, exist_ok=True)
     count = 0
     
     for rule_file in src_rules.glob("*.md"):
-        content = rule_file.read_text()
-        processed = process_includes(content, src_dir, rule_file)
-        (dist_rules / rule_file.name).write_text(processed)
+        build_document(rule_file, src_dir, out_tree, f"rules/{rule_file.name}", manifest, cache)
         count += 1
         print(f"  ✅ {rule_file.name}")
     
     # Copy team-specific TEAM and PIPELINE files
     team_name = target_team if target_team else "all"
-    team_count = build_team_rules(src_dir, dist_rules, team_name)
+    with profiled("team_rules"):
+        team_count = build_team_rules(src_dir, out_tree, team_name, manifest)
     
     return count + team_count
 
 
-def build_team_rules(src_dir: Path, dist_rules: Path, team_name: str):
-    """Copy TEAM_*.md and PIPELINE_*.md for the target team to rules/."""
+def build_document(src_file: Path, src_dir: Path, out_tree: DirectoryTree, rel_out: str,
+                   manifest: BuildManifest = None, cache: IncludeCache = None, inputs=()):
+    """
+    Render a single file with includes to dist/, skipping it if unchanged.
+    Files without directives (sniffed on the raw bytes) and binary files are
+    copied verbatim without being decoded. `inputs` are extra src/ paths the
+    output depends on (e.g. the preset hierarchy).
+    """
+    source = manifest.rel_src(src_file) if manifest is not None else None
+    if manifest is not None and manifest.is_fresh(rel_out, source):
+        return
+    data = src_file.read_bytes()
+    count_io(read=len(data))
+    # Text mode turns CRLF into LF, so only LF-only text may skip decoding
+    if (not has_directives(data) and b"\r" not in data) or is_binary(data):
+        written = out_tree.copy(src_file, rel_out)
+        if manifest is not None:
+            manifest.record(rel_out, source, inputs, data, written)
+        return
+    cached = manifest.cached_render(source) if manifest is not None else None
+    if cached is not None:
+        processed, deps, source_map = cached
+    else:
+        deps = set()
+        processed, lines = render_includes(decode_source(data), src_dir, src_file, deps, cache)
+        source_map = compact_source_map(lines)
+        if manifest is not None:
+            manifest.cache_render(source, processed, deps, source_map)
+    write_output(out_tree, rel_out, processed, source, set(deps) | set(inputs), manifest, source_map)
+
+
+def build_team_rules(src_dir: Path, out_tree: DirectoryTree, team_name: str, manifest: BuildManifest = None,
+                     prefix: str = ""):
+    """Copy TEAM_*.md and PIPELINE_*.md for the target team to <prefix>rules/."""
     count = 0
     
     # TEAM file
     team_file = src_dir / "_meta" / "teams" / f"TEAM_{team_name}.md"
     if team_file.exists():
-        content = team_file.read_text()
-        (dist_rules / "TEAM.md").write_text(content)
+        copy_output(team_file, out_tree, f"{prefix}rules/TEAM.md", manifest)
         count += 1
         print(f"  📋 TEAM.md (from {team_name})")
     else:
@@ -278,8 +384,7 @@ def build_team_rules(src_dir: Path, dist_rules: Path, team_name: str):
     # PIPELINE file
     pipeline_file = src_dir / "_meta" / "pipelines" / f"PIPELINE_{team_name}.md"
     if pipeline_file.exists():
-        content = pipeline_file.read_text()
-        (dist_rules / "PIPELINE.md").write_text(content)
+        copy_output(pipeline_file, out_tree, f"{prefix}rules/PIPELINE.md", manifest)
         count += 1
         print(f"  🔀 PIPELINE.md (from {team_name})")
     else:
@@ -287,83 +392,669 @@ def build_team_rules(src_dir: Path, dist_rules: Path, team_name: str):
     
     return count
 
-def build_workflows(src_dir: Path, dist_dir: Path):
+
+def build_selection_rules(src_dir: Path, out_tree: DirectoryTree, skills: set, manifest: BuildManifest = None):
+    """Generate rules/TEAM.md and rules/PIPELINE.md for a --skill selection, as for a preset."""
+    names = sorted(skills)
+    description = f"Skills selected with --skill: {', '.join(names)}"
+    inputs = {manifest.rel_src(skill_dir / "SKILL.md") for skill_dir, _ in find_skill_dirs(src_dir / "skills")
+              if skill_dir.name in skills} if manifest is not None else ()
+    
+    team = render_team_file(SELECTION_NAME, names, src_dir / "skills", description)
+    write_output(out_tree, "rules/TEAM.md", team, "skills", inputs, manifest)
+    print(f"  📋 TEAM.md ({len(names)} skills)")
+    
+    pipeline, handoffs = render_pipeline_file(SELECTION_NAME, names, build_skill_matrix(src_dir / "skills"),
+                                              description)
+    write_output(out_tree, "rules/PIPELINE.md", pipeline, "skills", inputs, manifest)
+    print(f"  🔀 PIPELINE.md ({handoffs} handoffs)")
+    return 2
+
+
+def build_workflows(src_dir: Path, out_tree: DirectoryTree, manifest: BuildManifest = None, cache: IncludeCache = None):
     """Build workflows from src/ to dist/workflows/."""
     src_workflows = src_dir / "workflows"
-    dist_workflows = dist_dir / "workflows"
     
     if not src_workflows.exists():
         print("  ⚠️  No src/workflows/ directory")
         return 0
     
-    dist_workflows.mkdir(parents=True, exist_ok=True)
     count = 0
     
     for wf_file in src_workflows.glob("*.md"):
-        content = wf_file.read_text()
-        processed = process_includes(content, src_dir, wf_file)
-        (dist_workflows / wf_file.name).write_text(processed)
+        build_document(wf_file, src_dir, out_tree, f"workflows/{wf_file.name}", manifest, cache)
         count += 1
         print(f"  ✅ {wf_file.name}")
     
     return count
 
-def build_templates(src_dir: Path, dist_dir: Path):
+
+def build_templates(src_dir: Path, out_tree: DirectoryTree, manifest: BuildManifest = None, cache: IncludeCache = None):
     """Copy templates to dist/docs/templates/."""
     src_templates = src_dir / "templates" / "documents"
-    dist_templates = dist_dir / "docs" / "templates"
     
     if not src_templates.exists():
         print("  ⚠️  No src/templates/documents/ directory")
         return 0
     
-    dist_templates.mkdir(parents=True, exist_ok=True)
     count = 0
     
     for template_file in src_templates.iterdir():
         if template_file.is_file():
-            content = template_file.read_text()
-            processed = process_includes(content, src_dir, template_file)
-            (dist_templates / template_file.name).write_text(processed)
+            build_document(template_file, src_dir, out_tree, f"docs/templates/{template_file.name}", manifest, cache)
             count += 1
     
     print(f"  ✅ {count} document templates")
     
     # Copy folder-structure template
     src_folder_struct = src_dir / "templates" / "folder-structure"
-    dist_folder_struct = dist_dir / "docs" / "folder-structure"
     
     if src_folder_struct.exists():
-        shutil.copytree(src_folder_struct, dist_folder_struct, dirs_exist_ok=True)
+        copy_tree_output(src_folder_struct, out_tree, "docs/folder-structure", manifest)
         print(f"  ✅ folder-structure template")
     
     return count
 
-def build_configs(src_dir: Path, dist_dir: Path):
+
+def build_configs(src_dir: Path, out_tree: DirectoryTree, manifest: BuildManifest = None):
     """Copy configs from src/ to dist/configs/."""
     src_configs = src_dir / "configs"
-    dist_configs = dist_dir / "configs"
     
     if not src_configs.exists():
         return 0
     
-    dist_configs.mkdir(parents=True, exist_ok=True)
     count = 0
     
     for config_file in src_configs.iterdir():
         if config_file.is_file():
-            shutil.copy2(config_file, dist_configs / config_file.name)
+            copy_output(config_file, out_tree, f"configs/{config_file.name}", manifest)
             count += 1
             print(f"  ✅ {config_file.name}")
     
     return count
 
 
-def clean_dist(dist_dir: Path):
-    """Remove dist/ directory."""
-    if dist_dir.exists():
-        shutil.rmtree(dist_dir)
-        print("🗑️  Cleaned dist/")
+def rebuild_affected(src_dir: Path, out_tree: DirectoryTree, changed: list, graph: IncludeGraph,
+                     manifest: BuildManifest, cache: IncludeCache = None) -> list:
+    """
+    Re-render exactly the outputs of the previous build that depend on any of
+    the `changed` src/ paths. All other outputs are kept as they are.
+    """
+    affected_sources = set()
+    for rel_path in changed:
+        affected_sources |= graph.dependents(rel_path)
+    
+    rebuilt = []
+    for rel_out, entry in sorted(manifest.previous.items()):
+        source = entry["source"]
+        if source not in affected_sources:
+            continue
+        src_file = src_dir / source
+        if not src_file.is_file():
+            continue
+        if source in graph.forward:
+            # Keep the extra inputs (e.g. preset hierarchy) recorded for this output
+            extra = {p for p in entry["inputs"] if p == HIERARCHY_INPUT}
+            build_document(src_file, src_dir, out_tree, rel_out, manifest, cache, extra)
+        else:
+            copy_output(src_file, out_tree, rel_out, manifest)
+        rebuilt.append(rel_out)
+        print(f"  ✅ {rel_out}")
+    
+    manifest.carry_over()
+    return rebuilt
+
+
+def run_phases(phases: list) -> list:
+    """
+    Run (header, name, fn) build phases concurrently on one thread pool and
+    return their results in order. Each phase's prints are buffered and
+    replayed under its header, so the log reads as if the phases had run one
+    after another; the wall time of every phase is printed last.
+    """
+    def run(name, fn):
+        log = io.StringIO()
+        started = time.perf_counter()
+        with capture_output(log), profiled(name):
+            result = fn()
+        return result, log.getvalue(), time.perf_counter() - started
+    
+    started = time.perf_counter()
+    with contextlib.redirect_stdout(RoutedStdout(sys.stdout)):
+        with ThreadPoolExecutor(max_workers=len(phases)) as executor:
+            futures = [executor.submit(run, name, fn) for _, name, fn in phases]
+            outcomes = [future.result() for future in futures]
+    elapsed = time.perf_counter() - started
+    
+    for (header, _, _), (_, log, _) in zip(phases, outcomes):
+        print(header)
+        print(log, end="")
+    timings = ", ".join(f"{name} {seconds * 1000:.1f} ms"
+                        for (_, name, _), (_, _, seconds) in zip(phases, outcomes))
+    print(f"\n⏱️  Phases: {timings} ({elapsed * 1000:.1f} ms wall)")
+    return [result for result, _, _ in outcomes]
+
+
+def build_tree(src_dir: Path, out_tree: DirectoryTree, hierarchy: dict, manifest: BuildManifest,
+               target_teams: set = None, cache: IncludeCache = None, all_teams: bool = False,
+               jobs: int = 1, skills: set = None, hoist_threshold: int = None) -> dict:
+    """
+    Run every build phase into out_tree and return the summary counts. With
+    `skills` (--skill), only those skills and their TEAM.md / PIPELINE.md.
+    Partials hoisted by the manifest are written as rules after the phases;
+    `hoist_threshold` plans the hoisting of each --all-teams bundle.
+    """
+    if cache is None:
+        cache = IncludeCache()
+    
+    # For rules, pass the target team (use first if multiple, or None for "all")
+    target_team = list(target_teams)[0] if target_teams and len(target_teams) == 1 else None
+    
+    # The phases write disjoint parts of the tree, so they run side by side;
+    # skill include expansion goes to the --jobs process pool
+    phases = [
+        ("📦 Building skills...", "skills",
+         lambda: build_skills(src_dir, out_tree, target_teams, hierarchy, manifest, cache, jobs,
+                              manifest.shard, skills)),
+        ("\n📜 Building rules...", "rules",
+         lambda: build_rules(src_dir, out_tree, target_team, manifest, cache)),
+        ("\n⚡ Building workflows...", "workflows",
+         lambda: build_workflows(src_dir, out_tree, manifest, cache)),
+        ("\n📄 Building templates...", "templates",
+         lambda: build_templates(src_dir, out_tree, manifest, cache)),
+        ("\n⚙️  Building configs...", "configs",
+         lambda: build_configs(src_dir, out_tree, manifest)),
+    ]
+    if skills is not None:
+        phases[1:] = [("\n📜 Building rules...", "rules",
+                       lambda: build_selection_rules(src_dir, out_tree, skills, manifest))]
+    results = run_phases(phases) + [0] * (5 - len(phases))
+    (skills_count, skills_skipped), rules_count, workflows_count, templates_count, configs_count = results
+    
+    if manifest.hoist is not None:
+        with profiled("hoist"):
+            rules_count += write_hoisted_rules(src_dir, out_tree, manifest, cache=cache)
+        print("")
+        print_hoist_report(manifest.hoist, manifest.outputs)
+    if manifest.minify:
+        print_minify_report(manifest.outputs)
+    
+    # Outputs whose sources are gone are simply not in the new tree
+    removed = manifest.removed()
+    with profiled("manifest"):
+        manifest.save()
+        write_index(out_tree, manifest.outputs)
+    if manifest.build_cache is not None:
+        with profiled("build_cache"):
+            manifest.build_cache.flush()
+    
+    # Team bundles share the files rendered above
+    if all_teams:
+        print("\n👥 Linking team bundles...")
+        teams = sorted(team for team in hierarchy if team != "all")
+        with profiled("team_bundles"):
+            build_team_bundles(src_dir, out_tree, teams, hierarchy, manifest, hoist_threshold)
+    
+    return {
+        "skills": skills_count,
+        "skipped": skills_skipped,
+        "rules": rules_count,
+        "workflows": workflows_count,
+        "templates": templates_count,
+        "configs": configs_count,
+        "written": manifest.written,
+        "unchanged": manifest.unchanged,
+        "removed": len(removed),
+    }
+
+
+def run_build(src_dir: Path, dist_dir: Path, hierarchy: dict, target_teams: set = None,
+              cache: IncludeCache = None, all_teams: bool = False, clean: bool = False,
+              jobs: int = 1, build_cache: BuildCache = None, shard: tuple = None,
+              skills: set = None, minify: bool = False, hoist_threshold: int = None) -> dict:
+    """
+    Build src/ into dist/ and return the summary counts.
+    
+    The build is written into a sibling staging tree and swapped in when
+    done, so readers of dist/ never see a half-built tree. Unchanged outputs
+    are hardlinked from the previous dist/ (incremental build via the
+    manifest) and renders are looked up in `build_cache`, unless `clean` is
+    set.
+    """
+    hoist = (plan_hoisting(src_dir, hoist_threshold, hierarchy, target_teams, skills)
+             if hoist_threshold is not None else None)
+    previous = {} if clean else BuildManifest.load_outputs(dist_dir, minify, hoist)
+    if clean:
+        build_cache = None
+        print("🧹 Clean build: not reusing previous dist/ or the build cache\n")
+    staging_dir = staging_dir_for(dist_dir)
+    if staging_dir.exists():
+        shutil.rmtree(staging_dir)
+    staging_dir.mkdir(parents=True)
+    out_tree = DirectoryTree(staging_dir, prev_root=None if clean else dist_dir)
+    manifest = BuildManifest(src_dir, out_tree, previous, prev_dir=dist_dir, build_cache=build_cache,
+                             shard=shard, minify=minify, hoist=hoist)
+    live_teams = sorted(d.name for d in (dist_dir / TEAMS_DIR).glob("*") if d.name in hierarchy)
+    
+    stats = build_tree(src_dir, out_tree, hierarchy, manifest, target_teams, cache, all_teams, jobs,
+                       skills, hoist_threshold)
+    
+    # A plain build drops stale team bundles
+    if live_teams and not all_teams:
+        print("\n🗑️  Dropping stale dist/teams/")
+    
+    with profiled("swap"):
+        swap_into_place(staging_dir, dist_dir)
+    
+    return stats
+
+
+def run_archive(src_dir: Path, archive_path: Path, hierarchy: dict, target_teams: set = None,
+                cache: IncludeCache = None, all_teams: bool = False, jobs: int = 1,
+                build_cache: BuildCache = None, shard: tuple = None, skills: set = None,
+                minify: bool = False, hoist_threshold: int = None) -> dict:
+    """
+    Build src/ in memory and stream it into a reproducible archive; no
+    dist/ tree is written. Returns the summary counts plus the archive path.
+    """
+    out_tree = VirtualTree()
+    hoist = (plan_hoisting(src_dir, hoist_threshold, hierarchy, target_teams, skills)
+             if hoist_threshold is not None else None)
+    manifest = BuildManifest(src_dir, out_tree, build_cache=build_cache, shard=shard, minify=minify,
+                             hoist=hoist)
+    stats = build_tree(src_dir, out_tree, hierarchy, manifest, target_teams, cache, all_teams, jobs,
+                       skills, hoist_threshold)
+    
+    with profiled("archive"):
+        stats["archive"] = write_archive(out_tree, archive_path)
+    stats["entries"] = len(out_tree)
+    return stats
+
+
+def build(src_dir: Path, teams=None, all_teams: bool = False, jobs: int = 1,
+          build_cache: BuildCache = None, shard=None, minify: bool = False) -> VirtualTree:
+    """
+    Build src/ in memory and return the output tree, so validators and
+    generators can read rendered files without a dist/ round-trip.
+    
+    `teams` is a team name, a comma-separated string or an iterable of
+    names (None builds everything). `shard` ("i/N" or an (i, N) pair)
+    keeps only that shard's skills; `minify` compacts the SKILL.md files
+    as --minify does. Pass a BuildCache to reuse renders
+    from other builds. Progress output is suppressed.
+    Raises ValueError for unknown teams, bad shards or include cycles.
+    
+        from build import build
+        tree = build("src", "backend")
+        tree.read_text("skills/backend-go-expert/SKILL.md")
+    """
+    src_dir = Path(src_dir).resolve()
+    hierarchy = load_preset_hierarchy(src_dir)
+    if isinstance(teams, str):
+        teams = [t.strip() for t in teams.split(",")]
+    target_teams = set(teams) if teams else None
+    unknown = sorted(t for t in target_teams or () if t not in hierarchy and t != "all")
+    if unknown:
+        raise ValueError(f"Unknown team(s): {', '.join(unknown)}")
+    if isinstance(shard, str):
+        shard = parse_shard(shard)
+    
+    cache = IncludeCache()
+    out_tree = VirtualTree()
+    with contextlib.redirect_stdout(io.StringIO()):
+        graph = IncludeGraph.scan(src_dir, cache=cache)
+        cycles = graph.find_cycles()
+        if cycles:
+            raise ValueError(f"Include cycle: {' -> '.join(cycles[0])}")
+        manifest = BuildManifest(src_dir, out_tree, build_cache=build_cache, shard=shard, minify=minify)
+        build_tree(src_dir, out_tree, hierarchy, manifest, target_teams, cache, all_teams, jobs)
+    return out_tree
+
+
+def run_dry_run(src_dir: Path, dist_dir: Path, hierarchy: dict, target_teams: set = None,
+                cache: IncludeCache = None, all_teams: bool = False, clean: bool = False,
+                jobs: int = 1, shard: tuple = None, skills: set = None, minify: bool = False,
+                hoist_threshold: int = None) -> dict:
+    """
+    Build in memory and compare the result with dist/ without writing
+    anything. Outputs whose manifest hash matches the previous build are
+    unchanged without being read (fresh ones are not even rendered); only
+    the rest are hashed against the files in dist/.
+    
+    Returns {"added", "changed", "removed": sorted paths, "unchanged": count,
+    "tree": the VirtualTree}.
+    """
+    hoist = (plan_hoisting(src_dir, hoist_threshold, hierarchy, target_teams, skills)
+             if hoist_threshold is not None else None)
+    previous = {} if clean else BuildManifest.load_outputs(dist_dir, minify, hoist)
+    out_tree = VirtualTree()
+    # No shared build cache: storing renders would write to disk
+    manifest = BuildManifest(src_dir, out_tree, previous, prev_dir=dist_dir, shard=shard, minify=minify,
+                             hoist=hoist)
+    with contextlib.redirect_stdout(io.StringIO()):
+        build_tree(src_dir, out_tree, hierarchy, manifest, target_teams, cache, all_teams, jobs, skills,
+                   hoist_threshold)
+    
+    existing = set()
+    if dist_dir.is_dir():
+        existing = {path.relative_to(dist_dir).as_posix() for path in dist_dir.rglob("*") if path.is_file()}
+    changes = {"added": [], "changed": [], "removed": sorted(existing - set(out_tree.files)),
+               "unchanged": 0, "tree": out_tree}
+    for rel_out in sorted(out_tree.files):
+        if rel_out not in existing:
+            changes["added"].append(rel_out)
+            continue
+        entry = manifest.outputs.get(out_tree.aliases.get(rel_out, rel_out))
+        new_hash = entry["hash"] if entry else hash_bytes(out_tree.read(rel_out))
+        old_hash = previous.get(rel_out, {}).get("hash")
+        if old_hash != new_hash:
+            data = (dist_dir / rel_out).read_bytes()
+            count_io(read=len(data))
+            old_hash = hash_bytes(data)
+        if old_hash == new_hash:
+            changes["unchanged"] += 1
+        else:
+            changes["changed"].append(rel_out)
+    return changes
+
+
+def unified_diff(rel_out: str, old: bytes = None, new: bytes = None) -> str:
+    """git-style unified diff of one output (None = file absent)."""
+    try:
+        old_lines = old.decode().splitlines(keepends=True) if old is not None else []
+        new_lines = new.decode().splitlines(keepends=True) if new is not None else []
+    except UnicodeDecodeError:
+        return f"Binary files a/{rel_out} and b/{rel_out} differ\n"
+    lines = difflib.unified_diff(
+        old_lines, new_lines,
+        fromfile=f"a/{rel_out}" if old is not None else "/dev/null",
+        tofile=f"b/{rel_out}" if new is not None else "/dev/null",
+    )
+    return "".join(line if line.endswith("\n") else line + "\n" for line in lines)
+
+
+def print_dry_run(changes: dict, dist_dir: Path, show_diff: bool = False):
+    """Print the --dry-run report (and with show_diff, the unified diff)."""
+    for kind, marker in (("added", "+"), ("changed", "~"), ("removed", "-")):
+        for rel_out in changes[kind]:
+            print(f"  {marker} {rel_out}")
+    
+    if show_diff:
+        tree = changes["tree"]
+        paths = sorted(changes["added"] + changes["changed"] + changes["removed"])
+        if paths:
+            print("")
+        for rel_out in paths:
+            old = (dist_dir / rel_out).read_bytes() if rel_out not in changes["added"] else None
+            new = tree.read(rel_out) if rel_out in tree else None
+            print(unified_diff(rel_out, old, new), end="")
+    
+    print(f"\n🔍 Dry run: {len(changes['added'])} added, {len(changes['changed'])} changed, "
+          f"{len(changes['removed'])} removed, {changes['unchanged']} unchanged (nothing written)")
+
+
+def run_merge(src_dir: Path, dist_dir: Path, shard_dirs: list, hierarchy: dict,
+              all_teams: bool = False) -> dict:
+    """
+    Combine the dist/ trees of `--shard i/N` builds into dist_dir: outputs
+    are hardlinked from the shards, their manifests merged and index.json
+    rewritten. Every shard 1..N of one N must be given exactly once, and
+    outputs that several shards built (rules, workflows, ...) must agree.
+    Raises ValueError otherwise. Returns the merged outputs per shard dir.
+    """
+    shards = {}
+    sources = {}
+    for shard_dir in shard_dirs:
+        try:
+            data = json.loads((shard_dir / MANIFEST_NAME).read_text())
+        except (OSError, ValueError):
+            raise ValueError(f"{shard_dir}: no build manifest")
+        if data.get("version") != MANIFEST_VERSION or data.get("builder") != BuildManifest.builder_hash():
+            raise ValueError(f"{shard_dir}: built by a different build.py")
+        if not data.get("shard"):
+            raise ValueError(f"{shard_dir}: not a --shard build")
+        index, count = data["shard"]
+        if (index, count) in shards:
+            raise ValueError(f"{shard_dir}: shard {index}/{count} given twice")
+        shards[(index, count)] = (shard_dir, data["outputs"], data.get("minify", False))
+        sources.update(data.get("sources", {}))
+    counts = {count for _, count in shards}
+    if len(counts) != 1 or len(shards) != next(iter(counts)):
+        have = ", ".join(f"{i}/{n}" for i, n in sorted(shards))
+        raise ValueError(f"Incomplete shard set: {have}")
+    modes = {minify for _, _, minify in shards.values()}
+    if len(modes) != 1:
+        raise ValueError("Shards were built with and without --minify")
+    
+    staging_dir = staging_dir_for(dist_dir)
+    if staging_dir.exists():
+        shutil.rmtree(staging_dir)
+    staging_dir.mkdir(parents=True)
+    out_tree = DirectoryTree(staging_dir, prev_root=dist_dir)
+    manifest = BuildManifest(src_dir, out_tree, minify=modes.pop())
+    # The merged manifest keeps the shards' input stamps for the next build's fast path
+    manifest.previous_sources = sources
+    merged = {}
+    for key in sorted(shards):
+        shard_dir, outputs, _ = shards[key]
+        merged[shard_dir] = 0
+        for rel_out, entry in sorted(outputs.items()):
+            if rel_out in manifest.outputs:
+                if manifest.outputs[rel_out]["hash"] != entry["hash"]:
+                    shutil.rmtree(staging_dir)
+                    raise ValueError(f"Shards disagree on {rel_out}")
+                continue
+            out_tree.link(shard_dir / rel_out, rel_out)
+            manifest.outputs[rel_out] = entry
+            merged[shard_dir] += 1
+    with profiled("manifest"):
+        manifest.save()
+        write_index(out_tree, manifest.outputs)
+    if all_teams:
+        teams = sorted(team for team in hierarchy if team != "all")
+        build_team_bundles(src_dir, out_tree, teams, hierarchy, manifest)
+    swap_into_place(staging_dir, dist_dir)
+    return merged
+
+
+def run_affected(src_dir: Path, dist_dir: Path, hierarchy: dict, changed: list,
+                 graph: IncludeGraph, cache: IncludeCache = None, minify: bool = False):
+    """
+    Staged rebuild of the outputs that depend on `changed`; everything else
+    is relinked from the current dist/. Returns the rebuilt outputs, or None
+    if there is no usable previous build to start from.
+    """
+    previous = BuildManifest.load_outputs(dist_dir, minify)
+    if not previous:
+        return None
+    staging_dir = staging_dir_for(dist_dir)
+    if staging_dir.exists():
+        shutil.rmtree(staging_dir)
+    staging_dir.mkdir(parents=True)
+    out_tree = DirectoryTree(staging_dir, prev_root=dist_dir)
+    manifest = BuildManifest(src_dir, out_tree, previous, prev_dir=dist_dir, minify=minify)
+    live_teams = sorted(d.name for d in (dist_dir / TEAMS_DIR).glob("*") if d.name in hierarchy)
+    
+    rebuilt = rebuild_affected(src_dir, out_tree, changed, graph, manifest, cache)
+    with profiled("manifest"):
+        manifest.save()
+        write_index(out_tree, manifest.outputs)
+    if live_teams:
+        with contextlib.redirect_stdout(io.StringIO()):
+            build_team_bundles(src_dir, out_tree, live_teams, hierarchy, manifest)
+    swap_into_place(staging_dir, dist_dir)
+    return rebuilt
+
+
+def build_team_bundles(src_dir: Path, out_tree: DirectoryTree, teams: list, hierarchy: dict,
+                       manifest: BuildManifest, hoist_threshold: int = None) -> dict:
+    """
+    Write teams/<team>/ for every team from one full build in out_tree.
+    
+    Shared files are aliases (hardlinks on disk) of the single rendered copy,
+    so time and disk use grow with the number of outputs, not outputs times
+    teams. Each team gets its own rules/TEAM.md, rules/PIPELINE.md and
+    index.json. With `hoist_threshold`, partials are hoisted per team: skills
+    whose hoisting differs from the full build are rendered for the team,
+    and the team gets its own rules/PARTIAL_*.md.
+    """
+    skill_presets = collect_skill_presets(src_dir)
+    team_rules = {"rules/TEAM.md", "rules/PIPELINE.md"}
+    linked = {}
+    
+    for team in teams:
+        prefix = f"{TEAMS_DIR}/{team}/"
+        selected = {name for name, presets in skill_presets.items()
+                    if skill_matches_teams(presets, {team}, hierarchy)}
+        team_hoist = (plan_hoisting(src_dir, hoist_threshold, hierarchy, {team})
+                      if hoist_threshold is not None else None)
+        team_manifest = BuildManifest(src_dir, out_tree, minify=manifest.minify, hoist=team_hoist)
+        entries = {}
+        for rel_out in sorted(manifest.outputs):
+            parts = rel_out.split("/")
+            if parts[0] == "skills" and parts[1] not in selected:
+                continue
+            if rel_out in team_rules or (team_hoist is not None and rel_out.startswith(f"rules/{HOIST_RULE_PREFIX}")):
+                continue
+            entry = manifest.outputs[rel_out]
+            if (team_hoist is not None and is_skill_output(rel_out)
+                    and set(entry["inputs"]) & set(manifest.hoist) != set(entry["inputs"]) & set(team_hoist)):
+                source = entry["source"]
+                deps = set()
+                content, lines = render_includes(read_source(src_dir / source), src_dir, src_dir / source, deps)
+                write_output(out_tree, prefix + rel_out, content, source, deps | {HIERARCHY_INPUT},
+                             team_manifest, compact_source_map(lines))
+                continue
+            out_tree.alias(rel_out, prefix + rel_out)
+            entries[rel_out] = entry
+        
+        print(f"  👥 {team}: {len(selected)} skills, {len(entries)} shared files")
+        if team_hoist is not None:
+            write_hoisted_rules(src_dir, out_tree, team_manifest, prefix)
+        build_team_rules(src_dir, out_tree, team, team_manifest, prefix=prefix)
+        entries.update({rel_out[len(prefix):]: entry for rel_out, entry in team_manifest.outputs.items()})
+        if team_hoist is not None:
+            print_hoist_report(team_hoist, entries, indent="     ")
+        write_index(out_tree, entries, prefix)
+        linked[team] = len(entries)
+    
+    return linked
+
+
+def run_delta(src_dir: Path, old_manifest: Path, archive_path: Path, hierarchy: dict,
+              target_teams: set = None, cache: IncludeCache = None, jobs: int = 1,
+              build_cache: BuildCache = None, minify: bool = False) -> dict:
+    """
+    Build src/ in memory and write a patch bundle (delta_bundle()) against
+    the build described by `old_manifest` (the .build-manifest.json of a
+    released dist/). The manifest itself is not shipped; keep it to build
+    the next delta. Returns the summary counts plus the delta. Raises
+    ValueError for a bad old manifest.
+    """
+    old_data, old_outputs = read_base_manifest(old_manifest)
+    
+    out_tree = VirtualTree()
+    manifest = BuildManifest(src_dir, out_tree, build_cache=build_cache, minify=minify)
+    stats = build_tree(src_dir, out_tree, hierarchy, manifest, target_teams, cache, jobs=jobs)
+    bundle, delta = delta_bundle(old_data, old_outputs, out_tree, manifest.outputs, BuildManifest.builder_hash())
+    
+    with profiled("archive"):
+        stats["archive"] = write_archive(bundle, archive_path)
+    stats["entries"] = len(bundle)
+    stats["delta"] = delta
+    stats["full_bytes"] = sum(entry["size"] for entry in manifest.outputs.values())
+    return stats
+
+
+def watch(src_dir: Path, dist_dir: Path, hierarchy: dict, target_teams: set, graph: IncludeGraph,
+          cache: IncludeCache, all_teams: bool = False, jobs: int = 1, poll: bool = False,
+          build_cache: BuildCache = None, minify: bool = False):
+    """
+    Rebuild dist/ on every change under src/ until interrupted.
+    
+    Edits to files in the include graph re-render only their dependents (the
+    edited skill, or every includer of an edited partial). Anything else
+    (new or deleted files, assets, _meta/) runs an incremental full build.
+    """
+    watcher = None if poll else InotifyWatcher.create(src_dir)
+    kind = "inotify" if watcher is not None else "polling"
+    if watcher is None:
+        watcher = PollingWatcher(src_dir)
+    print(f"\n👀 Watching {src_dir} ({kind}). Press Ctrl+C to stop.")
+    
+    try:
+        while True:
+            changed = wait_for_changes(watcher)
+            started = time.perf_counter()
+            log = io.StringIO()
+            
+            targeted = WATCH_ALL not in changed and all(
+                path in graph.forward and (src_dir / path).is_file() for path in changed
+            )
+            # With a team filter a SKILL.md edit may move the skill in or out of the team
+            if target_teams and any(path.startswith("skills/") for path in changed):
+                targeted = False
+            
+            with contextlib.redirect_stdout(log):
+                if targeted:
+                    affected = set().union(*(graph.dependents(path) for path in changed))
+                    cache.invalidate(src_dir / path for path in affected)
+                    graph.rescan(src_dir, changed, cache)
+                    ok = check_include_graph(graph, cache)
+                    rebuilt = (run_affected(src_dir, dist_dir, hierarchy, sorted(changed), graph, cache, minify)
+                               if ok else None)
+                    summary = f"{len(rebuilt)} output(s) rebuilt" if rebuilt is not None else None
+                if not targeted or (ok and rebuilt is None):
+                    cache = IncludeCache()
+                    graph = IncludeGraph.scan(src_dir, cache=cache)
+                    ok = check_include_graph(graph, cache)
+                    if ok:
+                        stats = run_build(src_dir, dist_dir, hierarchy, target_teams, cache,
+                                          all_teams=all_teams, jobs=jobs, build_cache=build_cache,
+                                          minify=minify)
+                        summary = (f"{stats['written']} written, {stats['removed']} removed "
+                                   f"(incremental full build)")
+            
+            # Surface only problems from the captured build log
+            problems = dict.fromkeys(line for line in log.getvalue().splitlines() if "⚠️" in line or "❌" in line)
+            for line in problems:
+                print(line)
+            
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            shown = ", ".join(sorted(changed - {WATCH_ALL})) or "src/"
+            if ok:
+                print(f"⚡ {time.strftime('%H:%M:%S')} {shown}: {summary} in {elapsed_ms:.1f} ms")
+            else:
+                print(f"❌ {time.strftime('%H:%M:%S')} {shown}: include cycle, dist/ left unchanged")
+    except KeyboardInterrupt:
+        print("\n👋 Stopped watching")
+    finally:
+        watcher.close()
+
+
+def write_profile(report_path: Path, report: dict):
+    """Write the --profile report and print the per-phase breakdown."""
+    write_if_changed(report_path, json.dumps(report, indent=2) + "\n")
+    print(f"\n📊 Profile ({report['total_seconds'] * 1000:.1f} ms total) → {report_path}")
+    for name, data in report["phases"].items():
+        print(f"   {name:<14} {data['seconds'] * 1000:8.1f} ms  "
+              f"{data['bytes_read']:>10} B read  {data['bytes_written']:>10} B written")
+    cache_stats = report["include_cache"]
+    print(f"   include cache: {cache_stats['hits']} hits, {cache_stats['misses']} misses")
+    cache_stats = report["build_cache"]
+    print(f"   build cache:   {cache_stats['hits']} hits, {cache_stats['misses']} misses")
+
+
+def print_cache_stats(build_cache: BuildCache):
+    """Print the --cache-stats summary of the shared build cache."""
+    summary = build_cache.summary()
+    lookups = summary["hits"] + summary["misses"]
+    hit_rate = f" ({summary['hits'] * 100 / lookups:.0f}% hit rate)" if lookups else ""
+    print(f"\n🗄️  Build cache: {summary['root']}")
+    print(f"   Entries:  {summary['objects']} rendered outputs, {summary['sources']} sources")
+    print(f"   Size:     {summary['bytes'] / 1048576:.1f} MiB of {summary['max_bytes'] / 1048576:.0f} MiB")
+    print(f"   Lookups:  {summary['hits']} hits, {summary['misses']} misses{hit_rate}")
+    print(f"   Stored:   {summary['stored']}, evicted {summary['evicted']}")
 
 
 def list_available_teams(src_dir: Path):
@@ -388,12 +1079,136 @@ def main():
         help="Build only skills for specific team(s). Comma-separated for multiple.",
         default=None
     )
+    parser.add_argument(
+        "--all-teams",
+        action="store_true",
+        help="Build every team bundle into dist/teams/<team>/, rendering each skill once"
+    )
     parser.add_argument(
         "--list-teams",
         action="store_true",
         help="List available teams and exit"
     )
+    parser.add_argument(
+        "--affected",
+        help="Rebuild only outputs that depend on these src/ paths (comma-separated), "
+             "e.g. partials/git-protocol.md",
+        default=None
+    )
+    parser.add_argument(
+        "--jobs", "-j",
+        type=int,
+        default=1,
+        help="Render skills in N worker processes (0 = one per CPU)"
+    )
+    parser.add_argument(
+        "--watch", "-w",
+        action="store_true",
+        help="After building, watch src/ and rebuild affected outputs on every change"
+    )
+    parser.add_argument(
+        "--poll",
+        action="store_true",
+        help="With --watch, poll for changes instead of using inotify"
+    )
+    parser.add_argument(
+        "--profile",
+        metavar="REPORT.json",
+        help="Write per-phase and per-skill timings, I/O bytes and include-cache stats",
+        default=None
+    )
+    parser.add_argument(
+        "--verbose", "-v",
+        action="store_true",
+        help="Also show files written / unchanged / removed and build cache use in the summary"
+    )
+    parser.add_argument(
+        "--archive",
+        metavar="PATH",
+        help="Stream the build into a reproducible archive (.tar.zst, .tar.gz, .tar, .zip) "
+             "instead of writing dist/",
+        default=None
+    )
+    parser.add_argument(
+        "--cache-stats",
+        action="store_true",
+        help="Show the shared build cache (~/.cache/ag-factory) summary and exit"
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Do not read or write the shared build cache"
+    )
+    parser.add_argument(
+        "--clean",
+        action="store_true",
+        help="Rebuild everything, reusing neither unchanged outputs from dist/ nor the shared build cache"
+    )
+    parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="Build in memory and list files that would be added, changed or removed in dist/"
+    )
+    parser.add_argument(
+        "--diff",
+        action="store_true",
+        help="With --dry-run, also print a unified diff of every change"
+    )
+    parser.add_argument(
+        "--skill", "-s",
+        help="Build only these skills (comma-separated) and a TEAM.md / PIPELINE.md for them",
+        default=None
+    )
+    parser.add_argument(
+        "--with-neighbors",
+        action="store_true",
+        help="With --skill, also build the skills named in their delegates_to, receives_from "
+             "and return_paths"
+    )
+    parser.add_argument(
+        "--minify",
+        action="store_true",
+        help="Compact built SKILL.md files (comments, blank lines, spacing, table padding) "
+             "and report bytes saved per skill"
+    )
+    parser.add_argument(
+        "--hoist-partials",
+        type=int,
+        metavar="N",
+        help="Emit partials included by more than N skills of a bundle once, as rules/PARTIAL_*.md, "
+             "and reference them from the skills (per team with --all-teams)",
+        default=None
+    )
+    parser.add_argument(
+        "--delta-from",
+        metavar="OLD_MANIFEST",
+        help="Write a patch bundle against the build of this .build-manifest.json to --archive "
+             f"(default {DELTA_ARCHIVE}) instead of writing dist/",
+        default=None
+    )
+    parser.add_argument(
+        "--apply-delta",
+        nargs=2,
+        metavar=("BUNDLE", "DIR"),
+        help="Upgrade the installed tree DIR with a --delta-from bundle and exit",
+        default=None
+    )
+    parser.add_argument(
+        "--shard",
+        metavar="I/N",
+        help="Build only the skills of shard I of N (stable hash of the skill name), for CI",
+        default=None
+    )
+    parser.add_argument(
+        "--merge",
+        nargs="+",
+        metavar="SHARD_DIR",
+        help="Combine the dist/ trees of every --shard build into dist/ (with --all-teams, "
+             "also write the team bundles)",
+        default=None
+    )
     args = parser.parse_args()
+    jobs = args.jobs if args.jobs > 0 else (os.cpu_count() or 1)
     
     root = Path(__file__).parent.parent
     src_dir = root / "src"
@@ -404,11 +1219,82 @@ def main():
         list_available_teams(src_dir)
         return
     
+    if args.cache_stats:
+        print_cache_stats(BuildCache())
+        return
+    
+    if args.apply_delta:
+        bundle, target_dir = (Path(p) for p in args.apply_delta)
+        try:
+            applied = apply_delta(bundle, target_dir)
+        except (OSError, ValueError) as e:
+            print(f"❌ {e}")
+            sys.exit(1)
+        print(f"🩹 Applied {bundle} to {target_dir}: {applied['written']} written, {applied['removed']} removed")
+        return
+    
     # Load hierarchy for team filtering
     hierarchy = load_preset_hierarchy(src_dir)
     
     # Parse target teams
     target_teams = None
+    if args.all_teams and args.team:
+        print("❌ --all-teams and --team are mutually exclusive")
+        sys.exit(1)
+    if args.archive and (args.watch or args.affected):
+        print("❌ --archive cannot be combined with --watch or --affected")
+        sys.exit(1)
+    if args.dry_run and (args.watch or args.affected or args.archive):
+        print("❌ --dry-run cannot be combined with --watch, --affected or --archive")
+        sys.exit(1)
+    if args.diff and not args.dry_run:
+        print("❌ --diff requires --dry-run")
+        sys.exit(1)
+    shard = None
+    if args.shard:
+        try:
+            shard = parse_shard(args.shard)
+        except ValueError as e:
+            print(f"❌ {e}")
+            sys.exit(1)
+        if args.all_teams or args.watch or args.affected:
+            print("❌ --shard cannot be combined with --all-teams, --watch or --affected")
+            print("   (build team bundles with --merge --all-teams)")
+            sys.exit(1)
+    if args.merge and (args.shard or args.team or args.watch or args.affected or args.archive or args.dry_run):
+        print("❌ --merge only combines shard builds (optionally with --all-teams)")
+        sys.exit(1)
+    if args.delta_from and (args.all_teams or args.watch or args.affected or args.dry_run or args.merge
+                            or args.shard or args.skill):
+        print("❌ --delta-from cannot be combined with --all-teams, --watch, --affected, --dry-run, "
+              "--merge, --shard or --skill")
+        sys.exit(1)
+    if args.delta_from and not args.archive:
+        args.archive = DELTA_ARCHIVE
+    if args.hoist_partials is not None and (args.shard or args.merge or args.watch or args.affected
+                                            or args.delta_from):
+        print("❌ --hoist-partials cannot be combined with --shard, --merge, --watch, --affected "
+              "or --delta-from")
+        sys.exit(1)
+    if args.with_neighbors and not args.skill:
+        print("❌ --with-neighbors requires --skill")
+        sys.exit(1)
+    if args.skill and (args.team or args.all_teams or args.shard or args.merge or args.watch or args.affected):
+        print("❌ --skill cannot be combined with --team, --all-teams, --shard, --merge, --watch or --affected")
+        sys.exit(1)
+    skills = None
+    if args.skill:
+        names = [s.strip() for s in args.skill.split(",")]
+        try:
+            skills = select_skills(src_dir, names, args.with_neighbors)
+        except ValueError as e:
+            print(f"❌ {e}")
+            print(f"   Available: {', '.join(sorted(d.name for d, _ in find_skill_dirs(src_dir / 'skills')))}")
+            sys.exit(1)
+    if args.archive and not args.archive.endswith(ARCHIVE_SUFFIXES):
+        print(f"❌ Unsupported archive type: {args.archive}")
+        print(f"   Supported: {', '.join(ARCHIVE_SUFFIXES)}")
+        sys.exit(1)
     if args.team:
         target_teams = set(t.strip() for t in args.team.split(","))
         # Validate teams
@@ -422,44 +1308,119 @@ def main():
     if target_teams:
         teams_str = ", ".join(sorted(target_teams))
         print(f"🔨 Building for team(s): {teams_str}")
+    elif skills:
+        print(f"🔨 Building skill(s): {', '.join(sorted(skills))}")
     else:
         print("🔨 Building from src/ to dist/...")
     print(f"   Source: {src_dir}")
-    print(f"   Output: {dist_dir}")
+    print(f"   Output: {args.archive or dist_dir}")
+    if shard:
+        print(f"   Shard:  {shard[0]}/{shard[1]}")
     print("")
     
-    # Clean and recreate
-    clean_dist(dist_dir)
-    dist_dir.mkdir(parents=True, exist_ok=True)
+    if args.merge:
+        print(f"🧩 Merging {len(args.merge)} shard build(s)...")
+        try:
+            merged = run_merge(src_dir, dist_dir, [Path(d) for d in args.merge], hierarchy, args.all_teams)
+        except ValueError as e:
+            print(f"❌ {e}")
+            sys.exit(1)
+        for shard_dir, count in merged.items():
+            print(f"  ✅ {shard_dir}: {count} file(s)")
+        print(f"\n📁 Output: {dist_dir}")
+        return
     
-    # Build skills (with team filtering)
-    print("📦 Building skills...")
-    skills_count, skills_skipped = build_skills(src_dir, dist_dir, target_teams, hierarchy)
+    # Shared partial render cache for the whole build
+    cache = IncludeCache()
+    # Rendered outputs shared with other worktrees and branches
+    build_cache = None if args.no_cache or args.clean else BuildCache()
     
-    # Always build other components (rules, workflows, etc.)
-    # For rules, pass the target team (use first if multiple, or None for "all")
-    target_team = list(target_teams)[0] if target_teams and len(target_teams) == 1 else None
-    print("\n📜 Building rules...")
-    rules_count = build_rules(src_dir, dist_dir, target_team)
+    # Per-phase timing report
+    profile = start_profile() if args.profile else None
     
-    print("\n⚡ Building workflows...")
-    workflows_count = build_workflows(src_dir, dist_dir)
+    # Include graph: catch cycles and missing partials before rendering anything
+    with profiled("include_graph"):
+        graph = IncludeGraph.scan(src_dir, cache=cache)
+    print(f"🔗 Include graph: {len(graph.forward)} files, {graph.edge_count} includes")
+    if not check_include_graph(graph, cache):
+        print("❌ Build aborted: fix the include cycles above")
+        sys.exit(1)
+    print("")
     
-    print("\n📄 Building templates...")
-    templates_count = build_templates(src_dir, dist_dir)
+    if args.affected:
+        changed = [p.strip().removeprefix("src/") for p in args.affected.split(",")]
+        print(f"🎯 Rebuilding outputs affected by: {', '.join(changed)}")
+        rebuilt = run_affected(src_dir, dist_dir, hierarchy, changed, graph, cache, args.minify)
+        if rebuilt is not None:
+            print(f"\n✅ Rebuilt {len(rebuilt)} affected output(s)")
+            if profile is not None:
+                write_profile(Path(args.profile), profile.report(cache, build_cache))
+            return
+        print("⚠️  No previous build manifest, running a full build instead of --affected\n")
     
-    print("\n⚙️  Building configs...")
-    configs_count = build_configs(src_dir, dist_dir)
+    if args.dry_run:
+        print(f"🔍 Comparing with {dist_dir} (dry run)\n")
+        try:
+            changes = run_dry_run(src_dir, dist_dir, hierarchy, target_teams, cache,
+                                  all_teams=args.all_teams, clean=args.clean, jobs=jobs, shard=shard,
+                                  skills=skills, minify=args.minify, hoist_threshold=args.hoist_partials)
+        except ValueError as e:
+            print(f"❌ {e}")
+            sys.exit(1)
+        print_dry_run(changes, dist_dir, show_diff=args.diff)
+        if profile is not None:
+            write_profile(Path(args.profile), profile.report(cache))
+        return
+    
+    try:
+        if args.delta_from:
+            stats = run_delta(src_dir, Path(args.delta_from), Path(args.archive), hierarchy, target_teams,
+                              cache, jobs=jobs, build_cache=build_cache, minify=args.minify)
+        elif args.archive:
+            stats = run_archive(src_dir, Path(args.archive), hierarchy, target_teams, cache,
+                                all_teams=args.all_teams, jobs=jobs, build_cache=build_cache, shard=shard,
+                                skills=skills, minify=args.minify, hoist_threshold=args.hoist_partials)
+        else:
+            stats = run_build(src_dir, dist_dir, hierarchy, target_teams, cache,
+                              all_teams=args.all_teams, clean=args.clean, jobs=jobs,
+                              build_cache=build_cache, shard=shard, skills=skills, minify=args.minify,
+                              hoist_threshold=args.hoist_partials)
+    except ValueError as e:
+        print(f"❌ {e}")
+        sys.exit(1)
     
     # Summary
     print("\n" + "=" * 40)
     print(f"✅ Build complete!")
-    print(f"   Skills:    {skills_count}" + (f" (skipped {skills_skipped})" if skills_skipped else ""))
-    print(f"   Rules:     {rules_count}")
-    print(f"   Workflows: {workflows_count}")
-    print(f"   Templates: {templates_count}")
-    print(f"   Configs:   {configs_count}")
-    print(f"\n📁 Output: {dist_dir}")
+    print(f"   Skills:    {stats['skills']}" + (f" (skipped {stats['skipped']})" if stats['skipped'] else ""))
+    print(f"   Rules:     {stats['rules']}")
+    print(f"   Workflows: {stats['workflows']}")
+    print(f"   Templates: {stats['templates']}")
+    print(f"   Configs:   {stats['configs']}")
+    if args.verbose or args.profile:
+        print(f"   Files:     {stats['written']} written, {stats['unchanged']} unchanged, {stats['removed']} removed")
+        if build_cache is not None and (build_cache.hits or build_cache.misses):
+            print(f"   Cache:     {build_cache.hits} hits, {build_cache.misses} misses")
+    if args.delta_from:
+        delta, archive = stats["delta"], stats["archive"]
+        added = len(delta["files"]) - len(delta["changed"]) - 1
+        print(f"\n🩹 Delta from {args.delta_from}: {added} added, {len(delta['changed'])} changed, "
+              f"{len(delta['removed'])} removed")
+        print(f"📦 Bundle: {archive} ({stats['entries']} files, {archive.stat().st_size} bytes; "
+              f"full build {stats['full_bytes']} bytes)")
+    elif args.archive:
+        archive = stats["archive"]
+        print(f"\n📦 Archive: {archive} ({stats['entries']} files, {archive.stat().st_size} bytes)")
+    else:
+        print(f"\n📁 Output: {dist_dir}")
+    
+    if profile is not None:
+        write_profile(Path(args.profile), profile.report(cache, build_cache))
+    
+    if args.watch:
+        watch(src_dir, dist_dir, hierarchy, target_teams, graph, cache,
+              all_teams=args.all_teams, jobs=jobs, poll=args.poll, build_cache=build_cache,
+              minify=args.minify)
 
 
 if __name__ == "__main__":
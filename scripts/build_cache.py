@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""
+Content-addressed render cache shared by every worktree and branch on this
+machine (~/.cache/ag-factory/, or $AG_FACTORY_CACHE_DIR).
+"""
+
+import os
+import json
+import contextlib
+from pathlib import Path
+
+from atomic_write import write_atomic
+from build_stats import count_io, stats_lock
+from build_manifest import BuildManifest, hash_bytes
+
+# Content-addressed render cache shared by worktrees (~/.cache/ag-factory/)
+CACHE_DIR_ENV = "AG_FACTORY_CACHE_DIR"
+CACHE_SIZE_ENV = "AG_FACTORY_CACHE_MAX_MB"
+CACHE_MAX_MB = 256
+CACHE_VARIANTS = 8
+
+
+def default_cache_dir() -> Path:
+    """~/.cache/ag-factory (XDG_CACHE_HOME honoured), or $AG_FACTORY_CACHE_DIR."""
+    if os.environ.get(CACHE_DIR_ENV):
+        return Path(os.environ[CACHE_DIR_ENV])
+    return Path(os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache") / "ag-factory"
+
+
+def default_cache_max_bytes() -> int:
+    try:
+        return int(os.environ.get(CACHE_SIZE_ENV, CACHE_MAX_MB)) * 1024 * 1024
+    except ValueError:
+        return CACHE_MAX_MB * 1024 * 1024
+
+
+class BuildCache:
+    """
+    Rendered outputs shared by every worktree and branch on this machine.
+    
+    Lookup is two-level: the builder version, source path and source hash
+    name a small JSON file listing the include sets seen for that source;
+    the first set whose include hashes all still match points at the
+    rendered bytes, stored once under their own hash. Files are touched on
+    use and the least recently used ones are evicted once the cache grows
+    past `max_bytes`.
+    
+        <root>/sources/ab/<source key>.json   [{"deps": {path: hash}, "hash": ...}]
+        <root>/objects/cd/<content hash>      rendered bytes
+        <root>/stats.json                     lifetime counters (--cache-stats)
+    """
+    
+    def __init__(self, root: Path = None, max_bytes: int = None):
+        self.root = root if root is not None else default_cache_dir()
+        self.max_bytes = max_bytes if max_bytes is not None else default_cache_max_bytes()
+        self.builder = BuildManifest.builder_hash()
+        self.hits = 0
+        self.misses = 0
+        self.stored = 0
+        self.evicted = 0
+    
+    def _source_file(self, source: str, source_hash: str) -> Path:
+        key = hash_bytes(f"{self.builder}\0{source}\0{source_hash}".encode())
+        return self.root / "sources" / key[:2] / f"{key}.json"
+    
+    def _object_file(self, digest: str) -> Path:
+        return self.root / "objects" / digest[:2] / digest
+    
+    @staticmethod
+    def _load_variants(source_file: Path) -> list:
+        try:
+            variants = json.loads(source_file.read_text())
+        except (OSError, ValueError):
+            return []
+        return variants if isinstance(variants, list) else []
+    
+    def lookup(self, source: str, input_hash):
+        """
+        (rendered content, include paths, source map) cached for `source`, or None.
+        `input_hash` maps a src/-relative path to its current hash.
+        """
+        source_hash = input_hash(source)
+        if source_hash is not None:
+            source_file = self._source_file(source, source_hash)
+            for variant in self._load_variants(source_file):
+                deps = variant.get("deps", {})
+                if any(input_hash(path) != digest for path, digest in deps.items()):
+                    continue
+                object_file = self._object_file(variant.get("hash", ""))
+                try:
+                    data = object_file.read_bytes()
+                except OSError:
+                    continue
+                if hash_bytes(data) != variant["hash"]:
+                    continue
+                count_io(read=len(data))
+                for path in (object_file, source_file):
+                    with contextlib.suppress(OSError):
+                        os.utime(path)
+                with stats_lock:
+                    self.hits += 1
+                return data.decode(), set(deps), variant.get("map")
+        with stats_lock:
+            self.misses += 1
+        return None
+    
+    def store(self, source: str, input_hash, content: str, deps, source_map: list = None):
+        """Remember the rendering of `source` against the current include hashes."""
+        source_hash = input_hash(source)
+        if source_hash is None:
+            return
+        data = content.encode()
+        digest = hash_bytes(data)
+        object_file = self._object_file(digest)
+        try:
+            if object_file.exists():
+                os.utime(object_file)
+            else:
+                write_atomic(object_file, data)
+            source_file = self._source_file(source, source_hash)
+            variant = {"deps": {path: input_hash(path) for path in sorted(deps)}, "hash": digest,
+                       "map": source_map}
+            variants = [v for v in self._load_variants(source_file) if v.get("deps") != variant["deps"]]
+            variants = [variant, *variants][:CACHE_VARIANTS]
+            write_atomic(source_file, json.dumps(variants).encode())
+        except OSError as e:
+            print(f"  ⚠️  Build cache write failed: {e}")
+            return
+        with stats_lock:
+            self.stored += 1
+    
+    def _files(self) -> list:
+        """(mtime, size, path) of every cached file."""
+        files = []
+        for kind in ("sources", "objects"):
+            for path in (self.root / kind).glob("*/*"):
+                with contextlib.suppress(OSError):
+                    st = path.stat()
+                    files.append((st.st_mtime, st.st_size, path))
+        return files
+    
+    def evict(self):
+        """Drop least recently used files until the cache fits in 90% of max_bytes."""
+        files = self._files()
+        total = sum(size for _, size, _ in files)
+        if total <= self.max_bytes:
+            return
+        target = self.max_bytes * 0.9
+        for _, size, path in sorted(files):
+            if total <= target:
+                break
+            with contextlib.suppress(OSError):
+                path.unlink()
+                total -= size
+                self.evicted += 1
+    
+    def load_stats(self) -> dict:
+        stats = {"hits": 0, "misses": 0, "stored": 0, "evicted": 0}
+        with contextlib.suppress(OSError, ValueError):
+            stats.update(json.loads((self.root / "stats.json").read_text()))
+        return stats
+    
+    def flush(self):
+        """Evict if this build added entries, then fold its counters into stats.json."""
+        if not (self.hits or self.misses or self.stored):
+            return
+        try:
+            if self.stored:
+                self.evict()
+            stats = self.load_stats()
+            for key in ("hits", "misses", "stored", "evicted"):
+                stats[key] += getattr(self, key)
+            write_atomic(self.root / "stats.json", json.dumps(stats, indent=2).encode())
+        except OSError as e:
+            print(f"  ⚠️  Build cache update failed: {e}")
+    
+    def summary(self) -> dict:
+        files = self._files()
+        return {
+            "root": str(self.root),
+            "objects": sum(1 for _, _, path in files if path.parent.parent.name == "objects"),
+            "sources": sum(1 for _, _, path in files if path.parent.parent.name == "sources"),
+            "bytes": sum(size for _, size, _ in files),
+            "max_bytes": self.max_bytes,
+            **self.load_stats(),
+        }
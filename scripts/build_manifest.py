@@ -0,0 +1,255 @@
+#!/usr/bin/env python3
+"""
+Incremental build manifest (dist/.build-manifest.json): for every output,
+the hashes of the src/ files it was built from, its content hash, size and
+source map, plus the build mode (shard, --minify, hoisted partials) and the
+size and mtime each input had when it was hashed.
+"""
+
+import ast
+import json
+import stat
+import hashlib
+import functools
+from pathlib import Path
+
+from build_stats import count_io, stats_lock
+
+# Incremental build manifest (lives in dist/)
+MANIFEST_NAME = ".build-manifest.json"
+MANIFEST_VERSION = 1
+# Extra input of every output that depends on team membership
+HIERARCHY_INPUT = "_meta/preset-hierarchy.yaml"
+# Entry point of the builder; it and every local module it imports make up the builder hash
+BUILDER_ENTRY = Path(__file__).with_name("build.py")
+
+
+def hash_bytes(data: bytes) -> str:
+    """Content hash used for manifest entries."""
+    return hashlib.sha256(data).hexdigest()
+
+
+def builder_modules(entry: Path = BUILDER_ENTRY) -> list:
+    """
+    `entry` and every module next to it that it imports, directly or
+    through one another (sorted paths). Imports of other packages are
+    ignored.
+    """
+    seen = set()
+    pending = [entry]
+    while pending:
+        path = pending.pop()
+        if path in seen:
+            continue
+        seen.add(path)
+        for node in ast.walk(ast.parse(path.read_bytes())):
+            if isinstance(node, ast.Import):
+                names = [alias.name for alias in node.names]
+            elif isinstance(node, ast.ImportFrom) and not node.level and node.module:
+                names = [node.module]
+            else:
+                continue
+            for name in names:
+                module = path.with_name(f"{name.split('.')[0]}.py")
+                if module.is_file():
+                    pending.append(module)
+    return sorted(seen)
+
+
+@functools.lru_cache(maxsize=None)
+def _builder_hash() -> str:
+    digest = hashlib.sha256()
+    for path in builder_modules():
+        digest.update(f"{path.name}\0{hash_bytes(path.read_bytes())}\n".encode())
+    return digest.hexdigest()
+
+
+class BuildManifest:
+    """
+    Records, for every file in dist/, the hashes of the src/ files it was
+    built from. An output is rebuilt only when one of its recorded inputs
+    changed; unchanged outputs are hardlinked from the previous tree
+    (`prev_dir`) into the tree being built (`out_tree`). Outputs that do
+    need rendering are looked up in the shared `build_cache` first.
+    
+    Input paths are relative to src/; output paths are relative to dist/.
+    An input whose size and mtime_ns still match the previous build's
+    "sources" entry reuses that hash without being read.
+    """
+    
+    def __init__(self, src_dir: Path, out_tree: "DirectoryTree", previous_outputs: dict = None,
+                 prev_dir: Path = None, build_cache: "BuildCache" = None, shard: tuple = None,
+                 minify: bool = False, hoist: dict = None):
+        self.src_dir = src_dir
+        self.out_tree = out_tree
+        self.prev_dir = prev_dir
+        self.build_cache = build_cache
+        self.shard = shard
+        self.minify = minify
+        self.hoist = hoist
+        # Line sources of each hoisted partial (hoist.hoist_expansions()), on first use
+        self.hoist_lines = None
+        self.previous = previous_outputs or {}
+        self.outputs = {}
+        self.written = 0
+        self.unchanged = 0
+        self._hashes = {}
+        # src path -> {"hash", "size", "mtime_ns"}: from the previous build / hashed in this one
+        self.previous_sources = self.load_sources(prev_dir) if prev_dir is not None and self.previous else {}
+        self.sources = {}
+    
+    @staticmethod
+    def builder_hash() -> str:
+        """Hash of build.py and its local modules: a new builder invalidates every output."""
+        return _builder_hash()
+    
+    @staticmethod
+    def load_outputs(dist_dir: Path, minify: bool = False, hoist: dict = None) -> dict:
+        """
+        Output entries of the previous build in dist_dir (empty if unusable,
+        e.g. built with a different --minify setting or hoisted partials).
+        """
+        manifest_file = dist_dir / MANIFEST_NAME
+        previous = {}
+        if manifest_file.exists():
+            try:
+                previous = json.loads(manifest_file.read_text())
+            except (OSError, ValueError):
+                previous = {}
+        if (previous.get("version") != MANIFEST_VERSION
+                or previous.get("builder") != BuildManifest.builder_hash()
+                or previous.get("minify", False) != minify
+                or previous.get("hoist") != (sorted(hoist) if hoist is not None else None)):
+            previous = {}
+        return previous.get("outputs", {})
+    
+    @staticmethod
+    def load_sources(dist_dir: Path) -> dict:
+        """The "sources" (input size, mtime and hash) of the manifest in dist_dir ({} if none)."""
+        try:
+            return json.loads((dist_dir / MANIFEST_NAME).read_text()).get("sources", {})
+        except (OSError, ValueError, AttributeError):
+            return {}
+    
+    @property
+    def has_previous(self) -> bool:
+        return bool(self.previous)
+    
+    def rel_src(self, path: Path) -> str:
+        return path.relative_to(self.src_dir).as_posix()
+    
+    def input_hash(self, rel_path: str):
+        """
+        Hash of a src/ file (None if missing), computed once per build. Files
+        whose size and mtime match the previous build are not read.
+        """
+        if rel_path not in self._hashes:
+            full_path = self.src_dir / rel_path
+            try:
+                st = full_path.stat()
+            except OSError:
+                st = None
+            if st is None or not stat.S_ISREG(st.st_mode):
+                self._hashes[rel_path] = None
+                return None
+            known = self.previous_sources.get(rel_path)
+            if known and known.get("size") == st.st_size and known.get("mtime_ns") == st.st_mtime_ns:
+                digest = known["hash"]
+            else:
+                data = full_path.read_bytes()
+                count_io(read=len(data))
+                digest = hash_bytes(data)
+            self.sources[rel_path] = {"hash": digest, "size": st.st_size, "mtime_ns": st.st_mtime_ns}
+            self._hashes[rel_path] = digest
+        return self._hashes[rel_path]
+    
+    def _reuse(self, rel_out: str) -> bool:
+        """Make the previous copy of rel_out available in the tree being built."""
+        if self.prev_dir is None:
+            return False
+        prev_file = self.prev_dir / rel_out
+        if not prev_file.is_file():
+            return False
+        self.out_tree.link(prev_file, rel_out)
+        return True
+    
+    def is_fresh(self, rel_out: str, source: str) -> bool:
+        """
+        True if rel_out was built from `source` last time, still exists, and
+        none of its recorded inputs changed. Fresh entries are carried over.
+        """
+        entry = self.previous.get(rel_out)
+        if not entry or entry.get("source") != source:
+            return False
+        for rel_path, digest in entry["inputs"].items():
+            if self.input_hash(rel_path) != digest:
+                return False
+        if not self._reuse(rel_out):
+            return False
+        self.outputs[rel_out] = entry
+        with stats_lock:
+            self.unchanged += 1
+        return True
+    
+    def record(self, rel_out: str, source: str, inputs, data: bytes, written: bool = True):
+        """
+        Record a rebuilt output and the inputs it was built from. Outputs that
+        came out identical to the previous build (not `written`) count as
+        unchanged.
+        """
+        input_paths = sorted({source, *inputs})
+        self.outputs[rel_out] = {
+            "source": source,
+            "inputs": {p: self.input_hash(p) for p in input_paths},
+            "hash": hash_bytes(data),
+            "size": len(data),
+        }
+        with stats_lock:
+            if written:
+                self.written += 1
+            else:
+                self.unchanged += 1
+    
+    def annotate(self, rel_out: str, **fields):
+        """Attach extra data (e.g. skill frontmatter for the index) to an output."""
+        self.outputs[rel_out].update(fields)
+    
+    def cached_render(self, source: str):
+        """(content, include paths, source map) of `source` from the build cache, or None."""
+        if self.build_cache is None:
+            return None
+        return self.build_cache.lookup(source, self.input_hash)
+    
+    def cache_render(self, source: str, content: str, deps, source_map: list = None):
+        if self.build_cache is not None:
+            self.build_cache.store(source, self.input_hash, content, deps, source_map)
+    
+    def carry_over(self):
+        """Keep every previous entry that was not rebuilt in this build."""
+        for rel_out, entry in self.previous.items():
+            if rel_out not in self.outputs and self._reuse(rel_out):
+                self.outputs[rel_out] = entry
+                self.unchanged += 1
+    
+    def removed(self) -> list:
+        """Outputs of the previous build that this build no longer produces."""
+        return sorted(set(self.previous) - set(self.outputs))
+    
+    def save(self):
+        data = {
+            "version": MANIFEST_VERSION,
+            "builder": self.builder_hash(),
+            "outputs": dict(sorted(self.outputs.items())),
+        }
+        if self.shard:
+            data["shard"] = list(self.shard)
+        if self.minify:
+            data["minify"] = True
+        if self.hoist is not None:
+            data["hoist"] = sorted(self.hoist)
+        # Inputs of carried-over outputs that this build did not look at keep their old entry
+        inputs = {rel_path for entry in self.outputs.values() for rel_path in entry["inputs"]}
+        data["sources"] = {rel_path: self.sources.get(rel_path) or self.previous_sources[rel_path]
+                           for rel_path in sorted(inputs)
+                           if rel_path in self.sources or rel_path in self.previous_sources}
+        self.out_tree.write(MANIFEST_NAME, (json.dumps(data, indent=2) + "\n").encode())
@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+Build statistics shared by build.py and its modules: the --profile report
+(time and bytes per phase and per skill), the lock guarding the counters
+that concurrent phases update, and per-thread capture of phase output.
+
+Usage:
+    from build_stats import count_io, profiled, start_profile
+
+    profile = start_profile()            # --profile: record this build
+    with profiled("skills"):
+        count_io(read=len(data))         # charged to the "skills" phase
+    report = profile.report()
+"""
+
+import sys
+import time
+import threading
+import contextlib
+
+# Active profile of this build (None unless --profile is given)
+_profile = None
+
+# Guards the counters that concurrent build phases update (profile, manifest, caches)
+stats_lock = threading.Lock()
+
+# Per-thread print destination set by capture_output()
+_thread_output = threading.local()
+
+
+class BuildProfile:
+    """
+    Wall time and bytes read/written per build phase (--profile). Phases
+    nest: time and bytes are charged to the innermost active phase only.
+    Each thread keeps its own phase stack, so concurrent phases are timed
+    independently (their sum can exceed the total).
+    Per-skill timings split frontmatter parse, include expansion, write and
+    asset copy.
+    """
+    
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.phases = {}
+        self.skills = {}
+        self._local = threading.local()
+    
+    @property
+    def _stack(self) -> list:
+        if not hasattr(self._local, "stack"):
+            self._local.stack = []
+            self._local.mark = None
+        return self._local.stack
+    
+    def _charge(self):
+        now = time.perf_counter()
+        if self._stack:
+            with stats_lock:
+                self._phase(self._stack[-1])["seconds"] += now - self._local.mark
+        self._local.mark = now
+    
+    def _phase(self, name: str) -> dict:
+        return self.phases.setdefault(name, {"seconds": 0.0, "bytes_read": 0, "bytes_written": 0})
+    
+    @contextlib.contextmanager
+    def phase(self, name: str):
+        self._charge()
+        self._stack.append(name)
+        self._phase(name)
+        try:
+            yield
+        finally:
+            self._charge()
+            self._stack.pop()
+    
+    def add_bytes(self, read: int = 0, written: int = 0):
+        name = self._stack[-1] if self._stack else "other"
+        with stats_lock:
+            phase = self._phase(name)
+            phase["bytes_read"] += read
+            phase["bytes_written"] += written
+    
+    def add_skill(self, skill_name: str, step: str, seconds: float, bytes_written: int = 0):
+        with stats_lock:
+            entry = self.skills.setdefault(skill_name, {
+                "frontmatter": 0.0, "includes": 0.0, "write": 0.0, "assets": 0.0, "bytes_written": 0,
+            })
+            entry[step] += seconds
+            entry["bytes_written"] += bytes_written
+    
+    def report(self, cache: "IncludeCache" = None, build_cache: "BuildCache" = None) -> dict:
+        return {
+            "total_seconds": round(time.perf_counter() - self.started, 6),
+            "phases": {name: {**data, "seconds": round(data["seconds"], 6)}
+                       for name, data in self.phases.items()},
+            "skills": {name: {key: round(value, 6) if isinstance(value, float) else value
+                              for key, value in data.items()}
+                       for name, data in sorted(self.skills.items())},
+            "include_cache": {
+                "hits": cache.hits if cache is not None else 0,
+                "misses": cache.misses if cache is not None else 0,
+            },
+            "build_cache": {
+                "hits": build_cache.hits if build_cache is not None else 0,
+                "misses": build_cache.misses if build_cache is not None else 0,
+                "stored": build_cache.stored if build_cache is not None else 0,
+            },
+        }
+
+
+class RoutedStdout:
+    """sys.stdout stand-in sending each thread's prints to its capture_output() buffer."""
+    
+    def __init__(self, stream):
+        self.stream = stream
+    
+    def _target(self):
+        buffer = getattr(_thread_output, "buffer", None)
+        return self.stream if buffer is None else buffer
+    
+    def write(self, text: str) -> int:
+        return self._target().write(text)
+    
+    def flush(self):
+        self._target().flush()
+    
+    def __getattr__(self, name):
+        return getattr(self.stream, name)
+
+
+@contextlib.contextmanager
+def capture_output(buffer):
+    """
+    Send the prints of this thread to `buffer`. Under RoutedStdout (while
+    phases run concurrently) other threads are unaffected; otherwise this is
+    plain redirect_stdout.
+    """
+    if not isinstance(sys.stdout, RoutedStdout):
+        with contextlib.redirect_stdout(buffer):
+            yield buffer
+        return
+    previous = getattr(_thread_output, "buffer", None)
+    _thread_output.buffer = buffer
+    try:
+        yield buffer
+    finally:
+        _thread_output.buffer = previous
+
+
+def start_profile() -> BuildProfile:
+    """Start profiling this build (--profile) and return the profile."""
+    global _profile
+    _profile = BuildProfile()
+    return _profile
+
+
+def active_profile():
+    """The profile of this build, or None unless --profile is given."""
+    return _profile
+
+
+def profiled(phase: str):
+    """Context manager charging time and I/O to `phase` when profiling."""
+    return _profile.phase(phase) if _profile is not None else contextlib.nullcontext()
+
+
+def count_io(read: int = 0, written: int = 0):
+    if _profile is not None:
+        _profile.add_bytes(read, written)
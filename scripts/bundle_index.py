@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+dist/index.json (one per team bundle): every skill with its frontmatter
+summary, files (size and hash) and included partials, plus the rules,
+workflows and remaining files, so consumers need one read to list a bundle.
+"""
+
+import re
+import json
+
+from build_stats import count_io
+from build_manifest import HIERARCHY_INPUT
+from output_tree import DirectoryTree
+from sources import parse_frontmatter
+
+# Bundle index for downstream tools (dist/index.json, one per team bundle)
+INDEX_NAME = "index.json"
+INDEX_VERSION = 1
+INDEX_SKILL_FIELDS = ("name", "version", "presets", "phase", "category")
+SKILL_OUTPUT_PATTERN = re.compile(r'skills/[^/]+/SKILL\.md')
+
+
+def skill_meta(content: str) -> dict:
+    """The frontmatter fields of a rendered SKILL.md listed in index.json."""
+    frontmatter = parse_frontmatter(content)
+    return {field: frontmatter.get(field) for field in INDEX_SKILL_FIELDS}
+
+
+def build_index(outputs: dict) -> dict:
+    """
+    index.json content for a set of manifest entries: every skill with its
+    frontmatter summary, files (size and hash) and the partials it includes,
+    plus the rules, workflows and remaining files.
+    """
+    skills = {}
+    sections = {"rules": [], "workflows": [], "other": []}
+    total_bytes = 0
+    
+    for rel_out, entry in sorted(outputs.items()):
+        item = {"path": rel_out, "size": entry.get("size"), "hash": entry["hash"]}
+        total_bytes += entry.get("size") or 0
+        includes = sorted(set(entry["inputs"]) - {entry["source"], HIERARCHY_INPUT})
+        parts = rel_out.split("/")
+        
+        if parts[0] == "skills" and len(parts) > 2:
+            skill = skills.setdefault(parts[1], {"files": []})
+            skill["files"].append(item)
+            if SKILL_OUTPUT_PATTERN.fullmatch(rel_out):
+                skill.update(entry.get("meta", {}))
+                skill.update(source=entry["source"], includes=includes)
+        elif parts[0] in ("rules", "workflows"):
+            sections[parts[0]].append({**item, "source": entry["source"], "includes": includes})
+        else:
+            sections["other"].append(item)
+    
+    return {
+        "version": INDEX_VERSION,
+        "skills": [
+            {
+                **{field: skill.get(field) for field in INDEX_SKILL_FIELDS},
+                "name": skill.get("name") or dir_name,
+                "dir": f"skills/{dir_name}",
+                "private": skill.get("source", "").startswith("skills/private/"),
+                "source": skill.get("source"),
+                "includes": skill.get("includes", []),
+                "files": skill["files"],
+            }
+            for dir_name, skill in sorted(skills.items())
+        ],
+        **sections,
+        "totals": {"skills": len(skills), "files": len(outputs), "bytes": total_bytes},
+    }
+
+
+def write_index(out_tree: DirectoryTree, outputs: dict, prefix: str = ""):
+    """Write <prefix>index.json so consumers need one read to list a bundle."""
+    data = (json.dumps(build_index(outputs), indent=2, default=str) + "\n").encode()
+    out_tree.write(prefix + INDEX_NAME, data)
+    count_io(written=len(data))
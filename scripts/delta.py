@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Patch bundles (--delta-from / --apply-delta): the outputs a build added or
+changed since a released build, with tombstones for removed ones, and the
+verified upgrade of an installed tree with such a bundle.
+"""
+
+import json
+from pathlib import Path, PurePosixPath
+
+from atomic_write import write_atomic
+from archive import read_archive
+from bundle_index import INDEX_NAME
+from build_manifest import MANIFEST_NAME, hash_bytes
+from output_tree import VirtualTree
+
+# --delta-from: patch bundle of the outputs added / changed since an old manifest
+DELTA_NAME = ".delta.json"
+DELTA_VERSION = 1
+DELTA_ARCHIVE = "dist.delta.tar.zst"
+
+
+def read_base_manifest(old_manifest: Path) -> tuple:
+    """(raw bytes, output path -> hash) of a .build-manifest.json. Raises ValueError."""
+    try:
+        old_data = old_manifest.read_bytes()
+        old_outputs = {rel_out: entry["hash"] for rel_out, entry in json.loads(old_data)["outputs"].items()}
+    except (OSError, ValueError, KeyError, TypeError):
+        raise ValueError(f"{old_manifest}: not a build manifest")
+    return old_data, old_outputs
+
+
+def delta_bundle(old_data: bytes, old_outputs: dict, out_tree: VirtualTree, outputs: dict,
+                 builder: str) -> tuple:
+    """
+    (bundle, delta) of a build in out_tree (manifest `outputs`) against the
+    base build (read_base_manifest()): the outputs added or changed since,
+    index.json, and a DELTA_NAME file with the hash of every file in the
+    bundle, the base hashes of the files it replaces and a tombstone (with
+    its base hash) for every removed output.
+    """
+    new_outputs = {rel_out: entry["hash"] for rel_out, entry in outputs.items()}
+    shipped = [rel_out for rel_out, digest in sorted(new_outputs.items())
+               if old_outputs.get(rel_out) != digest]
+    delta = {
+        "version": DELTA_VERSION,
+        "base": hash_bytes(old_data),
+        "builder": builder,
+        "files": {rel_out: new_outputs[rel_out] for rel_out in shipped},
+        "changed": {rel_out: old_outputs[rel_out] for rel_out in shipped if rel_out in old_outputs},
+        "removed": {rel_out: digest for rel_out, digest in sorted(old_outputs.items())
+                    if rel_out not in new_outputs},
+    }
+    bundle = VirtualTree()
+    for rel_out in shipped:
+        bundle.files[rel_out] = out_tree.files[rel_out]
+    # index.json lists every output, so it changes with any of them
+    bundle.write(INDEX_NAME, out_tree.read(INDEX_NAME))
+    delta["files"][INDEX_NAME] = hash_bytes(out_tree.read(INDEX_NAME))
+    bundle.write(DELTA_NAME, (json.dumps(delta, indent=2) + "\n").encode())
+    return bundle, delta
+
+
+def _escapes(target_dir: Path, rel_out: str) -> bool:
+    """True if a bundle path is absolute, has '..' parts or resolves outside target_dir."""
+    path = PurePosixPath(rel_out)
+    if not rel_out or path.is_absolute() or ".." in path.parts:
+        return True
+    resolved = (target_dir / path).resolve()
+    return not resolved.is_relative_to(target_dir.resolve())
+
+
+def apply_delta(archive_path: Path, target_dir: Path) -> dict:
+    """
+    Upgrade an installed tree with a --delta-from bundle. Every file the
+    bundle replaces or removes must still hold its base (or already its new)
+    content, every file in it must match its recorded hash and every path
+    must stay inside target_dir; otherwise nothing is touched and
+    ValueError is raised. A stale
+    .build-manifest.json is removed.
+    Returns {"written", "removed": counts}; tombstoned files that were
+    already gone do not count as removed.
+    """
+    files = read_archive(archive_path)
+    try:
+        delta = json.loads(files.pop(DELTA_NAME))
+    except (KeyError, ValueError):
+        raise ValueError(f"{archive_path}: not a delta bundle")
+    if delta.get("version") != DELTA_VERSION:
+        raise ValueError(f"{archive_path}: unsupported delta version {delta.get('version')}")
+    
+    outside = sorted(rel_out for rel_out in {*files, *delta["files"], *delta["changed"], *delta["removed"]}
+                     if _escapes(target_dir, rel_out))
+    if outside:
+        raise ValueError(f"{archive_path}: paths outside {target_dir}: {', '.join(outside)}")
+    
+    for rel_out, data in files.items():
+        if delta["files"].get(rel_out) != hash_bytes(data):
+            raise ValueError(f"{archive_path}: {rel_out} does not match its hash")
+    missing = sorted(set(delta["files"]) - set(files))
+    if missing:
+        raise ValueError(f"{archive_path}: missing {', '.join(missing)}")
+    
+    conflicts = []
+    for rel_out, digest in {**delta["changed"], **delta["removed"]}.items():
+        path = target_dir / rel_out
+        if rel_out in delta["removed"] and not path.exists():
+            continue
+        if not path.is_file() or hash_bytes(path.read_bytes()) not in (digest, delta["files"].get(rel_out)):
+            conflicts.append(rel_out)
+    if conflicts:
+        shown = ", ".join(conflicts[:5]) + (f" (+{len(conflicts) - 5} more)" if len(conflicts) > 5 else "")
+        raise ValueError(f"{target_dir} is not the base build of this delta: {shown} differ")
+    
+    for rel_out, data in sorted(files.items()):
+        write_atomic(target_dir / rel_out, data)
+    removed = 0
+    for rel_out in [*delta["removed"], MANIFEST_NAME]:
+        path = target_dir / rel_out
+        if not path.exists():
+            continue
+        path.unlink()
+        if rel_out in delta["removed"]:
+            removed += 1
+        # Drop directories the removal left empty
+        for parent in path.parents:
+            if parent == target_dir or any(parent.iterdir()):
+                break
+            parent.rmdir()
+    return {"written": len(files), "removed": removed}
@@ -18,6 +18,8 @@ import yaml
 from pathlib import Path
 from collections import defaultdict
 
+from atomic_write import write_if_changed, write_report
+
 SRC_DIR = Path(__file__).parent.parent / "src"
 SKILLS_DIR = SRC_DIR / "skills"
 HIERARCHY_FILE = SRC_DIR / "_meta" / "preset-hierarchy.yaml"
@@ -175,7 +177,8 @@ def main():
     # Let's start with standard YAML.
 
     # Write output
-    OUTPUT_FILE.write_text(
+    write_if_changed(
+        OUTPUT_FILE,
         "# Auto-generated from skill frontmatter\n"
         "# Run: python3 scripts/generate-presets.py\n\n"
         + yaml.dump(output, default_flow_style=False, sort_keys=False, allow_unicode=True)
@@ -184,6 +187,7 @@ def main():
     print(f"✅ Generated {OUTPUT_FILE}")
     print(f"   Skills: {len(all_skills)}")
     print(f"   Presets: {len([p for p in preset_order if p in hierarchy])}")
+    print(write_report())
 
 
 if __name__ == "__main__":
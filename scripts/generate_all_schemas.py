@@ -15,6 +15,8 @@ import json
 import yaml
 from pathlib import Path
 
+from atomic_write import write_if_changed, write_report
+
 
 def load_yaml(path: Path) -> dict:
     """Load YAML file."""
@@ -160,10 +162,11 @@ def main():
         
         json_schema = generator(schema_dir)
         
-        with open(output_path, "w") as f:
-            json.dump(json_schema, f, indent=2)
+        write_if_changed(output_path, json.dumps(json_schema, indent=2))
         
         print(f"✅ Generated {output_path}")
+    
+    print(write_report())
 
 
 if __name__ == "__main__":
@@ -2,6 +2,9 @@
 """
 Generate skill documentation pages from blueprint.
 
+Pages are rendered from an in-memory build (scripts/build.py), so
+included partials appear expanded; nothing is written to dist/.
+
 Usage:
     python3 scripts/generate_catalog.py
 """
@@ -10,6 +13,9 @@ import os
 import re
 from pathlib import Path
 
+from atomic_write import write_if_changed, write_report
+from build import build
+
 
 def extract_frontmatter(content: str) -> dict:
     """Extract YAML frontmatter from SKILL.md."""
@@ -37,13 +43,17 @@ def strip_internal_links(body: str) -> str:
     return re.sub(pattern, r'\1', body)
 
 
-def generate_skill_page(skill_path: Path, docs_path: Path) -> dict:
-    """Generate a skill documentation page."""
+def generate_skill_page(skill_path: Path, docs_path: Path, tree=None) -> dict:
+    """Generate a skill documentation page (from the built SKILL.md if a tree is given)."""
+    built_md = f"skills/{skill_path.name}/SKILL.md"
     skill_md = skill_path / "SKILL.md"
-    if not skill_md.exists():
+    if tree is not None and built_md in tree:
+        content = tree.read_text(built_md)
+    elif skill_md.exists():
+        content = skill_md.read_text()
+    else:
         return None
     
-    content = skill_md.read_text()
     frontmatter = extract_frontmatter(content)
     
     name = frontmatter.get("name", skill_path.name)
@@ -74,8 +84,7 @@ def generate_skill_page(skill_path: Path, docs_path: Path) -> dict:
     
     # Write skill page
     skill_doc_path = docs_path / "skills" / f"{skill_path.name}.md"
-    skill_doc_path.parent.mkdir(parents=True, exist_ok=True)
-    skill_doc_path.write_text(skill_doc)
+    write_if_changed(skill_doc_path, skill_doc)
     
     return {"name": name, "slug": skill_path.name, "description": description, "version": version}
 
@@ -89,15 +98,18 @@ def main():
         print("❌ src/skills not found")
         return
     
+    tree = build(root / "src")
+    
     skills = []
     for skill_path in sorted(src_skills.iterdir()):
-        if skill_path.is_dir() and not skill_path.name.startswith("."):
-            info = generate_skill_page(skill_path, website_path)
+        if skill_path.is_dir() and not skill_path.name.startswith(".") and skill_path.name != "private":
+            info = generate_skill_page(skill_path, website_path, tree)
             if info:
                 skills.append(info)
                 print(f"✅ {info['name']}")
     
     print(f"\n📚 Generated {len(skills)} skill pages in website/skills/")
+    print(write_report())
 
 
 if __name__ == "__main__":
@@ -13,6 +13,8 @@ import json
 import yaml
 from pathlib import Path
 
+from atomic_write import write_if_changed, write_report
+
 
 def load_yaml(path: Path) -> dict:
     """Load YAML file."""
@@ -269,10 +271,10 @@ def main():
     
     json_schema = generate_json_schema(schema_dir)
     
-    with open(output_path, "w") as f:
-        json.dump(json_schema, f, indent=2)
+    write_if_changed(output_path, json.dumps(json_schema, indent=2))
     
     print(f"✅ Generated {output_path}")
+    print(write_report())
 
 
 if __name__ == "__main__":
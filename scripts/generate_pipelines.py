@@ -14,6 +14,8 @@ import os
 import yaml
 from pathlib import Path
 
+from atomic_write import write_if_changed, write_report
+
 
 def extract_frontmatter(skill_path: Path) -> dict:
     """Extract YAML frontmatter from SKILL.md."""
@@ -158,12 +160,12 @@ def generate_doc_types(matrix: dict, output_path: Path):
                 "lifecycle": output.get("lifecycle", "per-feature"),
             }
     
-    output_path.parent.mkdir(parents=True, exist_ok=True)
-    output_path.parent.mkdir(parents=True, exist_ok=True)
-    with open(output_path, "w") as f:
-        f.write("# Auto-generated from skill frontmatter\n")
-        f.write(f"# Run: python3 scripts/generate_pipelines.py\n\n")
-        yaml.dump(doc_types, f, default_flow_style=False, allow_unicode=True, sort_keys=False)
+    write_if_changed(
+        output_path,
+        "# Auto-generated from skill frontmatter\n"
+        "# Run: python3 scripts/generate_pipelines.py\n\n"
+        + yaml.dump(doc_types, default_flow_style=False, allow_unicode=True, sort_keys=False)
+    )
     
     return len(doc_types["types"])
 
@@ -191,11 +193,8 @@ def resolve_preset_skills(preset_name: str, presets: dict, all_skills: set) -> l
     return sorted(skills)
 
 
-def generate_pipeline_file(preset_name: str, skill_names: list, matrix: dict, 
-                           output_dir: Path, preset_desc: str):
-    """Generate PIPELINE_<preset>.md file."""
-    output_file = output_dir / f"PIPELINE_{preset_name}.md"
-    
+def render_pipeline_file(preset_name: str, skill_names: list, matrix: dict, preset_desc: str) -> tuple:
+    """(content, handoff count) of the PIPELINE file for skill_names (also used by build.py --skill)."""
     # Filter matrix to only preset skills
     preset_skills = {k: v for k, v in matrix["skills"].items() if k in skill_names}
     
@@ -282,9 +281,16 @@ def generate_pipeline_file(preset_name: str, skill_names: list, matrix: dict,
             lines.append(f"| `@{rp['from']}` | `@{rp['to']}` | {rp['trigger']} |")
     
     lines.append("")
-    
-    output_file.write_text("\n".join(lines))
-    return len(preset_handoffs)
+    return "\n".join(lines), len(preset_handoffs)
+
+
+def generate_pipeline_file(preset_name: str, skill_names: list, matrix: dict, 
+                           output_dir: Path, preset_desc: str):
+    """Generate PIPELINE_<preset>.md file."""
+    output_file = output_dir / f"PIPELINE_{preset_name}.md"
+    content, handoff_count = render_pipeline_file(preset_name, skill_names, matrix, preset_desc)
+    write_if_changed(output_file, content)
+    return handoff_count
 
 
 def main():
@@ -304,13 +310,12 @@ def main():
     matrix = build_skill_matrix(src_skills)
     
     # Save matrix
-    matrix_output.parent.mkdir(parents=True, exist_ok=True)
-    # Save matrix
-    matrix_output.parent.mkdir(parents=True, exist_ok=True)
-    with open(matrix_output, "w") as f:
-        f.write("# Auto-generated from skill frontmatter\n")
-        f.write(f"# Run: python3 scripts/generate_pipelines.py\n\n")
-        yaml.dump(matrix, f, default_flow_style=False, allow_unicode=True, sort_keys=False)
+    write_if_changed(
+        matrix_output,
+        "# Auto-generated from skill frontmatter\n"
+        "# Run: python3 scripts/generate_pipelines.py\n\n"
+        + yaml.dump(matrix, default_flow_style=False, allow_unicode=True, sort_keys=False)
+    )
     print(f"  ✅ skill-matrix.yaml ({len(matrix['skills'])} skills, {len(matrix['handoffs'])} handoffs)")
     
     # Generate doc-types.yaml
@@ -340,6 +345,7 @@ def main():
         print(f"  ✅ PIPELINE_{preset_name}.md ({len(skill_names)} skills, {count} handoffs)")
     
     print(f"\n📁 Generated {len(presets)} pipeline files in src/_meta/pipelines/")
+    print(write_report())
 
 
 if __name__ == "__main__":
@@ -13,6 +13,8 @@ import yaml
 import re
 from pathlib import Path
 
+from atomic_write import write_if_changed, write_report
+
 
 def parse_frontmatter(content: str) -> dict:
     """Extract YAML frontmatter from markdown file."""
@@ -81,15 +83,16 @@ def main():
         }
     }
     
-    output_file.parent.mkdir(parents=True, exist_ok=True)
-    
-    with open(output_file, 'w') as f:
-        # Write header comment
-        f.write("# Rules Matrix - Auto-generated from src/rules/\n")
-        f.write("# Run: python3 scripts/generate_rules.py\n\n")
-        yaml.dump(output, f, default_flow_style=False, allow_unicode=True, sort_keys=False)
+    write_if_changed(
+        output_file,
+        # Header comment
+        "# Rules Matrix - Auto-generated from src/rules/\n"
+        "# Run: python3 scripts/generate_rules.py\n\n"
+        + yaml.dump(output, default_flow_style=False, allow_unicode=True, sort_keys=False)
+    )
     
     print(f"\n📁 Generated rules-matrix.yaml ({len(rules)} rules)")
+    print(write_report())
 
 
 if __name__ == "__main__":
@@ -14,6 +14,8 @@ import yaml
 from pathlib import Path
 from typing import Dict, List, Any
 
+from atomic_write import write_if_changed, write_report
+
 
 # Section order (top to bottom in SKILL.md)
 SECTION_ORDER = [
@@ -168,7 +170,7 @@ def main():
 """
     output_content += yaml.dump(matrix, default_flow_style=False, sort_keys=False, allow_unicode=True)
     
-    output_path.write_text(output_content)
+    write_if_changed(output_path, output_content)
     
     # Print summary
     total_skills = sum(len(cat["skills"]) for cat in matrix["categories"].values())
@@ -176,6 +178,7 @@ def main():
     
     for cat_name, cat_data in matrix["categories"].items():
         print(f"     - {cat_name}: {len(cat_data['skills'])} skills, {len(cat_data['required'])} required sections")
+    print(write_report())
 
 
 if __name__ == "__main__":
@@ -13,6 +13,8 @@ import os
 import yaml
 from pathlib import Path
 
+from atomic_write import write_if_changed, write_report
+
 
 def extract_description(skill_path: Path) -> str:
     """Extract description from SKILL.md frontmatter."""
@@ -72,10 +74,8 @@ def resolve_skills(preset_name: str, presets: dict, blueprint_skills: Path) -> l
     return sorted(skills)
 
 
-def generate_team_file(preset_name: str, skill_names: list, blueprint_skills: Path, output_dir: Path, preset_desc: str):
-    """Generate TEAM_<preset>.md file."""
-    output_file = output_dir / f"TEAM_{preset_name}.md"
-    
+def render_team_file(preset_name: str, skill_names: list, blueprint_skills: Path, preset_desc: str) -> str:
+    """Content of the TEAM file for skill_names (also used by build.py --skill)."""
     lines = [
         "---",
         "trigger: model_decision",
@@ -102,8 +102,13 @@ def generate_team_file(preset_name: str, skill_names: list, blueprint_skills: Pa
         "Reference skills with `@skill-name` in skill collaboration sections.",
         "",
     ])
-    
-    output_file.write_text("\n".join(lines))
+    return "\n".join(lines)
+
+
+def generate_team_file(preset_name: str, skill_names: list, blueprint_skills: Path, output_dir: Path, preset_desc: str):
+    """Generate TEAM_<preset>.md file."""
+    output_file = output_dir / f"TEAM_{preset_name}.md"
+    write_if_changed(output_file, render_team_file(preset_name, skill_names, blueprint_skills, preset_desc))
     return len(skill_names)
 
 
@@ -140,6 +145,7 @@ def main():
         print(f"  ✅ TEAM_{preset_name}.md ({count} skills)")
     
     print(f"\n📁 Generated {len(presets)} team files in src/_meta/teams/")
+    print(write_report())
 
 
 if __name__ == "__main__":
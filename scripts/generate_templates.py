@@ -13,6 +13,8 @@ import yaml
 from pathlib import Path
 from datetime import date
 
+from atomic_write import write_if_changed, write_report
+
 
 # Template content per doc_type (body only, frontmatter is generated)
 TEMPLATE_BODIES = {
@@ -665,10 +667,11 @@ def main():
         ext = ".json" if doc_type == "tokens" else ".md"
         output_file = output_dir / f"_{doc_type}{ext}"
         
-        output_file.write_text(content)
+        write_if_changed(output_file, content)
         print(f"  ✅ _{doc_type}{ext}")
     
     print(f"\n📁 Generated {len(types)} templates in {output_dir.relative_to(root)}")
+    print(write_report())
 
 
 if __name__ == "__main__":
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+--hoist-partials: partials that many skills of a bundle inline are emitted
+once as rules/PARTIAL_*.md, and the inline copies replaced by a reference.
+"""
+
+from pathlib import Path, PurePosixPath
+from collections import defaultdict
+
+from sources import decode_source, find_skill_dirs, read_skill_presets, skill_matches_teams
+from include_engine import IncludeCache, expand_include_lines, find_directives, has_directives
+
+# --hoist-partials: rules file a shared partial is emitted to (rules/PARTIAL_GIT_PROTOCOL.md)
+HOIST_RULE_PREFIX = "PARTIAL_"
+
+
+def hoist_rule_name(partial: str) -> str:
+    """
+    Rule a hoisted partial is emitted as, from its path under partials/:
+    partials/git-protocol.md -> PARTIAL_GIT_PROTOCOL,
+    partials/review/checklist.md -> PARTIAL_REVIEW_CHECKLIST.
+    """
+    path = PurePosixPath(partial)
+    if path.parts[0] == "partials":
+        path = path.relative_to("partials")
+    return HOIST_RULE_PREFIX + path.with_suffix("").as_posix().upper().replace("/", "_").replace("-", "_")
+
+
+def plan_hoisting(src_dir: Path, threshold: int, hierarchy: dict, target_teams: set = None,
+                  only: set = None) -> dict:
+    """
+    Partials (path -> number of skills) that more than `threshold` skills
+    of a bundle include directly: the skills of target_teams (every skill
+    if None), or only those named in `only` (--skill). Raises ValueError if
+    two of them would be emitted as the same rules file.
+    """
+    counts = defaultdict(int)
+    for skill_dir, _ in find_skill_dirs(src_dir / "skills"):
+        skill_md = skill_dir / "SKILL.md"
+        if not skill_md.exists() or (only is not None and skill_dir.name not in only):
+            continue
+        if target_teams and hierarchy and not skill_matches_teams(read_skill_presets(skill_md)[0],
+                                                                  target_teams, hierarchy):
+            continue
+        data = skill_md.read_bytes()
+        if has_directives(data):
+            for target in set(find_directives(decode_source(data), skill_md)):
+                if target.startswith("partials/"):
+                    counts[target] += 1
+    hoist = {partial: count for partial, count in sorted(counts.items()) if count > threshold}
+    names = defaultdict(list)
+    for partial in hoist:
+        names[hoist_rule_name(partial)].append(partial)
+    clashes = [f"{' and '.join(partials)} -> {name}" for name, partials in sorted(names.items()) if len(partials) > 1]
+    if clashes:
+        raise ValueError(f"Hoisted partials share a rules file: {'; '.join(clashes)}")
+    return hoist
+
+
+def hoist_expansions(src_dir: Path, hoist: dict, cache: IncludeCache = None) -> dict:
+    """Line sources (see render_includes()) of every hoisted partial, fully expanded."""
+    expansions = {}
+    for partial in hoist:
+        entry = expand_include_lines(partial, src_dir, None, cache)
+        expansions[partial] = entry[1] if entry is not None else []
+    return expansions
+
+
+def hoist_sections(content: str, source_map: list, hoist: dict, expansions: dict) -> tuple:
+    """
+    Replace every inclusion of a hoisted partial with a reference to its
+    rules file, keeping its heading. An inclusion is the run of output lines
+    whose sources are the partial's expansion (`expansions`, see
+    hoist_expansions()), so partials it includes in turn go with it.
+    Returns (text, kept) as minify_markdown() does.
+    """
+    sources = {}
+    for out_line, source, src_line, count in source_map:
+        for offset in range(count):
+            sources[out_line - 1 + offset] = (source, src_line + offset)
+    # Candidates by first line, longest first: a partial wins over the ones it includes
+    starts = defaultdict(list)
+    for partial in sorted(hoist, key=lambda partial: -len(expansions[partial])):
+        if expansions[partial]:
+            starts[expansions[partial][0]].append(partial)
+    lines = content.split("\n")
+    out, kept = [], []
+    i = 0
+    while i < len(lines):
+        partial = next((partial for partial in starts.get(sources.get(i), ())
+                        if all(sources.get(i + n) == entry for n, entry in enumerate(expansions[partial]))),
+                       None)
+        if partial is None:
+            out.append(lines[i])
+            kept.append(i)
+            i += 1
+            continue
+        end = i + len(expansions[partial])
+        name = hoist_rule_name(partial)
+        block = [f"See @{name} (`rules/{name}.md`)."]
+        if lines[i].startswith("#"):
+            block = [lines[i], ""] + block
+        if not lines[end - 1].strip():
+            block.append("")
+        out.extend(block)
+        kept.extend(min(i + n, end - 1) for n in range(len(block)))
+        i = end
+    return "\n".join(out), kept
+
+
+def print_hoist_report(hoist: dict, outputs: dict, indent: str = ""):
+    """Hoisted partials of a bundle and the bytes saved: inline copies removed minus the rules files."""
+    if not hoist:
+        print(f"{indent}🪝 Hoisted partials: none above the threshold")
+        return
+    removed = sum(entry.get("hoisted", 0) for entry in outputs.values())
+    rules = sum(entry["size"] for rel_out, entry in outputs.items()
+                if rel_out.startswith(f"rules/{HOIST_RULE_PREFIX}"))
+    partials = ", ".join(f"{Path(partial).stem} ({count} skills)" for partial, count in sorted(hoist.items()))
+    print(f"{indent}🪝 Hoisted partials: {partials}: {removed - rules} bytes saved")
@@ -0,0 +1,497 @@
+#!/usr/bin/env python3
+"""
+Include expansion for build.py: the single-pass tokenizer for both
+directive forms, the per-build partial cache, rendering with source maps,
+the include dependency graph and the --jobs skill render pool.
+"""
+
+import io
+import re
+import time
+import bisect
+import multiprocessing
+from pathlib import Path
+from typing import NamedTuple
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+
+from build_stats import capture_output, count_io, stats_lock
+from sources import decode_source, find_skill_dirs, is_binary, read_source
+
+# Include patterns:
+# New: {{include: partials/pre-handoff-validation.md}}
+# Legacy: <!-- INCLUDE: _meta/_skills/sections/pre-handoff-validation.md -->
+INCLUDE_PATTERN = re.compile(r'\{\{include:\s*([^\}]+)\}\}')
+LEGACY_INCLUDE_PATTERN = re.compile(r'<!--\s*INCLUDE:\s*([^>]+)\s*-->')
+# Both forms in one alternation: group 1 = new, group 2 = legacy
+DIRECTIVE_PATTERN = re.compile(f"{INCLUDE_PATTERN.pattern}|{LEGACY_INCLUDE_PATTERN.pattern}")
+# Byte-level sniff for either form, run before a file is decoded
+DIRECTIVE_SNIFF = re.compile(rb"\{\{include:|<!--\s*INCLUDE:")
+
+
+def has_directives(data: bytes) -> bool:
+    """True if raw file bytes contain an include directive of either form."""
+    return DIRECTIVE_SNIFF.search(data) is not None
+
+
+def remap_legacy_path(legacy_path: str) -> str:
+    """Remap legacy include paths to new structure."""
+    legacy_path = legacy_path.strip()
+    # _meta/_skills/sections/X.md -> partials/X.md
+    if "_meta/_skills/sections/" in legacy_path:
+        filename = legacy_path.split("/")[-1]
+        return f"partials/{filename}"
+    return legacy_path
+
+
+class IncludeRef(NamedTuple):
+    """An include directive found by tokenize()."""
+    path: str       # target relative to src/ (legacy paths remapped)
+    written: str    # target as written in the directive
+    legacy: bool    # <!-- INCLUDE: --> form
+    newlines: int = 0   # line breaks inside the directive itself
+
+
+def tokenize(content: str) -> list:
+    """
+    Split a document into literal strings and IncludeRef spans in a single
+    left-to-right pass over both directive forms.
+    """
+    spans = []
+    pos = 0
+    for match in DIRECTIVE_PATTERN.finditer(content):
+        if match.start() > pos:
+            spans.append(content[pos:match.start()])
+        newlines = match.group(0).count("\n")
+        if match.group(1) is not None:
+            written = match.group(1).strip()
+            spans.append(IncludeRef(written, written, False, newlines))
+        else:
+            written = match.group(2).strip()
+            spans.append(IncludeRef(remap_legacy_path(written), written, True, newlines))
+        pos = match.end()
+    if pos < len(content):
+        spans.append(content[pos:])
+    return spans
+
+
+class IncludeCache:
+    """
+    Per-build cache of fully expanded partials, keyed by resolved include
+    path. Each partial is read and expanded once and then spliced into every
+    includer, so memory is bounded by the total size of distinct partials.
+    Both {{include:}} and legacy <!-- INCLUDE: --> directives share it.
+    
+    It also keeps the tokenize() span list of every include target, so the
+    include graph pass and rendering tokenize each partial only once. Files
+    nothing includes (skill bodies, rules, ...) are tokenized once per pass
+    anyway and are not kept.
+    
+    `reported` holds the (includer, target) pairs whose missing target
+    check_include_graph() already warned about; rendering stays quiet on them.
+    """
+    
+    def __init__(self):
+        self._rendered = {}
+        self._spans = {}
+        self._targets = set()
+        self.reported = set()
+        self.hits = 0
+        self.misses = 0
+    
+    def get(self, full_path: Path):
+        """Return (expanded content, nested include paths, line sources) or None."""
+        entry = self._rendered.get(full_path.resolve())
+        with stats_lock:
+            if entry is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return entry
+    
+    def put(self, full_path: Path, content: str, deps: set, lines: list):
+        self._rendered[full_path.resolve()] = (content, frozenset(deps), lines)
+    
+    def invalidate(self, full_paths):
+        """Forget expanded content of files that changed (and their includers)."""
+        for full_path in full_paths:
+            self._rendered.pop(full_path.resolve(), None)
+    
+    def add_targets(self, full_paths):
+        """Mark files as include targets, whose spans are worth keeping."""
+        self._targets.update(full_path.resolve() for full_path in full_paths)
+    
+    def spans(self, file_path: Path, content: str) -> list:
+        """tokenize(content), reused while an include target's content is unchanged."""
+        key = file_path.resolve()
+        if key not in self._targets:
+            return tokenize(content)
+        entry = self._spans.get(key)
+        if entry is None or entry[0] != content:
+            entry = (content, tokenize(content))
+            self._spans[key] = entry
+        return entry[1]
+
+
+def expand_include(include_path: str, src_dir: Path, deps: set = None, cache: IncludeCache = None):
+    """
+    Read and fully expand one include target (None if it does not exist).
+    
+    The target itself and everything it includes are added to `deps`.
+    """
+    entry = expand_include_lines(include_path, src_dir, deps, cache)
+    return entry[0] if entry is not None else None
+
+
+def expand_include_lines(include_path: str, src_dir: Path, deps: set = None, cache: IncludeCache = None):
+    """expand_include() returning (content, line sources), see render_includes()."""
+    full_path = src_dir / include_path
+    if deps is not None:
+        deps.add(include_path)
+    
+    if not full_path.exists():
+        return None
+    
+    entry = cache.get(full_path) if cache is not None else None
+    if entry is None:
+        if cache is not None:
+            cache.add_targets([full_path])
+        nested_deps = set()
+        include_content = read_source(full_path)
+        # Recursively process includes in included files
+        include_content, lines = render_includes(include_content, src_dir, full_path, nested_deps, cache)
+        entry = (include_content, frozenset(nested_deps), lines)
+        if cache is not None:
+            cache.put(full_path, *entry)
+    
+    include_content, nested_deps, lines = entry
+    if deps is not None:
+        deps.update(nested_deps)
+    return include_content, lines
+
+
+def process_includes(content: str, src_dir: Path, file_path: Path, deps: set = None,
+                     cache: IncludeCache = None) -> str:
+    """
+    Replace include directives with file contents.
+    
+    If `deps` is given, every include path (relative to src/) that was
+    resolved, including missing ones, is added to it. With a `cache`, each
+    partial is expanded only once per build.
+    """
+    return render_includes(content, src_dir, file_path, deps, cache)[0]
+
+
+def _map_lines(text: str, source: str, line: int, at_start: bool, lines: list):
+    """
+    Append (source, line) for every output line that starts inside `text`,
+    which begins at `line` of `source`. Returns the updated (line, at_start).
+    """
+    for i, piece in enumerate(text.split("\n")):
+        if i:
+            if at_start:
+                lines.append((source, line))
+            at_start = True
+            line += 1
+        if piece and at_start:
+            lines.append((source, line))
+            at_start = False
+    return line, at_start
+
+
+def render_includes(content: str, src_dir: Path, file_path: Path, deps: set = None,
+                    cache: IncludeCache = None):
+    """
+    process_includes() that also returns where every output line came from:
+    a list with one (src path, line) per output line. A line that an include
+    splices into is credited to the file holding the directive.
+    """
+    try:
+        source = file_path.relative_to(src_dir).as_posix()
+    except ValueError:
+        source = file_path.as_posix()
+    spans = cache.spans(file_path, content) if cache is not None else tokenize(content)
+    
+    parts = []
+    lines = []
+    line, at_start = 1, True
+    for span in spans:
+        if isinstance(span, str):
+            parts.append(span)
+            line, at_start = _map_lines(span, source, line, at_start, lines)
+            continue
+        
+        entry = expand_include_lines(span.path, src_dir, deps, cache)
+        if entry is None:
+            # Already reported by check_include_graph()
+            reported = cache is not None and (source, span.path) in cache.reported
+            if span.legacy and not reported:
+                print(f"  ⚠️  Legacy include not found: {span.written} -> {span.path} (in {file_path})")
+            elif not reported:
+                print(f"  ⚠️  Include not found: {span.path} (in {file_path})")
+            include_content = f"<!-- ERROR: Include not found: {span.written} -->"
+            _, at_start = _map_lines(include_content, source, line, at_start, lines)
+        else:
+            include_content, include_lines = entry
+            if include_content:
+                lines.extend(include_lines if at_start else include_lines[1:])
+                at_start = include_content.endswith("\n")
+        parts.append(include_content)
+        line += span.newlines
+    
+    return "".join(parts), lines
+
+
+def compact_source_map(lines: list) -> list:
+    """
+    Runs of render_includes() line sources: [[output line, src path, src
+    line, count], ...]. Lines whose source is None are left unmapped.
+    """
+    runs = []
+    for out_line, entry in enumerate(lines, 1):
+        if entry is None:
+            continue
+        source, line = entry
+        last = runs[-1] if runs else None
+        if (last and last[0] + last[3] == out_line
+                and last[1] == source and last[2] + last[3] == line):
+            last[3] += 1
+        else:
+            runs.append([out_line, source, line, 1])
+    return runs
+
+
+def source_location(outputs: dict, rel_out: str, line: int):
+    """
+    (src path, line) that `line` (1-based) of output rel_out was built from,
+    given the manifest's outputs; None if unknown. Verbatim copies map line
+    for line to their source.
+    """
+    entry = outputs.get(rel_out)
+    if not entry:
+        return None
+    runs = entry.get("map")
+    if runs is None:
+        return (entry["source"], line) if entry.get("source") else None
+    index = bisect.bisect_right([run[0] for run in runs], line) - 1
+    if index < 0:
+        return None
+    out_line, source, src_line, count = runs[index]
+    if line >= out_line + count:
+        return None
+    return source, src_line + line - out_line
+
+
+def remap_source_map(runs: list, kept: list) -> list:
+    """Source map of an output rewritten so that its line i is old line kept[i] (0-based)."""
+    sources = {}
+    for out_line, source, src_line, count in runs:
+        for offset in range(count):
+            sources[out_line + offset] = (source, src_line + offset)
+    return compact_source_map([sources.get(old + 1) for old in kept])
+
+
+def find_include_roots(src_dir: Path) -> list:
+    """All files that build.py renders with includes (relative to src/)."""
+    roots = []
+    
+    src_skills = src_dir / "skills"
+    if src_skills.exists():
+        for skill_dir, _ in find_skill_dirs(src_skills):
+            if (skill_dir / "SKILL.md").exists():
+                roots.append(skill_dir / "SKILL.md")
+    
+    for pattern in ("rules/*.md", "workflows/*.md", "templates/documents/*"):
+        roots.extend(f for f in src_dir.glob(pattern) if f.is_file())
+    
+    return sorted(f.relative_to(src_dir).as_posix() for f in roots)
+
+
+def find_directives(content: str, file_path: Path = None, cache: IncludeCache = None) -> list:
+    """Include targets referenced by a document, in order (legacy paths remapped)."""
+    spans = cache.spans(file_path, content) if cache is not None else tokenize(content)
+    return [span.path for span in spans if isinstance(span, IncludeRef)]
+
+
+class IncludeGraph:
+    """
+    Forward and reverse include dependency graph of src/.
+    
+    Built in one pass over every skill, rule, workflow and template plus the
+    partials they reach; each file is read once. Nodes are paths relative to
+    src/. Cycles and missing targets are found before anything is rendered.
+    """
+    
+    def __init__(self):
+        self.forward = {}
+        self.reverse = defaultdict(set)
+        self.missing = []
+    
+    @classmethod
+    def scan(cls, src_dir: Path, roots: list = None, cache: IncludeCache = None) -> "IncludeGraph":
+        graph = cls()
+        graph._visit(src_dir, list(roots if roots is not None else find_include_roots(src_dir)), cache)
+        return graph
+    
+    def _visit(self, src_dir: Path, pending: list, cache: IncludeCache = None):
+        while pending:
+            node = pending.pop()
+            if node in self.forward:
+                continue
+            full_path = src_dir / node
+            targets = []
+            if full_path.is_file():
+                data = full_path.read_bytes()
+                count_io(read=len(data))
+                if has_directives(data) and not is_binary(data):
+                    targets = find_directives(decode_source(data), full_path, cache)
+            self.forward[node] = targets
+            if cache is not None:
+                cache.add_targets(src_dir / target for target in targets)
+            
+            for target in targets:
+                self.reverse[target].add(node)
+                if not (src_dir / target).is_file():
+                    self.missing.append((node, target))
+                elif target not in self.forward:
+                    pending.append(target)
+        
+        self.missing.sort()
+    
+    def rescan(self, src_dir: Path, nodes, cache: IncludeCache = None):
+        """Re-read the directives of changed nodes and update both indexes."""
+        nodes = set(nodes)
+        for node in nodes:
+            for target in self.forward.pop(node, []):
+                self.reverse[target].discard(node)
+        self.missing = [(includer, target) for includer, target in self.missing if includer not in nodes]
+        self._visit(src_dir, sorted(nodes), cache)
+    
+    @property
+    def edge_count(self) -> int:
+        return sum(len(targets) for targets in self.forward.values())
+    
+    def find_cycles(self) -> list:
+        """Return include cycles as node paths (iterative DFS, linear time)."""
+        WHITE, GREY, BLACK = 0, 1, 2
+        color = defaultdict(int)
+        cycles = []
+        
+        for start in sorted(self.forward):
+            if color[start] != WHITE:
+                continue
+            color[start] = GREY
+            path = [start]
+            stack = [iter(self.forward[start])]
+            
+            while stack:
+                target = next(stack[-1], None)
+                if target is None:
+                    color[path.pop()] = BLACK
+                    stack.pop()
+                elif color[target] == GREY:
+                    cycles.append(path[path.index(target):] + [target])
+                elif color[target] == WHITE and target in self.forward:
+                    color[target] = GREY
+                    path.append(target)
+                    stack.append(iter(self.forward[target]))
+        
+        return cycles
+    
+    def dependents(self, rel_path: str) -> set:
+        """rel_path plus every file that includes it, directly or transitively."""
+        seen = {rel_path}
+        pending = [rel_path]
+        while pending:
+            for includer in self.reverse.get(pending.pop(), ()):
+                if includer not in seen:
+                    seen.add(includer)
+                    pending.append(includer)
+        return seen
+
+
+def check_include_graph(graph: IncludeGraph, cache: IncludeCache = None) -> bool:
+    """
+    Report missing includes and cycles up front. False if the build can't
+    proceed. Missing includes reported here are not reported again when
+    rendering with `cache`.
+    """
+    for includer, target in graph.missing:
+        print(f"  ⚠️  Include not found: {target} (in {includer})")
+    if cache is not None:
+        cache.reported.update(graph.missing)
+    
+    cycles = graph.find_cycles()
+    for cycle in cycles:
+        print(f"  ❌ Include cycle: {' -> '.join(cycle)}")
+    
+    return not cycles
+
+
+class RenderedSkill(NamedTuple):
+    """Result of render_skill(); `log` holds warnings to print in skill order."""
+    content: str
+    deps: set
+    source_map: list
+    log: str
+    seconds: float
+    cache_hits: int
+    cache_misses: int
+
+
+def render_skill(content: str, src_dir: Path, skill_md: Path, cache: IncludeCache = None) -> RenderedSkill:
+    """Expand includes of one SKILL.md, capturing warnings and cache usage."""
+    if cache is None:
+        cache = IncludeCache()
+    deps = set()
+    log = io.StringIO()
+    hits, misses = cache.hits, cache.misses
+    started = time.perf_counter()
+    with capture_output(log):
+        processed, lines = render_includes(content, src_dir, skill_md, deps, cache)
+    return RenderedSkill(processed, deps, compact_source_map(lines), log.getvalue(),
+                         time.perf_counter() - started, cache.hits - hits, cache.misses - misses)
+
+
+# Per-process state of --jobs workers: (src_dir, pre-expanded partials)
+_worker_state = None
+
+
+def _init_skill_worker(src_dir: Path, cache: IncludeCache):
+    global _worker_state
+    _worker_state = (src_dir, cache)
+
+
+def _render_skill_task(task):
+    src_dir, cache = _worker_state
+    skill_md, content = task
+    return render_skill(content, src_dir, skill_md, cache)
+
+
+def render_skills(tasks: list, src_dir: Path, cache: IncludeCache, jobs: int = 1):
+    """
+    Render (skill_md, content) tasks, in order. With jobs > 1 the partials are
+    expanded once in this process and shipped to a process pool with the
+    tasks, so workers only splice cached text.
+    """
+    if jobs <= 1 or len(tasks) <= 1:
+        return [render_skill(content, src_dir, skill_md, cache) for skill_md, content in tasks]
+    
+    # Pre-expand every partial the skills reach
+    for skill_md, content in tasks:
+        for target in find_directives(content, skill_md, cache):
+            expand_include(target, src_dir, None, cache)
+    
+    chunksize = max(1, len(tasks) // (jobs * 4))
+    # Workers start from a fresh interpreter, not a fork of this process: the
+    # other phases' threads may hold locks that a forked child would inherit
+    methods = multiprocessing.get_all_start_methods()
+    context = multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+    with ProcessPoolExecutor(max_workers=jobs, mp_context=context, initializer=_init_skill_worker,
+                             initargs=(src_dir, cache)) as executor:
+        results = list(executor.map(_render_skill_task, tasks, chunksize=chunksize))
+    # Fold the workers' cache usage back into this process's counters
+    for result in results:
+        cache.hits += result.cache_hits
+        cache.misses += result.cache_misses
+    return results
@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+--minify: Markdown compaction of built SKILL.md files. The text keeps its
+meaning; every output line records the input line it came from, so source
+maps can be carried over (remap_source_map()).
+"""
+
+import re
+
+from sources import FRONTMATTER_PATTERN
+
+# --minify: Markdown syntax the compaction of built SKILL.md files recognizes
+QUOTE_PREFIX_PATTERN = re.compile(r'(?:[ ]{0,3}>[ ]?)*')
+# Any indentation: fences nested in list items are indented relative to the item
+FENCE_PATTERN = re.compile(r'[ \t]*(`{3,}|~{3,})')
+CODE_SPAN_PATTERN = re.compile(r'(`+).+?\1')
+THEMATIC_BREAK_PATTERN = re.compile(r'[ ]{0,3}([-*_])(?:[ \t]*\1){2,}[ \t]*')
+TABLE_DELIMITER_PATTERN = re.compile(r'\|?\s*:?-+:?\s*(?:\|\s*:?-+:?\s*)*\|?')
+TABLE_CELL_SPLIT = re.compile(r'(?<!\\)\|')
+
+
+def _strip_html_comments(line: str, in_comment: bool) -> tuple:
+    """(line without HTML comments, whether a comment is still open at its end)."""
+    if in_comment:
+        end = line.find("-->")
+        if end < 0:
+            return "", True
+        line = line[end + 3:]
+    while True:
+        spans = [match.span() for match in CODE_SPAN_PATTERN.finditer(line)]
+        start = next((match.start() for match in re.finditer("<!--", line)
+                      if not any(s <= match.start() < e for s, e in spans)), -1)
+        if start < 0:
+            return line, False
+        end = line.find("-->", start + 4)
+        if end < 0:
+            return line[:start], True
+        line = line[:start] + line[end + 3:]
+
+
+def _collapse_spaces(text: str) -> str:
+    """Runs of spaces and tabs to one space, except inside code spans."""
+    parts, pos = [], 0
+    for match in CODE_SPAN_PATTERN.finditer(text):
+        parts.append(re.sub(r"[ \t]{2,}", " ", text[pos:match.start()]))
+        parts.append(match.group(0))
+        pos = match.end()
+    parts.append(re.sub(r"[ \t]{2,}", " ", text[pos:]))
+    return "".join(parts)
+
+
+def _table_row(body: str) -> str:
+    """A table row without cell padding (delimiter cells shortened to one dash)."""
+    cells = TABLE_CELL_SPLIT.split(body.strip())
+    if cells and not cells[0].strip():
+        cells = cells[1:]
+    if len(cells) > 1 and not cells[-1].strip():
+        cells = cells[:-1]
+    if TABLE_DELIMITER_PATTERN.fullmatch(body.strip()):
+        cells = [re.sub(r"-+", "-", cell.strip()) for cell in cells]
+    return "|" + "|".join(cell.strip() for cell in cells) + "|"
+
+
+def minify_markdown(content: str) -> tuple:
+    """
+    --minify: compact a built SKILL.md without changing what it says. Outside
+    the frontmatter and code fences (at any indentation, e.g. inside list
+    items), HTML comments (including include ERROR
+    markers) and thematic breaks are dropped, runs of blank lines and of
+    spaces collapse to one, and table rows lose their cell padding. Indented
+    lines keep their inner spacing. Returns (text, kept): kept[i] is the
+    input line (0-based) that output line i came from.
+    """
+    lines = content.split("\n")
+    match = FRONTMATTER_PATTERN.match(content)
+    start = match.group(0).count("\n") + 1 if match else 0
+    out, kept = lines[:start], list(range(start))
+    fence = None
+    in_comment = False
+    in_table = False
+    
+    def blank(text):
+        return not text.strip(" \t>")
+    
+    for i in range(start, len(lines)):
+        line = lines[i]
+        prefix = QUOTE_PREFIX_PATTERN.match(line).group(0)
+        body = line[len(prefix):]
+        if fence is not None:
+            out.append(line)
+            kept.append(i)
+            marker = body.strip()
+            if marker.startswith(fence) and not marker.strip(fence[0]):
+                fence = None
+            continue
+        
+        line, still_open = _strip_html_comments(line, in_comment)
+        if in_comment and not line and still_open:
+            continue
+        in_comment = still_open
+        prefix = QUOTE_PREFIX_PATTERN.match(line).group(0)
+        body = line[len(prefix):]
+        
+        fence_match = FENCE_PATTERN.match(body)
+        if fence_match:
+            fence = fence_match.group(1)
+            in_table = False
+            out.append(line.rstrip())
+            kept.append(i)
+            continue
+        
+        if not body.strip():
+            in_table = False
+            if out[start:] and not blank(out[-1]):
+                out.append(prefix.rstrip())
+                kept.append(i)
+            continue
+        if THEMATIC_BREAK_PATTERN.fullmatch(body) and (not out[start:] or blank(out[-1])):
+            continue
+        
+        if body.lstrip().startswith("|"):
+            following = lines[i + 1][len(prefix):] if i + 1 < len(lines) else ""
+            if in_table or TABLE_DELIMITER_PATTERN.fullmatch(following.strip()):
+                in_table = True
+                out.append(prefix.rstrip() + _table_row(body))
+                kept.append(i)
+                continue
+        in_table = False
+        
+        indent = body[:len(body) - len(body.lstrip())]
+        hard_break = "  " if body.endswith("  ") else ""
+        rest = body.strip()
+        if len(indent.expandtabs(4)) < 4:
+            rest = _collapse_spaces(rest)
+        out.append(prefix + indent + rest + hard_break)
+        kept.append(i)
+    
+    while len(out) > start and blank(out[-1]):
+        out.pop()
+        kept.pop()
+    return "\n".join(out) + "\n", kept
+
+
+def print_minify_report(outputs: dict):
+    """Per-skill before/after bytes of a --minify build."""
+    rows = sorted((rel_out.split("/")[1], entry["unminified"], entry["size"])
+                  for rel_out, entry in outputs.items() if "unminified" in entry)
+    if not rows:
+        return
+    print("\n🗜️  Minified skills:")
+    for name, before, after in rows:
+        print(f"  {name}: {before} → {after} bytes (-{(before - after) * 100 / before:.1f}%)")
+    before, after = sum(row[1] for row in rows), sum(row[2] for row in rows)
+    print(f"  Total: {before} → {after} bytes (-{(before - after) * 100 / before:.1f}%)")
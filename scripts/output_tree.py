@@ -0,0 +1,248 @@
+#!/usr/bin/env python3
+"""
+Where build.py writes its outputs: a DirectoryTree on disk (a staging
+directory swapped into place as dist/ when the build is done) or a
+VirtualTree in memory (archives, dry runs, the build() API). Verbatim
+copies go through copy_asset(), which uses the cheapest copy the
+filesystem offers.
+"""
+
+import os
+import sys
+import shutil
+import ctypes
+from pathlib import Path
+from typing import NamedTuple
+
+from atomic_write import same_content
+from build_stats import count_io
+
+
+def staging_dir_for(dist_dir: Path) -> Path:
+    """Sibling directory a build is written into before it replaces dist/."""
+    return dist_dir.with_name(f".{dist_dir.name}.staging")
+
+
+def _exchange_paths(path_a: Path, path_b: Path) -> bool:
+    """Atomically swap two paths (renameat2/renamex_np). False if unsupported."""
+    try:
+        libc = ctypes.CDLL(None, use_errno=True)
+    except OSError:
+        return False
+    a, b = os.fsencode(path_a), os.fsencode(path_b)
+    if hasattr(libc, "renameat2"):
+        at_fdcwd, rename_exchange = -100, 2
+        return libc.renameat2(at_fdcwd, a, at_fdcwd, b, rename_exchange) == 0
+    if hasattr(libc, "renamex_np"):
+        rename_swap = 2
+        return libc.renamex_np(a, b, rename_swap) == 0
+    return False
+
+
+def swap_into_place(staging_dir: Path, dist_dir: Path):
+    """
+    Replace dist_dir with the finished staging_dir. Readers see either the
+    old or the new tree, never a partial one; the old tree is removed after.
+    """
+    if not dist_dir.exists():
+        os.rename(staging_dir, dist_dir)
+        return
+    if _exchange_paths(staging_dir, dist_dir):
+        shutil.rmtree(staging_dir)
+        return
+    # No atomic exchange on this platform: two renames, short window
+    old_dir = dist_dir.with_name(f".{dist_dir.name}.old")
+    if old_dir.exists():
+        shutil.rmtree(old_dir)
+    os.rename(dist_dir, old_dir)
+    os.rename(staging_dir, dist_dir)
+    shutil.rmtree(old_dir)
+
+
+class DirectoryTree:
+    """
+    Build output written to files under `root` (normally the staging dir).
+    Outputs identical to their copy in `prev_root` (the previous dist/) are
+    hardlinked from it rather than rewritten, so their mtimes do not change.
+    write() and copy() return False in that case.
+    """
+    
+    def __init__(self, root: Path, prev_root: Path = None):
+        self.root = root
+        self.prev_root = prev_root
+    
+    def _keep_previous(self, rel_out: str, data: bytes) -> bool:
+        if self.prev_root is None or not same_content(self.prev_root / rel_out, data):
+            return False
+        link_or_copy(self.prev_root / rel_out, self.root / rel_out)
+        return True
+    
+    def write(self, rel_out: str, data: bytes) -> bool:
+        if self._keep_previous(rel_out, data):
+            return False
+        out_path = self.root / rel_out
+        out_path.parent.mkdir(parents=True, exist_ok=True)
+        out_path.write_bytes(data)
+        return True
+    
+    def copy(self, src_file: Path, rel_out: str) -> bool:
+        """Copy a src/ file verbatim (reflink where possible, see copy_asset())."""
+        prev_file = self.prev_root / rel_out if self.prev_root is not None else None
+        if (prev_file is not None and prev_file.is_file()
+                and prev_file.stat().st_size == src_file.stat().st_size
+                and self._keep_previous(rel_out, src_file.read_bytes())):
+            return False
+        copy_asset(src_file, self.root / rel_out)
+        return True
+    
+    def link(self, prev_file: Path, rel_out: str):
+        """Reuse an existing file unchanged (hardlink where possible)."""
+        link_or_copy(prev_file, self.root / rel_out)
+    
+    def alias(self, rel_existing: str, rel_out: str):
+        """Make rel_out share the content of another output of this tree."""
+        link_or_copy(self.root / rel_existing, self.root / rel_out)
+
+
+class AssetRef(NamedTuple):
+    """An output copied verbatim from a file; read only when consumed."""
+    path: Path
+
+
+class VirtualTree:
+    """
+    Build output held in memory: output path -> rendered bytes, or an
+    AssetRef for files that are copied verbatim. Nothing touches disk.
+    Aliased outputs (team bundles) share their target's value.
+    """
+    
+    def __init__(self):
+        self.files = {}
+        self.aliases = {}
+    
+    def write(self, rel_out: str, data: bytes) -> bool:
+        self.files[rel_out] = data
+        self.aliases.pop(rel_out, None)
+        return True
+    
+    def copy(self, src_file: Path, rel_out: str) -> bool:
+        self.files[rel_out] = AssetRef(src_file)
+        self.aliases.pop(rel_out, None)
+        return True
+    
+    link = copy
+    
+    def alias(self, rel_existing: str, rel_out: str):
+        self.files[rel_out] = self.files[rel_existing]
+        self.aliases[rel_out] = self.aliases.get(rel_existing, rel_existing)
+    
+    def read(self, rel_out: str) -> bytes:
+        value = self.files[rel_out]
+        return value.path.read_bytes() if isinstance(value, AssetRef) else value
+    
+    def read_text(self, rel_out: str) -> str:
+        return self.read(rel_out).decode()
+    
+    def is_dir(self, rel_dir: str) -> bool:
+        prefix = rel_dir.rstrip("/") + "/"
+        return any(rel_out.startswith(prefix) for rel_out in self.files)
+    
+    def listdir(self, rel_dir: str) -> list:
+        """Names of the files and directories directly under rel_dir, sorted."""
+        prefix = rel_dir.rstrip("/") + "/"
+        return sorted({rel_out[len(prefix):].split("/")[0]
+                       for rel_out in self.files if rel_out.startswith(prefix)})
+    
+    def items(self) -> list:
+        """(path, bytes or AssetRef) pairs in sorted path order."""
+        return sorted(self.files.items())
+    
+    def __contains__(self, rel_out: str) -> bool:
+        return rel_out in self.files
+    
+    def __len__(self) -> int:
+        return len(self.files)
+
+
+# Linux ioctl that makes dst share src's extents (copy-on-write reflink)
+FICLONE = 0x40049409
+
+
+def _clonefile(src_file: Path, dst_file: Path) -> bool:
+    """macOS clonefile(2) (APFS copy-on-write); False if unavailable."""
+    if sys.platform != "darwin":
+        return False
+    try:
+        libc = ctypes.CDLL(None, use_errno=True)
+        return libc.clonefile(os.fsencode(src_file), os.fsencode(dst_file), 0) == 0
+    except (OSError, AttributeError):
+        return False
+
+
+def _reflink(src, dst) -> bool:
+    try:
+        import fcntl
+        fcntl.ioctl(dst.fileno(), FICLONE, src.fileno())
+        return True
+    except (ImportError, OSError):
+        return False
+
+
+def _copy_range(src, dst, size: int) -> bool:
+    """In-kernel copy with os.copy_file_range; False (and dst empty) on failure."""
+    if not hasattr(os, "copy_file_range"):
+        return False
+    copied = 0
+    try:
+        while copied < size:
+            n = os.copy_file_range(src.fileno(), dst.fileno(), size - copied, copied, copied)
+            if n == 0:
+                break
+            copied += n
+    except OSError:
+        os.ftruncate(dst.fileno(), 0)
+        return False
+    return copied == size
+
+
+def copy_asset(src_file: Path, dst_file: Path) -> str:
+    """
+    Copy one file to dist/ as cheaply as the filesystem allows: reflink,
+    then copy_file_range, then a plain copy. Metadata is preserved like
+    shutil.copy2. dist/ never hardlinks src/, so editing a built file
+    cannot change its source.
+    
+    Returns the method used ("reflink", "copy_file_range" or "copy").
+    """
+    dst_file.parent.mkdir(parents=True, exist_ok=True)
+    # Never write through an existing (possibly hardlinked) destination
+    if dst_file.exists() or dst_file.is_symlink():
+        dst_file.unlink()
+    
+    if _clonefile(src_file, dst_file):
+        method = "reflink"
+    else:
+        method = None
+        with open(src_file, "rb") as src, open(dst_file, "wb") as dst:
+            if _reflink(src, dst):
+                method = "reflink"
+            elif _copy_range(src, dst, os.fstat(src.fileno()).st_size):
+                method = "copy_file_range"
+        
+        if method is None:
+            shutil.copyfile(src_file, dst_file)
+            method = "copy"
+    
+    shutil.copystat(src_file, dst_file)
+    size = src_file.stat().st_size
+    count_io(read=size, written=size)
+    return method
+
+
+def link_or_copy(src_file: Path, dst_file: Path):
+    """Hardlink src_file to dst_file, falling back to a copy across filesystems."""
+    dst_file.parent.mkdir(parents=True, exist_ok=True)
+    try:
+        os.link(src_file, dst_file)
+    except OSError:
+        copy_asset(src_file, dst_file)
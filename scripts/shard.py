@@ -0,0 +1,24 @@
+#!/usr/bin/env python3
+"""
+--shard i/N: the stable split of the skills across CI shards (also used by
+validate_skills.py --shard).
+"""
+
+import re
+import hashlib
+
+# --shard i/N: "2/4" builds the skills of shard 2 of 4 (1-based)
+SHARD_PATTERN = re.compile(r"(\d+)/(\d+)")
+
+
+def parse_shard(spec: str) -> tuple:
+    """(index, count) of an "i/N" shard spec, 1 <= i <= N. Raises ValueError."""
+    match = SHARD_PATTERN.fullmatch(spec.strip())
+    if not match or not 1 <= int(match.group(1)) <= int(match.group(2)):
+        raise ValueError(f"Invalid shard '{spec}': expected i/N with 1 <= i <= N")
+    return int(match.group(1)), int(match.group(2))
+
+
+def shard_of(skill_name: str, count: int) -> int:
+    """Shard (1-based) a skill belongs to out of `count`, stable across machines and runs."""
+    return int(hashlib.sha256(skill_name.encode()).hexdigest()[:16], 16) % count + 1
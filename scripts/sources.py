@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+"""
+Reading src/ for build.py: source files, frontmatter, skill presets (from a
+bounded read of the frontmatter), the preset hierarchy and team
+membership, and the skill directories.
+"""
+
+import io
+import re
+from pathlib import Path
+
+import yaml
+
+from build_stats import active_profile, count_io
+
+# YAML frontmatter pattern
+FRONTMATTER_PATTERN = re.compile(r'^---\s*\n(.*?)\n---', re.DOTALL)
+
+# Team filtering reads a SKILL.md head in chunks, up to a bound, to find its presets
+FRONTMATTER_CHUNK = 4096
+FRONTMATTER_MAX_BYTES = 65536
+PRESET_ITEM_PATTERN = re.compile(r'^[ \t]+-[ \t]+([\w.-]+)[ \t]*$')
+
+
+def read_source(path: Path) -> str:
+    """Read a src/ text file (counted by --profile)."""
+    content = path.read_text()
+    if active_profile() is not None:
+        count_io(read=path.stat().st_size)
+    return content
+
+
+def parse_frontmatter(content: str) -> dict:
+    """Extract YAML frontmatter from markdown content."""
+    match = FRONTMATTER_PATTERN.match(content)
+    if not match:
+        return {}
+    return load_frontmatter(match.group(1))
+
+
+def load_frontmatter(block: str) -> dict:
+    try:
+        return yaml.safe_load(block) or {}
+    except yaml.YAMLError:
+        return {}
+
+
+def read_frontmatter_block(path: Path) -> tuple:
+    """
+    (frontmatter text, bytes read) of a file, reading its head chunk by
+    chunk until the closing --- (at most FRONTMATTER_MAX_BYTES). The text
+    is None if the file has no frontmatter closing within that prefix.
+    """
+    head = b""
+    match = None
+    with open(path, "rb") as f:
+        while match is None and len(head) < FRONTMATTER_MAX_BYTES:
+            chunk = f.read(FRONTMATTER_CHUNK)
+            if not chunk:
+                break
+            head += chunk
+            if not head.startswith(b"---"):
+                break
+            match = FRONTMATTER_PATTERN.match(head.decode("utf-8", errors="replace"))
+    count_io(read=len(head))
+    return (match.group(1) if match else None), head
+
+
+def read_rest(path: Path, head: bytes) -> bytes:
+    """All bytes of a file whose first bytes (`head`) were already read."""
+    with open(path, "rb") as f:
+        f.seek(len(head))
+        rest = f.read()
+    count_io(read=len(rest))
+    return head + rest
+
+
+def read_source_rest(path: Path, head: bytes) -> str:
+    """Like read_source() for a file whose first bytes (`head`) were already read."""
+    return decode_source(read_rest(path, head))
+
+
+def decode_source(data: bytes) -> str:
+    """Decode src/ bytes exactly as read_source() would (text mode, universal newlines)."""
+    return io.TextIOWrapper(io.BytesIO(data)).read()
+
+
+def is_binary(data: bytes) -> bool:
+    """NUL bytes or invalid UTF-8: the file is opaque and never decoded as text."""
+    if b"\0" in data:
+        return True
+    try:
+        data.decode()
+    except UnicodeDecodeError:
+        return True
+    return False
+
+
+def scan_presets(block: str):
+    """
+    The top-level `presets` list of a frontmatter block without a YAML
+    parse: `presets: [a, b]` or a block list of plain names. None when the
+    key has any other shape, so the caller can fall back to YAML.
+    """
+    lines = block.split("\n")
+    found = [i for i, line in enumerate(lines) if line.startswith("presets:")]
+    if not found:
+        return []
+    if len(found) > 1:
+        return None
+    
+    start = found[0]
+    rest = lines[start][len("presets:"):].strip()
+    if rest.startswith("[") and rest.endswith("]"):
+        items = [item.strip() for item in rest[1:-1].split(",") if item.strip()]
+        return items if all(re.fullmatch(r'[\w.-]+', item) for item in items) else None
+    if rest:
+        return None
+    
+    presets = []
+    for line in lines[start + 1:]:
+        item = PRESET_ITEM_PATTERN.match(line)
+        if item is None:
+            if not line.strip():
+                continue
+            if line[0] in " \t":
+                return None
+            break
+        presets.append(item.group(1))
+    return presets or None
+
+
+def read_skill_presets(skill_md: Path) -> tuple:
+    """
+    (presets, bytes read) of a SKILL.md from a bounded read of its
+    frontmatter. The full YAML parse (and full file read) only happens for
+    unusual frontmatter. Pass the bytes to read_source_rest() to render it.
+    """
+    block, head = read_frontmatter_block(skill_md)
+    if block is None:
+        head = read_rest(skill_md, head)
+        return parse_frontmatter(io.TextIOWrapper(io.BytesIO(head)).read()).get("presets", []), head
+    presets = scan_presets(block)
+    if presets is None:
+        presets = load_frontmatter(block).get("presets", [])
+    return presets, head
+
+
+def load_preset_hierarchy(src_dir: Path) -> dict:
+    """Load preset hierarchy to resolve inheritance."""
+    hierarchy_file = src_dir / "_meta" / "preset-hierarchy.yaml"
+    if not hierarchy_file.exists():
+        return {}
+    
+    with open(hierarchy_file) as f:
+        return yaml.safe_load(f) or {}
+
+
+def resolve_team_presets(team: str, hierarchy: dict) -> set:
+    """
+    Resolve all presets that should be included for a team.
+    E.g., 'backend' → {'backend', 'core'} (because backend inherits core)
+    """
+    if team == "all":
+        return {"all"}
+    
+    resolved = {team}
+    
+    # Get direct inheritance
+    team_config = hierarchy.get(team, {})
+    inherits = team_config.get("inherits", [])
+    
+    for parent in inherits:
+        resolved.update(resolve_team_presets(parent, hierarchy))
+    
+    return resolved
+
+
+def get_teams_for_preset(preset: str, hierarchy: dict) -> set:
+    """
+    Get all teams that include this preset.
+    E.g., 'core' → {'core', 'backend', 'frontend', 'fullstack', 'tma', 'cli'}
+    """
+    teams = {preset}
+    
+    for team_name, team_config in hierarchy.items():
+        inherits = team_config.get("inherits", [])
+        if preset in inherits:
+            teams.update(get_teams_for_preset(team_name, hierarchy))
+    
+    return teams
+
+
+def skill_matches_teams(skill_presets: list, target_teams: set, hierarchy: dict) -> bool:
+    """Check if a skill belongs to any of the target teams."""
+    if "all" in target_teams:
+        return True
+    
+    for preset in skill_presets:
+        # Direct match
+        if preset in target_teams:
+            return True
+        
+        # Check if any target team inherits from this preset
+        teams_for_preset = get_teams_for_preset(preset, hierarchy)
+        if teams_for_preset & target_teams:
+            return True
+        
+        # Check if this skill's preset is a parent of target teams
+        for target in target_teams:
+            resolved = resolve_team_presets(target, hierarchy)
+            if preset in resolved:
+                return True
+    
+    return False
+
+
+def find_skill_dirs(src_skills: Path) -> list:
+    """List (skill_dir, is_private) for all skills, including private/*."""
+    skill_dirs = []
+    
+    for item in src_skills.iterdir():
+        if not item.is_dir():
+            continue
+        if item.name == "private":
+            # Add private skills as top-level
+            for private_skill in item.iterdir():
+                if private_skill.is_dir():
+                    skill_dirs.append((private_skill, True))
+        else:
+            skill_dirs.append((item, False))
+    
+    return sorted(skill_dirs, key=lambda entry: entry[0].name)
+
+
+def collect_skill_presets(src_dir: Path) -> dict:
+    """Map skill name -> presets from each SKILL.md frontmatter."""
+    src_skills = src_dir / "skills"
+    if not src_skills.exists():
+        return {}
+    presets = {}
+    for skill_dir, _ in find_skill_dirs(src_skills):
+        skill_md = skill_dir / "SKILL.md"
+        if skill_md.exists():
+            presets[skill_dir.name] = read_skill_presets(skill_md)[0]
+    return presets
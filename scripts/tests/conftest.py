@@ -0,0 +1,44 @@
+"""Make the build scripts importable as top-level modules, as build.py does."""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+SKILL = """---
+name: {name}
+description: Demo skill {name}
+presets: [core]
+---
+# {name}
+
+{{{{include: partials/protocol.md}}}}
+
+## Own
+
+Body of {name}.
+"""
+
+
+@pytest.fixture
+def src_tree(tmp_path):
+    """A small src/: two skills sharing a partial, a rule, a workflow and a binary template."""
+    src_dir = tmp_path / "src"
+    for name in ("alpha", "beta"):
+        (src_dir / "skills" / name).mkdir(parents=True)
+        (src_dir / "skills" / name / "SKILL.md").write_text(SKILL.format(name=name))
+    (src_dir / "skills" / "alpha" / "examples").mkdir()
+    (src_dir / "skills" / "alpha" / "examples" / "demo.py").write_text("print('demo')\n")
+    (src_dir / "partials").mkdir()
+    (src_dir / "partials" / "protocol.md").write_text("## Protocol\n\nShared steps.\n")
+    (src_dir / "rules").mkdir()
+    (src_dir / "rules" / "RULE.md").write_text("# Rule\n\n{{include: partials/protocol.md}}\n")
+    (src_dir / "workflows").mkdir()
+    (src_dir / "workflows" / "flow.md").write_text("# Flow\n\nSteps.\n")
+    (src_dir / "templates" / "documents").mkdir(parents=True)
+    (src_dir / "templates" / "documents" / "logo.png").write_bytes(b"\x89PNG\r\n\x1a\n\xff\xfe\x00")
+    (src_dir / "_meta").mkdir()
+    (src_dir / "_meta" / "preset-hierarchy.yaml").write_text("core: {}\n")
+    return src_dir
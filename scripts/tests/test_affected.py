@@ -0,0 +1,37 @@
+"""Tests for --affected / --watch rebuilds (build.run_affected())."""
+
+import json
+
+from build_manifest import HIERARCHY_INPUT, MANIFEST_NAME
+from build import load_preset_hierarchy, run_affected, run_build
+from include_engine import IncludeCache, IncludeGraph
+
+
+def rebuild(src_dir, dist_dir, changed):
+    cache = IncludeCache()
+    graph = IncludeGraph.scan(src_dir, cache=cache)
+    return run_affected(src_dir, dist_dir, load_preset_hierarchy(src_dir), changed, graph, cache)
+
+
+def test_affected_binary_template_is_copied_verbatim(src_tree, tmp_path):
+    dist_dir = tmp_path / "dist"
+    run_build(src_tree, dist_dir, load_preset_hierarchy(src_tree))
+    logo = src_tree / "templates" / "documents" / "logo.png"
+    logo.write_bytes(b"\x89PNG\r\n\x1a\n\xff\xfd\x00 changed")
+    
+    assert rebuild(src_tree, dist_dir, ["templates/documents/logo.png"]) == ["docs/templates/logo.png"]
+    assert (dist_dir / "docs" / "templates" / "logo.png").read_bytes() == logo.read_bytes()
+
+
+def test_affected_partial_rebuilds_its_includers(src_tree, tmp_path):
+    dist_dir = tmp_path / "dist"
+    run_build(src_tree, dist_dir, load_preset_hierarchy(src_tree))
+    (src_tree / "partials" / "protocol.md").write_text("## Protocol\n\nNew steps.\n")
+    
+    rebuilt = rebuild(src_tree, dist_dir, ["partials/protocol.md"])
+    
+    assert rebuilt == ["rules/RULE.md", "skills/alpha/SKILL.md", "skills/beta/SKILL.md"]
+    assert "New steps." in (dist_dir / "skills" / "beta" / "SKILL.md").read_text()
+    assert (dist_dir / "workflows" / "flow.md").read_text() == "# Flow\n\nSteps.\n"
+    outputs = json.loads((dist_dir / MANIFEST_NAME).read_text())["outputs"]
+    assert HIERARCHY_INPUT in outputs["skills/beta/SKILL.md"]["inputs"]
@@ -0,0 +1,78 @@
+"""Tests for reproducible archives (archive.write_archive())."""
+
+import os
+import shutil
+import tarfile
+import zipfile
+
+import pytest
+
+from archive import read_archive, write_archive
+from output_tree import VirtualTree
+
+
+def sample_tree(tmp_path):
+    asset = tmp_path / "run.sh"
+    asset.write_text("#!/bin/sh\necho hi\n")
+    asset.chmod(0o755)
+    tree = VirtualTree()
+    tree.write("skills/b/SKILL.md", b"# B\n")
+    tree.write("skills/a/SKILL.md", b"# A\n")
+    tree.copy(asset, "skills/a/scripts/run.sh")
+    tree.alias("skills/a/SKILL.md", "teams/core/skills/a/SKILL.md")
+    return tree
+
+
+@pytest.mark.parametrize("suffix", [".tar", ".tar.gz", ".zip"])
+def test_identical_trees_give_identical_archives(tmp_path, monkeypatch, suffix):
+    monkeypatch.delenv("SOURCE_DATE_EPOCH", raising=False)
+    first = write_archive(sample_tree(tmp_path), tmp_path / f"one{suffix}")
+    os.utime(tmp_path / "run.sh", (1, 1))
+    second = write_archive(sample_tree(tmp_path), tmp_path / f"two{suffix}")
+    
+    assert first.read_bytes() == second.read_bytes()
+    assert read_archive(first) == {
+        "skills/a/SKILL.md": b"# A\n",
+        "skills/a/scripts/run.sh": b"#!/bin/sh\necho hi\n",
+        "skills/b/SKILL.md": b"# B\n",
+        "teams/core/skills/a/SKILL.md": b"# A\n",
+    }
+
+
+@pytest.mark.skipif(shutil.which("zstd") is None, reason="zstd not available")
+def test_tar_zst_is_reproducible(tmp_path):
+    first = write_archive(sample_tree(tmp_path), tmp_path / "one.tar.zst")
+    second = write_archive(sample_tree(tmp_path), tmp_path / "two.tar.zst")
+    
+    assert first.read_bytes() == second.read_bytes()
+    assert read_archive(first)["skills/b/SKILL.md"] == b"# B\n"
+
+
+def test_tar_entries_are_sorted_with_fixed_metadata(tmp_path, monkeypatch):
+    monkeypatch.setenv("SOURCE_DATE_EPOCH", "1700000000")
+    path = write_archive(sample_tree(tmp_path), tmp_path / "out.tar")
+    
+    with tarfile.open(path) as tar:
+        members = tar.getmembers()
+    
+    assert [m.name for m in members] == sorted(m.name for m in members)
+    assert {m.mtime for m in members} == {1700000000}
+    assert {(m.uid, m.gid, m.uname, m.gname) for m in members} == {(0, 0, "", "")}
+    modes = {m.name: m.mode for m in members}
+    assert modes["skills/a/scripts/run.sh"] == 0o755
+    assert modes["skills/a/SKILL.md"] == 0o644
+    alias = next(m for m in members if m.name == "teams/core/skills/a/SKILL.md")
+    assert alias.islnk() and alias.linkname == "skills/a/SKILL.md"
+
+
+def test_zip_uses_fixed_timestamps(tmp_path, monkeypatch):
+    monkeypatch.delenv("SOURCE_DATE_EPOCH", raising=False)
+    path = write_archive(sample_tree(tmp_path), tmp_path / "out.zip")
+    
+    with zipfile.ZipFile(path) as archive:
+        assert {info.date_time for info in archive.infolist()} == {(1980, 1, 1, 0, 0, 0)}
+
+
+def test_unsupported_suffix_is_rejected(tmp_path):
+    with pytest.raises(ValueError, match="Unsupported archive type"):
+        write_archive(sample_tree(tmp_path), tmp_path / "out.rar")
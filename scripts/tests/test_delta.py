@@ -0,0 +1,84 @@
+"""Tests for delta.apply_delta() with well-formed and malicious bundles."""
+
+import io
+import json
+import tarfile
+
+import pytest
+
+from build_manifest import hash_bytes
+from delta import DELTA_NAME, DELTA_VERSION, apply_delta
+
+
+def write_bundle(path, files, removed=None, changed=None):
+    """A .tar delta bundle shipping `files` (path -> bytes) and tombstones for `removed`."""
+    delta = {
+        "version": DELTA_VERSION,
+        "base": "0" * 64,
+        "builder": "0" * 64,
+        "files": {rel_out: hash_bytes(data) for rel_out, data in files.items()},
+        "changed": changed or {},
+        "removed": removed or {},
+    }
+    members = {**files, DELTA_NAME: json.dumps(delta).encode()}
+    with tarfile.open(path, "w") as tar:
+        for name, data in members.items():
+            info = tarfile.TarInfo(name)
+            info.size = len(data)
+            tar.addfile(info, io.BytesIO(data))
+    return path
+
+
+@pytest.fixture
+def target(tmp_path):
+    target_dir = tmp_path / "installed"
+    (target_dir / "skills" / "demo").mkdir(parents=True)
+    (target_dir / "skills" / "demo" / "SKILL.md").write_bytes(b"old\n")
+    return target_dir
+
+
+def test_apply_delta_writes_and_removes(tmp_path, target):
+    bundle = write_bundle(tmp_path / "ok.tar", {"skills/new/SKILL.md": b"new\n"},
+                          removed={"skills/demo/SKILL.md": hash_bytes(b"old\n")})
+    
+    assert apply_delta(bundle, target) == {"written": 1, "removed": 1}
+    assert (target / "skills" / "new" / "SKILL.md").read_bytes() == b"new\n"
+    assert not (target / "skills" / "demo").exists()
+
+
+@pytest.mark.parametrize("rel_out", ["../escaped.md", "skills/../../escaped.md", "/tmp/escaped.md"])
+def test_apply_delta_rejects_files_outside_target(tmp_path, target, rel_out):
+    bundle = write_bundle(tmp_path / "evil.tar", {rel_out: b"pwned\n", "skills/new/SKILL.md": b"new\n"})
+    
+    with pytest.raises(ValueError, match="outside"):
+        apply_delta(bundle, target)
+    assert not (tmp_path / "escaped.md").exists()
+    assert not (target / "skills" / "new").exists()
+
+
+def test_apply_delta_rejects_removals_outside_target(tmp_path, target):
+    victim = tmp_path / "victim.md"
+    victim.write_bytes(b"keep\n")
+    bundle = write_bundle(tmp_path / "evil.tar", {}, removed={"../victim.md": hash_bytes(b"keep\n")})
+    
+    with pytest.raises(ValueError, match="outside"):
+        apply_delta(bundle, target)
+    assert victim.read_bytes() == b"keep\n"
+
+
+def test_apply_delta_rejects_paths_through_symlinks(tmp_path, target):
+    outside = tmp_path / "outside"
+    outside.mkdir()
+    (target / "link").symlink_to(outside)
+    bundle = write_bundle(tmp_path / "evil.tar", {"link/escaped.md": b"pwned\n"})
+    
+    with pytest.raises(ValueError, match="outside"):
+        apply_delta(bundle, target)
+    assert not (outside / "escaped.md").exists()
+
+
+def test_apply_delta_counts_only_files_it_removed(tmp_path, target):
+    bundle = write_bundle(tmp_path / "ok.tar", {}, removed={"skills/demo/SKILL.md": hash_bytes(b"old\n"),
+                                                           "skills/gone/SKILL.md": hash_bytes(b"gone\n")})
+    
+    assert apply_delta(bundle, target) == {"written": 0, "removed": 1}
@@ -0,0 +1,67 @@
+"""Tests for hoist.hoist_sections() on rendered skills."""
+
+import pytest
+
+from hoist import hoist_expansions, hoist_rule_name, hoist_sections, plan_hoisting
+from include_engine import compact_source_map, render_includes
+
+
+def render(src_dir, rel_path):
+    """(content, source map) of a src/ file, as build.py renders it."""
+    src_file = src_dir / rel_path
+    content, lines = render_includes(src_file.read_text(), src_dir, src_file)
+    return content, compact_source_map(lines)
+
+
+def test_hoists_partial_with_nested_include(tmp_path):
+    (tmp_path / "partials").mkdir()
+    (tmp_path / "partials" / "outer.md").write_text(
+        "## Outer\n\nOuter intro.\n\n{{include: partials/inner.md}}\n\nOuter outro.\n")
+    (tmp_path / "partials" / "inner.md").write_text("Inner line 1.\nInner line 2.\n")
+    (tmp_path / "SKILL.md").write_text("# Skill\n\n{{include: partials/outer.md}}\n\n## Own\n\nBody.\n")
+    hoist = {"partials/outer.md": 4}
+    content, source_map = render(tmp_path, "SKILL.md")
+    
+    text, kept = hoist_sections(content, source_map, hoist, hoist_expansions(tmp_path, hoist))
+    
+    # The include line's own newline follows the partial's trailing one
+    assert text == "# Skill\n\n## Outer\n\nSee @PARTIAL_OUTER (`rules/PARTIAL_OUTER.md`).\n\n\n## Own\n\nBody.\n"
+    assert text.count("See @PARTIAL_OUTER") == 1
+    assert "Inner line" not in text
+    assert len(kept) == len(text.split("\n"))
+
+
+def test_outer_partial_wins_over_hoisted_nested_partial(tmp_path):
+    (tmp_path / "partials").mkdir()
+    (tmp_path / "partials" / "outer.md").write_text("{{include: partials/inner.md}}\nOuter line.\n")
+    (tmp_path / "partials" / "inner.md").write_text("## Inner\n\nInner line.\n")
+    (tmp_path / "SKILL.md").write_text(
+        "# Skill\n\n{{include: partials/outer.md}}\n\n{{include: partials/inner.md}}\n")
+    hoist = {"partials/outer.md": 4, "partials/inner.md": 4}
+    content, source_map = render(tmp_path, "SKILL.md")
+    
+    text, _ = hoist_sections(content, source_map, hoist, hoist_expansions(tmp_path, hoist))
+    
+    assert text.count("See @PARTIAL_OUTER") == 1
+    assert text.count("See @PARTIAL_INNER") == 1
+    assert text.index("See @PARTIAL_OUTER") < text.index("See @PARTIAL_INNER")
+    assert "Inner line." not in text and "Outer line." not in text
+
+
+def test_rule_names_include_the_subdirectory():
+    assert hoist_rule_name("partials/git-protocol.md") == "PARTIAL_GIT_PROTOCOL"
+    assert hoist_rule_name("partials/a/protocol.md") == "PARTIAL_A_PROTOCOL"
+    assert hoist_rule_name("partials/b/protocol.md") == "PARTIAL_B_PROTOCOL"
+
+
+def test_plan_refuses_partials_sharing_a_rules_file(src_tree):
+    (src_tree / "partials" / "a-b").mkdir()
+    (src_tree / "partials" / "a-b" / "x.md").write_text("One.\n")
+    (src_tree / "partials" / "a").mkdir()
+    (src_tree / "partials" / "a" / "b-x.md").write_text("Two.\n")
+    for name in ("alpha", "beta"):
+        skill_md = src_tree / "skills" / name / "SKILL.md"
+        skill_md.write_text(skill_md.read_text() + "\n{{include: partials/a-b/x.md}}\n{{include: partials/a/b-x.md}}\n")
+    
+    with pytest.raises(ValueError, match="PARTIAL_A_B_X"):
+        plan_hoisting(src_tree, 1, {})
@@ -0,0 +1,64 @@
+"""Tests for include_engine.IncludeGraph and check_include_graph()."""
+
+from include_engine import IncludeCache, IncludeGraph, check_include_graph, render_includes
+
+
+def write(src_dir, rel_path, text):
+    path = src_dir / rel_path
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text)
+    return path
+
+
+def test_reverse_index_and_dependents(src_tree):
+    write(src_tree, "partials/protocol.md", "## Protocol\n\n{{include: partials/steps.md}}\n")
+    write(src_tree, "partials/steps.md", "1. Step\n")
+    
+    graph = IncludeGraph.scan(src_tree)
+    
+    assert graph.forward["partials/protocol.md"] == ["partials/steps.md"]
+    assert graph.reverse["partials/protocol.md"] == {"rules/RULE.md", "skills/alpha/SKILL.md",
+                                                     "skills/beta/SKILL.md"}
+    assert graph.dependents("partials/steps.md") == {"partials/steps.md", "partials/protocol.md",
+                                                     "rules/RULE.md", "skills/alpha/SKILL.md",
+                                                     "skills/beta/SKILL.md"}
+    assert graph.dependents("workflows/flow.md") == {"workflows/flow.md"}
+    assert not graph.find_cycles()
+
+
+def test_rescan_updates_both_indexes(src_tree):
+    graph = IncludeGraph.scan(src_tree)
+    write(src_tree, "rules/RULE.md", "# Rule\n\nNo includes any more.\n")
+    
+    graph.rescan(src_tree, ["rules/RULE.md"])
+    
+    assert graph.forward["rules/RULE.md"] == []
+    assert "rules/RULE.md" not in graph.reverse["partials/protocol.md"]
+
+
+def test_cycles_are_found_and_stop_the_build(src_tree, capsys):
+    write(src_tree, "partials/protocol.md", "{{include: partials/a.md}}\n")
+    write(src_tree, "partials/a.md", "{{include: partials/b.md}}\n")
+    write(src_tree, "partials/b.md", "{{include: partials/a.md}}\n")
+    
+    graph = IncludeGraph.scan(src_tree)
+    
+    cycles = graph.find_cycles()
+    assert len(cycles) == 1
+    assert set(cycles[0]) == {"partials/a.md", "partials/b.md"}
+    assert cycles[0][0] == cycles[0][-1]
+    assert not check_include_graph(graph)
+    assert "Include cycle" in capsys.readouterr().out
+
+
+def test_missing_include_is_reported_once(src_tree, capsys):
+    skill_md = write(src_tree, "skills/alpha/SKILL.md", "# Alpha\n\n{{include: partials/nope.md}}\n")
+    cache = IncludeCache()
+    graph = IncludeGraph.scan(src_tree, cache=cache)
+    
+    assert graph.missing == [("skills/alpha/SKILL.md", "partials/nope.md")]
+    assert check_include_graph(graph, cache)
+    content, _ = render_includes(skill_md.read_text(), src_tree, skill_md, set(), cache)
+    
+    assert capsys.readouterr().out.count("partials/nope.md") == 1
+    assert "<!-- ERROR: Include not found: partials/nope.md -->" in content
@@ -0,0 +1,123 @@
+"""Tests for the incremental build manifest (build_manifest.BuildManifest)."""
+
+import json
+import os
+
+from build import load_preset_hierarchy, run_build
+from build_manifest import HIERARCHY_INPUT, MANIFEST_NAME, BuildManifest, hash_bytes
+from output_tree import DirectoryTree
+
+
+def build(src_dir, dist_dir):
+    return run_build(src_dir, dist_dir, load_preset_hierarchy(src_dir))
+
+
+def test_inputs_with_same_size_and_mtime_are_not_rehashed(src_tree, tmp_path):
+    dist_dir = tmp_path / "dist"
+    build(src_tree, dist_dir)
+    sources = json.loads((dist_dir / MANIFEST_NAME).read_text())["sources"]
+    example = src_tree / "skills" / "alpha" / "examples" / "demo.py"
+    assert sources["skills/alpha/examples/demo.py"]["size"] == example.stat().st_size
+    
+    # Same size and mtime: trusted without reading, so the edit goes unnoticed
+    stamp = example.stat()
+    example.write_text("print('DEMO')\n")
+    os.utime(example, ns=(stamp.st_atime_ns, stamp.st_mtime_ns))
+    assert build(src_tree, dist_dir)["written"] == 0
+    
+    # A new mtime makes the build read and hash it again
+    os.utime(example, ns=(stamp.st_atime_ns, stamp.st_mtime_ns + 10**9))
+    assert build(src_tree, dist_dir)["written"] == 1
+    assert (dist_dir / "skills" / "alpha" / "examples" / "demo.py").read_text() == "print('DEMO')\n"
+
+
+def outputs(dist_dir):
+    return json.loads((dist_dir / MANIFEST_NAME).read_text())["outputs"]
+
+
+def test_unchanged_build_rewrites_nothing(src_tree, tmp_path):
+    dist_dir = tmp_path / "dist"
+    first = build(src_tree, dist_dir)
+    inode = (dist_dir / "skills" / "alpha" / "SKILL.md").stat().st_ino
+    
+    second = build(src_tree, dist_dir)
+    
+    assert second["written"] == 0 and second["unchanged"] == first["written"]
+    assert (dist_dir / "skills" / "alpha" / "SKILL.md").stat().st_ino == inode
+
+
+def test_manifest_records_every_input(src_tree, tmp_path):
+    dist_dir = tmp_path / "dist"
+    build(src_tree, dist_dir)
+    
+    entry = outputs(dist_dir)["skills/alpha/SKILL.md"]
+    
+    assert entry["source"] == "skills/alpha/SKILL.md"
+    assert set(entry["inputs"]) == {"skills/alpha/SKILL.md", "partials/protocol.md", HIERARCHY_INPUT}
+    assert entry["size"] == (dist_dir / "skills" / "alpha" / "SKILL.md").stat().st_size
+
+
+def test_changed_partial_rewrites_only_its_includers(src_tree, tmp_path):
+    dist_dir = tmp_path / "dist"
+    build(src_tree, dist_dir)
+    (src_tree / "partials" / "protocol.md").write_text("## Protocol\n\nChanged steps.\n")
+    
+    stats = build(src_tree, dist_dir)
+    
+    # Both skills and the rule include the partial; workflow, template and asset do not
+    assert stats["written"] == 3
+    assert "Changed steps." in (dist_dir / "rules" / "RULE.md").read_text()
+
+
+def test_hierarchy_change_rewrites_skills(src_tree, tmp_path):
+    dist_dir = tmp_path / "dist"
+    build(src_tree, dist_dir)
+    (src_tree / HIERARCHY_INPUT).write_text("core: {}\nbackend:\n  inherits: [core]\n")
+    
+    build(src_tree, dist_dir)
+    
+    # Re-rendered (to identical bytes) against the new hierarchy
+    digest = hash_bytes((src_tree / HIERARCHY_INPUT).read_bytes())
+    assert outputs(dist_dir)["skills/alpha/SKILL.md"]["inputs"][HIERARCHY_INPUT] == digest
+    assert HIERARCHY_INPUT not in outputs(dist_dir)["workflows/flow.md"]["inputs"]
+
+
+def test_outputs_of_removed_sources_are_deleted(src_tree, tmp_path):
+    dist_dir = tmp_path / "dist"
+    build(src_tree, dist_dir)
+    (src_tree / "workflows" / "flow.md").unlink()
+    
+    stats = build(src_tree, dist_dir)
+    
+    assert stats["removed"] == 1
+    assert not (dist_dir / "workflows" / "flow.md").exists()
+    assert "workflows/flow.md" not in outputs(dist_dir)
+
+
+def test_manifest_of_another_builder_is_ignored(src_tree, tmp_path):
+    dist_dir = tmp_path / "dist"
+    first = build(src_tree, dist_dir)
+    data = json.loads((dist_dir / MANIFEST_NAME).read_text())
+    data["builder"] = "0" * 64
+    (dist_dir / MANIFEST_NAME).write_text(json.dumps(data))
+    
+    assert BuildManifest.load_outputs(dist_dir) == {}
+    stats = build(src_tree, dist_dir)
+    # Everything is rendered again; identical outputs still count as unchanged
+    assert stats["written"] + stats["unchanged"] == first["written"]
+    assert json.loads((dist_dir / MANIFEST_NAME).read_text())["builder"] == BuildManifest.builder_hash()
+
+
+def test_carry_over_keeps_entries_that_were_not_rebuilt(src_tree, tmp_path):
+    dist_dir = tmp_path / "dist"
+    build(src_tree, dist_dir)
+    previous = BuildManifest.load_outputs(dist_dir)
+    out_tree = DirectoryTree(tmp_path / "staging", prev_root=dist_dir)
+    manifest = BuildManifest(src_tree, out_tree, previous, prev_dir=dist_dir)
+    
+    manifest.carry_over()
+    
+    assert manifest.outputs == previous
+    assert manifest.removed() == []
+    assert (tmp_path / "staging" / "workflows" / "flow.md").stat().st_ino == \
+        (dist_dir / "workflows" / "flow.md").stat().st_ino
@@ -0,0 +1,36 @@
+"""Tests for minify.minify_markdown()."""
+
+from minify import minify_markdown
+
+
+def test_keeps_fenced_code_inside_list_items():
+    content = (
+        "# Config\n"
+        "\n"
+        "1. Write the file:\n"
+        "\n"
+        "    ```yaml\n"
+        "    a:   1\n"
+        "\n"
+        "\n"
+        "    b: <!-- keep -->\n"
+        "    ```\n"
+        "\n"
+        "2. Done <!-- drop -->\n"
+    )
+    
+    text, kept = minify_markdown(content)
+    
+    assert "    b: <!-- keep -->\n" in text
+    assert "    a:   1\n\n\n    b:" in text
+    assert "2. Done\n" in text
+    assert len(kept) == len(text.split("\n")) - 1
+
+
+def test_drops_comments_and_collapses_outside_fences():
+    content = "Text   with  spaces <!-- note -->\n\n\n\n---\n\nMore.\n"
+    
+    text, kept = minify_markdown(content)
+    
+    assert text == "Text with spaces\n\nMore.\n"
+    assert kept == [0, 1, 6]
@@ -0,0 +1,47 @@
+"""Tests for output_tree.copy_asset() and the asset copy path of DirectoryTree."""
+
+import output_tree
+from output_tree import DirectoryTree, copy_asset
+
+
+def no_cheap_copies(monkeypatch):
+    """Make reflinks and copy_file_range unavailable, as on most non-CoW filesystems."""
+    monkeypatch.setattr(output_tree, "_clonefile", lambda src_file, dst_file: False)
+    monkeypatch.setattr(output_tree, "_reflink", lambda src, dst: False)
+    monkeypatch.setattr(output_tree, "_copy_range", lambda src, dst, size: False)
+
+
+def test_copy_asset_falls_back_to_a_copy(tmp_path, monkeypatch):
+    no_cheap_copies(monkeypatch)
+    src_file = tmp_path / "example.py"
+    src_file.write_text("print('hi')\n")
+    dst_file = tmp_path / "dist" / "example.py"
+    
+    assert copy_asset(src_file, dst_file) == "copy"
+    assert dst_file.stat().st_ino != src_file.stat().st_ino
+    assert dst_file.read_text() == "print('hi')\n"
+    assert dst_file.stat().st_mtime_ns == src_file.stat().st_mtime_ns
+
+
+def test_editing_a_copied_asset_leaves_src_alone(tmp_path):
+    src_file = tmp_path / "references" / "guide.md"
+    src_file.parent.mkdir()
+    src_file.write_text("# Guide\n")
+    tree = DirectoryTree(tmp_path / "staging")
+    
+    assert tree.copy(src_file, "skills/demo/references/guide.md")
+    out_file = tmp_path / "staging" / "skills" / "demo" / "references" / "guide.md"
+    assert src_file.stat().st_nlink == 1
+    with open(out_file, "w") as f:
+        f.write("# Edited in dist\n")
+    assert src_file.read_text() == "# Guide\n"
+
+
+def test_unchanged_output_is_linked_from_previous_tree(tmp_path):
+    src_file = tmp_path / "guide.md"
+    src_file.write_text("# Guide\n")
+    DirectoryTree(tmp_path / "dist").copy(src_file, "guide.md")
+    tree = DirectoryTree(tmp_path / "staging", prev_root=tmp_path / "dist")
+    
+    assert not tree.copy(src_file, "guide.md")
+    assert (tmp_path / "staging" / "guide.md").stat().st_ino == (tmp_path / "dist" / "guide.md").stat().st_ino
@@ -0,0 +1,91 @@
+"""Tests for --shard i/N builds and --merge (shard.py, build.run_merge())."""
+
+import json
+
+import pytest
+
+from build_manifest import MANIFEST_NAME
+from build import load_preset_hierarchy, run_build, run_merge
+from shard import parse_shard, shard_of
+
+
+def tree_files(root):
+    """Relative path -> bytes of every output, without the manifest and index."""
+    return {str(path.relative_to(root)): path.read_bytes()
+            for path in sorted(root.rglob("*"))
+            if path.is_file() and path.name not in (MANIFEST_NAME, "index.json")}
+
+
+def build_shards(src_dir, tmp_path, count):
+    hierarchy = load_preset_hierarchy(src_dir)
+    shard_dirs = []
+    for index in range(1, count + 1):
+        shard_dir = tmp_path / f"shard{index}"
+        run_build(src_dir, shard_dir, hierarchy, shard=(index, count))
+        shard_dirs.append(shard_dir)
+    return shard_dirs
+
+
+def test_parse_shard_accepts_i_of_n():
+    assert parse_shard("2/4") == (2, 4)
+    assert parse_shard(" 1/1 ") == (1, 1)
+
+
+@pytest.mark.parametrize("spec", ["0/4", "5/4", "2", "2/", "a/b", "1/4/2"])
+def test_parse_shard_rejects_invalid_specs(spec):
+    with pytest.raises(ValueError):
+        parse_shard(spec)
+
+
+def test_shard_of_is_stable_and_in_range():
+    names = [f"skill-{i}" for i in range(200)]
+    first = [shard_of(name, 4) for name in names]
+    
+    assert first == [shard_of(name, 4) for name in names]
+    assert set(first) == {1, 2, 3, 4}
+    assert all(shard_of(name, 1) == 1 for name in names)
+
+
+def test_shard_builds_only_their_skills(src_tree, tmp_path):
+    shard_dirs = build_shards(src_tree, tmp_path, 2)
+    
+    for index, shard_dir in enumerate(shard_dirs, 1):
+        built = {path.parent.name for path in shard_dir.glob("skills/*/SKILL.md")}
+        assert built == {name for name in ("alpha", "beta") if shard_of(name, 2) == index}
+        assert json.loads((shard_dir / MANIFEST_NAME).read_text())["shard"] == [index, 2]
+
+
+def test_merge_matches_full_build(src_tree, tmp_path):
+    full_dir = tmp_path / "full"
+    run_build(src_tree, full_dir, load_preset_hierarchy(src_tree))
+    merged_dir = tmp_path / "merged"
+    
+    run_merge(src_tree, merged_dir, build_shards(src_tree, tmp_path, 3), load_preset_hierarchy(src_tree))
+    
+    assert tree_files(merged_dir) == tree_files(full_dir)
+    full_outputs = json.loads((full_dir / MANIFEST_NAME).read_text())["outputs"]
+    merged_outputs = json.loads((merged_dir / MANIFEST_NAME).read_text())["outputs"]
+    assert {k: v["hash"] for k, v in merged_outputs.items()} == {k: v["hash"] for k, v in full_outputs.items()}
+
+
+def test_merge_rejects_incomplete_shard_set(src_tree, tmp_path):
+    shard_dirs = build_shards(src_tree, tmp_path, 3)
+    
+    with pytest.raises(ValueError, match="Incomplete shard set"):
+        run_merge(src_tree, tmp_path / "merged", shard_dirs[:2], load_preset_hierarchy(src_tree))
+    assert not (tmp_path / "merged").exists()
+
+
+def test_merge_rejects_duplicate_shard(src_tree, tmp_path):
+    shard_dirs = build_shards(src_tree, tmp_path, 2)
+    
+    with pytest.raises(ValueError, match="given twice"):
+        run_merge(src_tree, tmp_path / "merged", shard_dirs + shard_dirs[:1], load_preset_hierarchy(src_tree))
+
+
+def test_merge_rejects_non_shard_build(src_tree, tmp_path):
+    full_dir = tmp_path / "full"
+    run_build(src_tree, full_dir, load_preset_hierarchy(src_tree))
+    
+    with pytest.raises(ValueError, match="not a --shard build"):
+        run_merge(src_tree, tmp_path / "merged", [full_dir], load_preset_hierarchy(src_tree))
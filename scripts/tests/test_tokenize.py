@@ -0,0 +1,52 @@
+"""Tests for the single-pass include tokenizer (include_engine.tokenize()) and rendering."""
+
+from include_engine import IncludeRef, has_directives, render_includes, tokenize
+
+
+def test_splits_text_and_both_directive_forms_in_order():
+    content = ("Intro\n{{include: partials/a.md}}\nMiddle "
+               "<!-- INCLUDE: _meta/_skills/sections/b.md -->\nEnd\n")
+    
+    spans = tokenize(content)
+    
+    assert spans == [
+        "Intro\n",
+        IncludeRef("partials/a.md", "partials/a.md", False, 0),
+        "\nMiddle ",
+        IncludeRef("partials/b.md", "_meta/_skills/sections/b.md", True, 0),
+        "\nEnd\n",
+    ]
+    assert "".join(span if isinstance(span, str) else "" for span in spans) == "Intro\n\nMiddle \nEnd\n"
+
+
+def test_adjacent_and_multiline_directives():
+    spans = tokenize("{{include: a.md}}{{include:\n  b.md\n}}")
+    
+    assert spans == [IncludeRef("a.md", "a.md", False, 0), IncludeRef("b.md", "b.md", False, 2)]
+
+
+def test_plain_text_is_one_span():
+    assert tokenize("No directives {here}.\n") == ["No directives {here}.\n"]
+    assert tokenize("") == []
+
+
+def test_byte_sniff_matches_tokenizer():
+    for content in ("{{include: a.md}}", "<!--INCLUDE: a.md-->", "{{ include: a.md }}", "plain"):
+        found = any(isinstance(span, IncludeRef) for span in tokenize(content))
+        assert has_directives(content.encode()) == found, content
+
+
+def test_render_expands_nested_includes_and_maps_lines(tmp_path):
+    (tmp_path / "partials").mkdir()
+    (tmp_path / "partials" / "outer.md").write_text("Outer\n{{include: partials/inner.md}}\n")
+    (tmp_path / "partials" / "inner.md").write_text("Inner\n")
+    doc = tmp_path / "doc.md"
+    doc.write_text("Top\n{{include: partials/outer.md}}\nBottom\n")
+    deps = set()
+    
+    content, lines = render_includes(doc.read_text(), tmp_path, doc, deps)
+    
+    assert content == "Top\nOuter\nInner\n\n\nBottom\n"
+    assert deps == {"partials/outer.md", "partials/inner.md"}
+    assert lines[:3] == [("doc.md", 1), ("partials/outer.md", 1), ("partials/inner.md", 1)]
+    assert lines[-1] == ("doc.md", 3)
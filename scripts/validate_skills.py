@@ -8,6 +8,8 @@ Usage:
     python3 scripts/validate_skills.py              # Validate all
     python3 scripts/validate_skills.py --skill=name # Validate single
     python3 scripts/validate_skills.py --strict     # Fail on warnings
+    python3 scripts/validate_skills.py --team=backend  # Skills of an in-memory team build
+    python3 scripts/validate_skills.py --shard=2/4     # Only shard 2 of 4 (build.py --shard)
 
 Validations:
     - Required fields (from schema)
@@ -37,8 +39,11 @@ def extract_frontmatter(skill_path: Path) -> dict | None:
     skill_md = skill_path / "SKILL.md"
     if not skill_md.exists():
         return None
-    
-    content = skill_md.read_text()
+    return parse_frontmatter(skill_md.read_text())
+
+
+def parse_frontmatter(content: str) -> dict | None:
+    """Parse YAML frontmatter from SKILL.md content."""
     if not content.startswith("---"):
         return None
     
@@ -231,25 +236,65 @@ class SchemaValidator:
 
 def validate_skill(skill_path: Path, validator: SchemaValidator) -> tuple[list, list]:
     """Validate a single skill. Returns (errors, warnings)."""
-    fm = extract_frontmatter(skill_path)
+    return validate_frontmatter(extract_frontmatter(skill_path), skill_path.name, validator)
+
+
+def validate_frontmatter(fm: dict | None, dir_name: str, validator: SchemaValidator) -> tuple[list, list]:
+    """Validate parsed frontmatter of the skill in dir_name. Returns (errors, warnings)."""
     if not fm:
-        return [f"{skill_path.name}: no valid frontmatter"], []
+        return [f"{dir_name}: no valid frontmatter"], []
     
-    skill_name = fm.get("name", skill_path.name)
+    skill_name = fm.get("name", dir_name)
     return validator.validate(fm, skill_name)
 
 
+def validate_built_skills(team: str, only: str | None, validator: SchemaValidator,
+                          shard: str = None) -> tuple[list, list, int]:
+    """Validate the skills of an in-memory build (scripts/build.py) for team(s)."""
+    from build import build
+    
+    try:
+        tree = build(Path("src"), team, shard=shard)
+    except ValueError as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+    
+    all_errors = []
+    all_warnings = []
+    validated = 0
+    for skill_name in tree.listdir("skills"):
+        skill_md = f"skills/{skill_name}/SKILL.md"
+        if (only and skill_name != only) or skill_md not in tree:
+            continue
+        fm = parse_frontmatter(tree.read_text(skill_md))
+        errors, warnings = validate_frontmatter(fm, skill_name, validator)
+        all_errors.extend(errors)
+        all_warnings.extend(warnings)
+        validated += 1
+    return all_errors, all_warnings, validated
+
+
 def main():
     parser = argparse.ArgumentParser(description="Validate skills against Schema V3")
     parser.add_argument("--skill", help="Validate single skill")
     parser.add_argument("--strict", action="store_true", help="Fail on warnings")
     parser.add_argument("--no-warnings", action="store_true", help="Hide warnings")
+    parser.add_argument("--team", help="Validate the skills of an in-memory build for team(s) "
+                                       "(comma-separated, 'all' for every skill); no dist/ needed")
+    parser.add_argument("--shard", metavar="I/N", help="Validate only the skills of shard I of N, "
+                                                       "as assigned by build.py --shard")
     args = parser.parse_args()
     
     # Initialize validator
     schema_dir = Path("src/_meta/schema/skills")
     validator = SchemaValidator(schema_dir)
     
+    if args.team:
+        all_errors, all_warnings, validated = validate_built_skills(args.team, args.skill, validator,
+                                                                    args.shard)
+        report(all_errors, all_warnings, validated, args)
+        return
+    
     # Find skills
     skills_dir = Path("src/skills")
     private_dir = skills_dir / "private"
@@ -266,6 +311,15 @@ def main():
         if private_dir.exists():
             skill_paths.extend([p for p in private_dir.iterdir() if p.is_dir()])
     
+    if args.shard:
+        from shard import parse_shard, shard_of
+        try:
+            index, count = parse_shard(args.shard)
+        except ValueError as e:
+            print(f"❌ {e}")
+            sys.exit(1)
+        skill_paths = [p for p in skill_paths if shard_of(p.name, count) == index]
+    
     # Validate
     all_errors = []
     all_warnings = []
@@ -281,6 +335,11 @@ def main():
         all_warnings.extend(warnings)
         validated += 1
     
+    report(all_errors, all_warnings, validated, args)
+
+
+def report(all_errors: list, all_warnings: list, validated: int, args):
+    """Print warnings and errors, then exit with the validation status."""
     # Report warnings
     if all_warnings and not args.no_warnings:
         print(f"=== WARNINGS ({len(all_warnings)}) ===\n")
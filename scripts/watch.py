@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+File watchers for build.py --watch: inotify (Linux, through libc) with a
+polling fallback, and debouncing of editor save bursts.
+"""
+
+import os
+import sys
+import time
+import ctypes
+import select
+import struct
+from pathlib import Path
+
+# Watch mode: quiet period that ends a burst of saves, and polling fallback
+WATCH_DEBOUNCE = 0.05
+WATCH_POLL_INTERVAL = 0.5
+WATCH_ALL = "*"
+
+
+class InotifyWatcher:
+    """Recursive inotify watch on a directory tree (Linux, through libc)."""
+    
+    IN_MODIFY = 0x2
+    IN_ATTRIB = 0x4
+    IN_CLOSE_WRITE = 0x8
+    IN_MOVED_FROM = 0x40
+    IN_MOVED_TO = 0x80
+    IN_CREATE = 0x100
+    IN_DELETE = 0x200
+    IN_Q_OVERFLOW = 0x4000
+    IN_ISDIR = 0x40000000
+    IN_NONBLOCK = 0o4000
+    IN_CLOEXEC = 0o2000000
+    MASK = IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+    EVENT = struct.Struct("iIII")
+    
+    def __init__(self, root: Path, libc, fd: int):
+        self.root = root
+        self._libc = libc
+        self._fd = fd
+        self._dirs = {}
+        self._watch_tree(root)
+    
+    @classmethod
+    def create(cls, root: Path):
+        """Return a watcher, or None if inotify is not available here."""
+        if not sys.platform.startswith("linux"):
+            return None
+        try:
+            libc = ctypes.CDLL(None, use_errno=True)
+            fd = libc.inotify_init1(cls.IN_NONBLOCK | cls.IN_CLOEXEC)
+        except (OSError, AttributeError):
+            return None
+        if fd < 0:
+            return None
+        return cls(root, libc, fd)
+    
+    def _watch_tree(self, directory: Path):
+        for path in [directory, *(p for p in directory.rglob("*") if p.is_dir())]:
+            wd = self._libc.inotify_add_watch(self._fd, os.fsencode(path), self.MASK)
+            if wd >= 0:
+                self._dirs[wd] = path
+    
+    def read_events(self, timeout: float = None) -> set:
+        """Changed paths relative to root (WATCH_ALL if events were lost)."""
+        ready, _, _ = select.select([self._fd], [], [], timeout)
+        if not ready:
+            return set()
+        try:
+            data = os.read(self._fd, 64 * 1024)
+        except BlockingIOError:
+            return set()
+        
+        changed = set()
+        offset = 0
+        while offset < len(data):
+            wd, mask, _, length = self.EVENT.unpack_from(data, offset)
+            name = data[offset + self.EVENT.size:offset + self.EVENT.size + length].rstrip(b"\0")
+            offset += self.EVENT.size + length
+            
+            if mask & self.IN_Q_OVERFLOW:
+                changed.add(WATCH_ALL)
+                continue
+            directory = self._dirs.get(wd)
+            if directory is None:
+                continue
+            path = directory / os.fsdecode(name)
+            if mask & self.IN_ISDIR:
+                if mask & (self.IN_CREATE | self.IN_MOVED_TO):
+                    self._watch_tree(path)
+                changed.add(WATCH_ALL)
+                continue
+            changed.add(path.relative_to(self.root).as_posix())
+        return changed
+    
+    def close(self):
+        os.close(self._fd)
+
+
+class PollingWatcher:
+    """Fallback watcher: compares (mtime, size) snapshots of the tree."""
+    
+    def __init__(self, root: Path, interval: float = WATCH_POLL_INTERVAL):
+        self.root = root
+        self.interval = interval
+        self._snapshot = self._scan()
+    
+    def _scan(self) -> dict:
+        snapshot = {}
+        for path in self.root.rglob("*"):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            if not path.is_dir():
+                snapshot[path.relative_to(self.root).as_posix()] = (stat.st_mtime_ns, stat.st_size)
+        return snapshot
+    
+    def read_events(self, timeout: float = None) -> set:
+        time.sleep(self.interval if timeout is None else timeout)
+        snapshot = self._scan()
+        changed = {p for p in snapshot.keys() | self._snapshot.keys()
+                   if snapshot.get(p) != self._snapshot.get(p)}
+        self._snapshot = snapshot
+        return changed
+    
+    def close(self):
+        pass
+
+
+def _is_editor_noise(rel_path: str) -> bool:
+    """Swap, backup and probe files editors create next to the real file."""
+    name = rel_path.rsplit("/", 1)[-1]
+    return name.startswith(".") or name.endswith(("~", ".swp", ".swx", ".tmp")) or name == "4913"
+
+
+def wait_for_changes(watcher) -> set:
+    """Block until something changes, then absorb the rest of the burst."""
+    changed = set()
+    while not changed:
+        changed = {p for p in watcher.read_events() if not _is_editor_noise(p)}
+    while True:
+        more = {p for p in watcher.read_events(WATCH_DEBOUNCE) if not _is_editor_noise(p)}
+        if not more:
+            return changed
+        changed |= more